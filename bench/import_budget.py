@@ -0,0 +1,142 @@
+"""
+Import-time budget for the command line entry points.
+
+Runs each tool's --help (and create_ticket.py's page listing, against a
+scratch epic.json) in a fresh interpreter, and fails if it takes longer than
+the budget or if any heavy module (Atlassian client, requests, BeautifulSoup,
+tabulate, httpx, ...) was imported on the way. Those should only load on the
+code paths that talk to Confluence/Jira or print tables, so a scheduler
+invoking the tools many times does not pay for them up front.
+
+Usage:
+  python bench/import_budget.py [--budget-ms 250] [--repeat 5] [--importtime]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from colorama import init, Fore, Style
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Initialize colorama
+init()
+
+HEAVY_MODULES = ['atlassian', 'requests', 'urllib3', 'bs4', 'lxml', 'tabulate', 'httpx', 'sqlite3', 'tracemalloc', 'concurrent.futures']
+
+# (label, script, arguments, heavy modules that path is allowed to import)
+ENTRY_POINTS = [
+    ('main --help', 'main.py', ['--help'], []),
+    ('create_ticket --help', 'create_ticket.py', ['--help'], []),
+    ('create_ticket (page list)', 'create_ticket.py', [], []),
+    ('create_epic --help', 'create_epic.py', ['--help'], []),
+    ('plan --help', 'plan.py', ['--help'], []),
+    ('pipeline --help', 'pipeline.py', ['--help'], ['concurrent.futures'])  # Pulled in by asyncio itself
+]
+
+# Runs the script as __main__, then reports which modules it left loaded on stderr
+_PROBE = """
+import runpy, sys
+sys.argv = sys.argv[1:]
+sys.path.insert(0, {repo!r})
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass
+finally:
+    sys.stderr.write('\\n__modules__ ' + ' '.join(sorted(sys.modules)) + '\\n')
+"""
+
+def probe_env(workdir):
+    """Environment with caches and state in workdir; the settings pass validation but nothing is contacted"""
+    env = dict(os.environ)
+    env.update({
+        'CONFLUENCE_URL': 'http://127.0.0.1:9',
+        'CONFLUENCE_USERNAME': 'budget@example.com',
+        'CONFLUENCE_API_TOKEN': 'budget-token',
+        'JIRA_PROJECT': 'BENCH',
+        'PAGE_ID': '900000001',  # Without it create_epic.py would stop at config validation, help or not
+        'PAGE_TABLE_HEADER': 'Planned for H2',
+        'PRD_PAGE_TABLE_HEADER': 'Scope',
+        'IDS_CACHE_DIR': os.path.join(workdir, '.cache'),
+        'EPIC_REGISTRY_BACKEND': 'json',
+        'METRICS_ENABLED': 'false',
+        'METRICS_JSON_FILE': '',
+        'TRACE_FILE': '',
+        'LOG_JSON_FILE': ''
+    })
+    return env
+
+def run_entry_point(script, arguments, env, workdir):
+    """
+    Run one entry point in a fresh interpreter.
+    Returns: (wall seconds, set of imported module names)
+    """
+    command = [sys.executable, '-c', _PROBE.format(repo=REPO_DIR), os.path.join(REPO_DIR, script)] + arguments
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=workdir, env=env, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - started
+    modules = set()
+    for line in completed.stderr.splitlines():
+        if line.startswith('__modules__ '):
+            modules = set(line.split()[1:])
+    return seconds, modules
+
+def print_import_times(script, arguments, env, workdir, count=10):
+    """Show the slowest imports of an entry point from python -X importtime"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(REPO_DIR, script)] + arguments,
+                               cwd=workdir, env=env, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    for cumulative, name in sorted(rows, reverse=True)[:count]:
+        print(f"    {cumulative / 1000:7.1f} ms {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the entry points start without loading heavy modules')
+    parser.add_argument('--budget-ms', type=float, default=250, help='Allowed wall time per invocation (best of --repeat)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per entry point')
+    parser.add_argument('--importtime', action='store_true', help='Also list the slowest imports of each entry point')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ids-import-')
+    env = probe_env(workdir)
+    with open(os.path.join(workdir, 'epic.json'), 'w') as f:
+        json.dump([{'project_name': 'KP1.1: Budget check', 'confluence_page_id': '910000001', 'jira_epic_id': 'BENCH-1'}], f)
+
+    failures = 0
+    try:
+        for label, script, arguments, allowed in ENTRY_POINTS:
+            timings = []
+            for _ in range(args.repeat):
+                seconds, modules = run_entry_point(script, arguments, env, workdir)
+                timings.append(seconds)
+            best_ms = min(timings) * 1000
+            heavy = [name for name in HEAVY_MODULES if name in modules and name not in allowed]
+            ok = best_ms <= args.budget_ms and not heavy
+            failures += not ok
+            color = Fore.GREEN if ok else Fore.RED
+            print(f"{color}{'✓' if ok else '✗'} {label:28} {best_ms:6.0f} ms (budget {args.budget_ms:.0f} ms){Style.RESET_ALL}")
+            if heavy:
+                print(f"{Fore.RED}    imported: {', '.join(heavy)}{Style.RESET_ALL}")
+            if args.importtime:
+                print_import_times(script, arguments, env, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failures:
+        print(f"{Fore.RED}{failures} entry point(s) over the import budget{Style.RESET_ALL}")
+        sys.exit(1)
+    print(f"{Fore.GREEN}All entry points within the import budget{Style.RESET_ALL}")
+
+if __name__ == '__main__':
+    main()
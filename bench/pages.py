@@ -0,0 +1,166 @@
+"""
+Synthetic Confluence storage-format pages for benchmarks.
+
+scope_page() builds a project page (DRI line, "Scope" table of tasks) as read
+by get_scope_table; planning_page() builds the planning page ("Planned for H2"
+table of KP projects) as read by get_planned_epics. The number of rows,
+ri:user mentions, status macros, links and filler prose (paragraphs, info
+macros, images, code blocks the parser has to skip) are configurable, from a
+handful of rows up to 10k.
+
+Usage:
+  python bench/pages.py scope|planning [--rows 100] [--mentions 1] [--links 0]
+                                       [--filler 0] [--no-status] [--seed 0] > page.xml
+"""
+import argparse
+import base64
+import random
+import struct
+from html import escape
+
+PRIORITIES = [('Red', 'High'), ('Yellow', 'Medium'), ('Green', 'Low')]
+EFFORTS = ['SMALL (1-3 DAYS)', 'MEDIUM (1-2 WEEKS)', 'LARGE (3+ WEEKS)']
+WORDS = ('migrate component token design system pantry android ios web release rollout adoption '
+         'accessibility contrast typography spacing audit dashboard metric baseline owner review').split()
+
+def tiny_link_code(page_id):
+    """Encode a page ID as a Confluence tiny link code (inverse of update_epic.decode_tiny_link)"""
+    encoded = base64.b64encode(struct.pack('<Q', int(page_id))).decode('ascii').rstrip('=')
+    return encoded.replace('/', '-').replace('+', '_').rstrip('A')
+
+def account_ids(count):
+    """Synthetic Atlassian account IDs"""
+    return [f'557058:bench-user-{i:04d}' for i in range(count)]
+
+def user_mention(account_id):
+    return f'<ac:link><ri:user ri:account-id="{account_id}" /></ac:link>'
+
+def status_macro(colour, title):
+    return (f'<ac:structured-macro ac:name="status" ac:schema-version="1">'
+            f'<ac:parameter ac:name="colour">{colour}</ac:parameter>'
+            f'<ac:parameter ac:name="title">{title}</ac:parameter></ac:structured-macro>')
+
+def external_link(rng):
+    return f'<a href="https://example.com/docs/{rng.randrange(10 ** 6)}">reference</a>'
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def filler(rng, paragraphs):
+    """Prose and macros of the kind found around the tables, none of which the parser keeps"""
+    parts = []
+    for i in range(paragraphs):
+        parts.append(f'<p>{" ".join(sentence(rng) for _ in range(4))}</p>')
+        if i % 3 == 0:
+            parts.append(f'<ac:structured-macro ac:name="info"><ac:rich-text-body><p>{sentence(rng)}</p></ac:rich-text-body></ac:structured-macro>')
+        if i % 5 == 0:
+            parts.append(f'<ac:image><ri:attachment ri:filename="diagram-{i}.png" /></ac:image>')
+        if i % 7 == 0:
+            parts.append(f'<ac:structured-macro ac:name="code"><ac:plain-text-body><![CDATA[{sentence(rng, 30)}]]></ac:plain-text-body></ac:structured-macro>')
+    return ''.join(parts)
+
+def _priority_cell(rng, status_macros):
+    colour, priority = rng.choice(PRIORITIES)
+    return f'<p>{status_macro(colour, priority) if status_macros else priority}</p>'
+
+def _table(headers, rows):
+    header_html = ''.join(f'<th><p>{escape(header)}</p></th>' for header in headers)
+    rows_html = ''.join('<tr>' + ''.join(f'<td>{cell}</td>' for cell in row) + '</tr>' for row in rows)
+    return f'<table><tbody><tr>{header_html}</tr>{rows_html}</tbody></table>'
+
+def scope_page(title, task_count, users, scope_header='Scope', mentions_per_row=1, status_macros=True,
+               links_per_row=0, filler_paragraphs=0, seed=0):
+    """
+    Storage body of a project page with a DRI line and a scope table of task_count tasks.
+    Args:
+        users: account IDs to tag as DRI and task owners
+        mentions_per_row: owners tagged in each task's Owner cell
+        links_per_row: external links in each task's Note cell
+        filler_paragraphs: paragraphs of prose (with macros and images) before and after the table
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(task_count):
+        owners = ' '.join(user_mention(rng.choice(users)) for _ in range(mentions_per_row))
+        links = ' '.join(external_link(rng) for _ in range(links_per_row))
+        rows.append([
+            f'<p>{escape(title)} task {i + 1}</p>',
+            _priority_cell(rng, status_macros),
+            f'<p>{rng.choice(EFFORTS)}</p>',
+            f'<p>{owners}</p>',
+            f'<p>Note for task {i + 1} {links}</p>'
+        ])
+    return (
+        f'<p>DRI: {user_mention(users[0])}</p>'
+        + filler(rng, filler_paragraphs)
+        + f'<h1>{escape(scope_header)}</h1>'
+        + _table(['Task', 'Priority', 'Effort', 'Owner', 'Note'], rows)
+        + filler(rng, filler_paragraphs)
+    )
+
+def synthetic_projects(count, users, base_url='https://example.atlassian.net', first_page_id=910000001, seed=0):
+    """KP projects for planning_page, each linking to its page through a locally decodable tiny link"""
+    rng = random.Random(seed)
+    return [
+        {
+            'name': f'KP{i + 1}.1: Benchmark project {i + 1}',
+            'owner': rng.choice(users),
+            'link': f'{base_url}/wiki/x/{tiny_link_code(first_page_id + i)}'
+        }
+        for i in range(count)
+    ]
+
+def planning_page(projects, planned_header='Planned for H2', mentions_per_row=1, status_macros=True,
+                  links_per_row=0, filler_paragraphs=0, seed=0):
+    """
+    Storage body of the planning page.
+    Args:
+        projects: list of dicts with 'name', 'owner' (account ID) and 'link' (URL of the project page)
+        mentions_per_row: users tagged in each Owner cell (the project owner, then other projects' owners)
+        links_per_row: external links in each Note cell, ahead of the project page link
+        filler_paragraphs: paragraphs of prose (with macros and images) before and after the table
+    """
+    rng = random.Random(seed)
+    rows = []
+    for project in projects:
+        _, priority = rng.choice(PRIORITIES)
+        owners = ' '.join([user_mention(project['owner'])] + [user_mention(rng.choice(projects)['owner']) for _ in range(mentions_per_row - 1)])
+        links = ' '.join(external_link(rng) for _ in range(links_per_row))
+        rows.append([
+            f'<p>{escape(project["name"])}</p>',
+            f'<p>{status_macro("Blue", "Planned") if status_macros else "Planned"}</p>',
+            f'<p>{priority}</p>',
+            f'<p>Description of {escape(project["name"])} {links}</p>',
+            f'<p>{owners}</p>',
+            '<p>Adoption across all surfaces</p>',
+            f'<p><a href="{escape(project["link"])}">Project page</a></p>'
+        ])
+    return (
+        filler(rng, filler_paragraphs)
+        + f'<h1>{escape(planned_header)}</h1>'
+        + _table(['Project', 'Status', 'Priority', 'Note', 'Owner', 'Success Measures', 'Link'], rows)
+        + filler(rng, filler_paragraphs)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Confluence storage-format page')
+    parser.add_argument('kind', choices=['scope', 'planning'])
+    parser.add_argument('--rows', type=int, default=100, help='Table rows')
+    parser.add_argument('--users', type=int, default=25, help='Distinct users to mention')
+    parser.add_argument('--mentions', type=int, default=1, help='ri:user mentions per Owner cell')
+    parser.add_argument('--links', type=int, default=0, help='Extra links per row')
+    parser.add_argument('--filler', type=int, default=0, help='Filler paragraphs before and after the table')
+    parser.add_argument('--no-status', action='store_true', help='Plain text instead of status macros')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    users = account_ids(args.users)
+    options = dict(mentions_per_row=args.mentions, status_macros=not args.no_status,
+                   links_per_row=args.links, filler_paragraphs=args.filler, seed=args.seed)
+    if args.kind == 'scope':
+        print(scope_page('Synthetic project', args.rows, users, **options))
+    else:
+        print(planning_page(synthetic_projects(args.rows, users, seed=args.seed), **options))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Parser microbenchmarks on synthetic pages of increasing size.
+
+Times the parsing portion of get_scope_table (parse_page_html, PageIndex,
+parse_scope_table) and the table/link extraction of get_planned_epics
+(parse_page_html, PageIndex, parse_planned_table, resolve_page_links) on
+pages from bench/pages.py, and measures peak memory of each with tracemalloc
+in a separate pass. Users are pre-resolved and links decode locally, so no
+request leaves the machine.
+
+Usage:
+  python bench/parse_benchmark.py [--sizes 10,100,1000,10000] [--repeat 3]
+                                  [--mentions 1] [--links 0] [--filler 0] [--no-status] [--json results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+# The parsers read these from config; nothing is contacted
+os.environ.setdefault('CONFLUENCE_URL', 'https://example.atlassian.net')
+os.environ.setdefault('PRD_PAGE_TABLE_HEADER', 'Scope')
+os.environ.setdefault('PAGE_TABLE_HEADER', 'Planned for H2')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from colorama import init, Fore, Style
+from tabulate import tabulate
+from pages import scope_page, planning_page, synthetic_projects, account_ids
+from page_parser import parse_page_html
+from page_index import PageIndex
+from main import parse_scope_table
+from create_epic import parse_planned_table
+from update_epic import resolve_page_links
+
+# Initialize colorama
+init()
+
+def parse_scope(html_content, user_map):
+    """The parsing portion of get_scope_table"""
+    index = PageIndex(parse_page_html(html_content))
+    return parse_scope_table(index, user_map, verbose=False)
+
+def parse_planned(html_content, user_map):
+    """The table and link extraction of get_planned_epics"""
+    index = PageIndex(parse_page_html(html_content))
+    rows, row_links = parse_planned_table(index, user_map)
+    return rows, resolve_page_links(row_links)
+
+def measure(func, html_content, user_map, repeat):
+    """
+    Run func(html_content, user_map) repeat times, then once more under tracemalloc.
+    Returns: (best seconds, peak traced bytes, result)
+    """
+    best = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(html_content, user_map)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        tracemalloc.start()
+        func(html_content, user_map)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak, result
+
+def run(sizes, repeat, options, users):
+    """
+    Benchmark both parsers for every page size.
+    Returns: list of result dicts
+    """
+    user_map = {account_id: {'accountId': account_id, 'displayName': f'Bench User {i}'} for i, account_id in enumerate(users)}
+    results = []
+    for size in sizes:
+        pages = [
+            ('scope', parse_scope, scope_page('Synthetic project', size, users, **options)),
+            ('planned', parse_planned, planning_page(synthetic_projects(size, users), **options))
+        ]
+        for kind, func, html_content in pages:
+            seconds, peak, result = measure(func, html_content, user_map, repeat)
+            rows = result[1] if kind == 'scope' else result[0]
+            if len(rows) != size:
+                print(f"{Fore.RED}{kind} parser returned {len(rows)} rows for a {size}-row page{Style.RESET_ALL}")
+            results.append({
+                'parser': kind,
+                'rows': size,
+                'page_bytes': len(html_content.encode('utf-8')),
+                'seconds': seconds,
+                'us_per_row': seconds / size * 1e6,
+                'peak_memory_bytes': peak
+            })
+            print(f"{Fore.CYAN}{kind:8} {size:>6} rows: {seconds * 1000:.1f} ms, peak {peak / 2 ** 20:.1f} MB{Style.RESET_ALL}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Parser microbenchmarks on synthetic Confluence pages')
+    parser.add_argument('--sizes', default='10,100,1000,10000', help='Comma-separated table row counts')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per page (best is reported)')
+    parser.add_argument('--users', type=int, default=25, help='Distinct users mentioned')
+    parser.add_argument('--mentions', type=int, default=1, help='ri:user mentions per Owner cell')
+    parser.add_argument('--links', type=int, default=0, help='Extra links per row')
+    parser.add_argument('--filler', type=int, default=0, help='Filler paragraphs before and after the table')
+    parser.add_argument('--no-status', action='store_true', help='Plain text instead of status macros')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    options = dict(mentions_per_row=args.mentions, status_macros=not args.no_status,
+                   links_per_row=args.links, filler_paragraphs=args.filler)
+    results = run(sizes, args.repeat, options, account_ids(args.users))
+
+    print(tabulate(
+        [[r['parser'], r['rows'], f"{r['page_bytes'] / 1024:.0f}", f"{r['seconds'] * 1000:.1f}", f"{r['us_per_row']:.0f}",
+          f"{r['peak_memory_bytes'] / 2 ** 20:.1f}"] for r in results],
+        headers=['Parser', 'Rows', 'Page (KB)', 'Time (ms)', 'Per row (us)', 'Peak (MB)'],
+        tablefmt="grid"
+    ))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'options': dict(options, users=args.users, repeat=args.repeat), 'results': results}, f, indent=2)
+        print(f"{Fore.GREEN}Results written to {args.json}{Style.RESET_ALL}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+End-to-end throughput benchmark against the local stub server.
+
+Starts bench/stub_server.py in-process, then runs `create_epic.py`,
+`plan.py plan` and `create_ticket.py all --yes` as subprocesses in a scratch
+directory pointed at it, and reports pages/sec and tickets/sec for each. The
+plan must list a ticket for every task, or the run fails. Results are compared
+with a stored baseline (bench/baseline.json) so a change can be measured
+offline; --save-baseline records the current numbers instead.
+
+Usage:
+  python bench/run_benchmark.py [--pages 20] [--tasks 10] [--latency 0.05]
+                                [--error-rate 0.0] [--throttle-rate 0.0]
+                                [--baseline bench/baseline.json] [--save-baseline] [--tolerance 0.2]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from colorama import init, Fore, Style
+from tabulate import tabulate
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+from stub_server import StubState, start_server, PLANNING_PAGE_ID, STUB_PROJECT
+
+# Initialize colorama
+init()
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Settings the runs are compared on; a baseline recorded with others is not comparable
+WORKLOAD_KEYS = ['pages', 'tasks', 'latency', 'error_rate', 'throttle_rate']
+
+def bench_env(base_url, workdir):
+    """Environment pointing the tools at the stub, with caches and state inside workdir"""
+    env = dict(os.environ)
+    env.update({
+        'CONFLUENCE_URL': base_url,
+        'CONFLUENCE_USERNAME': 'bench@example.com',
+        'CONFLUENCE_API_TOKEN': 'bench-token',
+        'PAGE_ID': PLANNING_PAGE_ID,
+        'JIRA_PROJECT': STUB_PROJECT,
+        'ATLASSIAN_CLOUD': 'true',  # Searches go through the Cloud /search/jql endpoint, as on a real tenant
+        'PAGE_TABLE_HEADER': 'Planned for H2',
+        'PRD_PAGE_TABLE_HEADER': 'Scope',
+        'IDS_CACHE_DIR': os.path.join(workdir, '.cache'),
+        'EPIC_REGISTRY_BACKEND': 'json',
+        'METRICS_JSON_FILE': '',
+        'TRACE_FILE': '',
+        'LOG_JSON_FILE': ''
+    })
+    return env
+
+def run_command(name, args, env, workdir, state):
+    """
+    Run one tool as a subprocess and measure it.
+    Returns: dict with 'seconds', 'returncode' and the stub counter deltas
+    """
+    before = state.stats()
+    log_path = os.path.join(workdir, f'{name}.log')
+    started = time.perf_counter()
+    with open(log_path, 'w') as log:
+        returncode = subprocess.call([sys.executable, os.path.join(REPO_DIR, args[0])] + args[1:],
+                                     cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+    seconds = time.perf_counter() - started
+    after = state.stats()
+    result = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+    result.update({'seconds': seconds, 'returncode': returncode, 'log': log_path})
+    return result
+
+def summarize(name, result, pages):
+    """Throughput figures for one command"""
+    return {
+        'seconds': round(result['seconds'], 3),
+        'pages': pages,
+        'issues_created': result.get('issues_created', 0),
+        'pages_per_sec': round(pages / result['seconds'], 3) if result['seconds'] else 0.0,
+        'tickets_per_sec': round(result.get('issues_created', 0) / result['seconds'], 3) if result['seconds'] else 0.0,
+        'requests': result.get('requests', 0),
+        'throttled': result.get('throttled', 0),
+        'server_errors': result.get('server_errors', 0)
+    }
+
+def check_plan(workdir, expected):
+    """
+    Check that plan.py planned a ticket for every task on the stub pages.
+    Returns: True if the plan file lists `expected` tickets to create
+    """
+    try:
+        with open(os.path.join(workdir, 'plan.json'), 'r') as f:
+            planned = len(json.load(f).get('tickets_to_create', []))
+    except (OSError, ValueError) as e:
+        print(f"{Fore.RED}Could not read the plan: {str(e)}{Style.RESET_ALL}")
+        return False
+    if planned != expected:
+        print(f"{Fore.RED}plan.py planned {planned} tickets, expected {expected}{Style.RESET_ALL}")
+        return False
+    return True
+
+def run_benchmark(args):
+    """
+    Run both commands against a fresh stub and scratch directory.
+    Returns: dict mapping command name -> summary, or None if a command failed
+    """
+    state = StubState()
+    server, base_url = start_server(state, latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    state.build(base_url, args.pages, args.tasks)
+    workdir = tempfile.mkdtemp(prefix='ids-bench-')
+    env = bench_env(base_url, workdir)
+    with open(os.path.join(workdir, 'epic.json'), 'w') as f:
+        json.dump([], f)
+
+    print(f"{Fore.CYAN}Stub server on {base_url}, {args.pages} pages x {args.tasks} tasks, scratch dir {workdir}{Style.RESET_ALL}")
+    results = {}
+    try:
+        # Epics first: create_epic.py fills epic.json with the project pages plan.py and create_ticket.py then walk
+        for name, command, pages in [
+            ('create_epic', ['create_epic.py'], 1),
+            ('plan', ['plan.py', 'plan', 'plan.json'], args.pages),
+            ('create_ticket', ['create_ticket.py', 'all', '--yes'], args.pages)
+        ]:
+            print(f"{Fore.CYAN}Running {' '.join(command)}...{Style.RESET_ALL}")
+            result = run_command(name, command, env, workdir, state)
+            if result['returncode'] != 0:
+                print(f"{Fore.RED}{name} exited with {result['returncode']}, see {result['log']}{Style.RESET_ALL}")
+                return None
+            if name == 'plan' and not check_plan(workdir, args.pages * args.tasks):
+                print(f"{Fore.RED}See {result['log']}{Style.RESET_ALL}")
+                return None
+            results[name] = summarize(name, result, pages)
+    finally:
+        server.shutdown()
+        if len(results) == 3 and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Print the results next to the baseline.
+    Returns: True if no throughput figure regressed by more than tolerance
+    """
+    ok = True
+    rows = []
+    for name, summary in results.items():
+        base = (baseline or {}).get('results', {}).get(name, {})
+        for metric in ('pages_per_sec', 'tickets_per_sec'):
+            current = summary[metric]
+            previous = base.get(metric)
+            if not previous:
+                rows.append([name, metric, f"{current:.2f}", '-', '-'])
+                continue
+            change = (current - previous) / previous
+            color = Fore.GREEN if change >= 0 else (Fore.RED if change < -tolerance else Fore.YELLOW)
+            if change < -tolerance:
+                ok = False
+            rows.append([name, metric, f"{current:.2f}", f"{previous:.2f}", f"{color}{change:+.1%}{Style.RESET_ALL}"])
+    print(tabulate(rows, headers=['Command', 'Metric', 'Current', 'Baseline', 'Change'], tablefmt="grid"))
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end throughput benchmark against a local Confluence/Jira stub')
+    parser.add_argument('--pages', type=int, default=20, help='Project pages (one epic and one scope table each)')
+    parser.add_argument('--tasks', type=int, default=10, help='Tasks per scope table')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mean stub response latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file to compare with / save to')
+    parser.add_argument('--save-baseline', action='store_true', help='Record this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed throughput drop before failing (fraction)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directory (logs, epic.json, caches)')
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    if results is None:
+        sys.exit(1)
+
+    print(f"\n{Fore.MAGENTA}{'='*80}{Style.RESET_ALL}")
+    print(tabulate(
+        [[name, s['seconds'], s['pages'], s['issues_created'], s['pages_per_sec'], s['tickets_per_sec'], s['requests'], s['throttled'], s['server_errors']]
+         for name, s in results.items()],
+        headers=['Command', 'Seconds', 'Pages', 'Issues', 'Pages/s', 'Tickets/s', 'Requests', '429s', '5xx'],
+        tablefmt="grid"
+    ))
+
+    workload = {key: getattr(args, key) for key in WORKLOAD_KEYS}
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'workload': workload, 'results': results}, f, indent=2)
+        print(f"{Fore.GREEN}Baseline written to {args.baseline}{Style.RESET_ALL}")
+        return
+
+    try:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"{Fore.YELLOW}No baseline at {args.baseline}; run with --save-baseline to record one{Style.RESET_ALL}")
+        return
+    if baseline.get('workload') != workload:
+        print(f"{Fore.YELLOW}Warning: baseline was recorded with {baseline.get('workload')}, this run used {workload}{Style.RESET_ALL}")
+    if not compare_with_baseline(results, baseline, args.tolerance):
+        print(f"{Fore.RED}Throughput regressed by more than {args.tolerance:.0%} against the baseline{Style.RESET_ALL}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+"""
+Local stand-in for the Confluence and Jira REST endpoints the tools use.
+
+Serves generated pages (get page with body.storage/version), users (single
+and bulk lookups), tiny-link redirects, issue create/bulk create/update and
+the JQL searches used for duplicate detection and epic diffs (both the
+Server/DC /search and the Cloud /search/jql with page tokens, which like
+Jira Cloud returns descriptions as Atlassian Document Format). Latency, server
+errors and 429 throttling can be injected to exercise retries and rate
+limiting. Nothing leaves the machine, so runs can be benchmarked offline.
+
+Usage:
+  python bench/stub_server.py [--port 8089] [--pages 20] [--tasks 10]
+                              [--latency 0.05] [--error-rate 0.0] [--throttle-rate 0.0]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pages import scope_page, planning_page, tiny_link_code, account_ids
+
+PLANNING_PAGE_ID = '900000001'
+FIRST_PROJECT_PAGE_ID = 910000001
+STUB_PROJECT = 'BENCH'
+
+_CONTENT_PATH = re.compile(r'^(?:/wiki)?/rest/api/content/(\d+)$')
+_TINY_LINK_PATH = re.compile(r'^/wiki/x/([A-Za-z0-9_-]+)$')
+_PAGE_PATH = re.compile(r'^/wiki/spaces/[^/]+/pages/(\d+)')
+_ISSUE_PATH = re.compile(r'^/rest/api/[23]/issue/([A-Z][A-Z0-9]*-\d+)$')
+_JQL_CLAUSE = re.compile(r'(\w+)\s*(!=|=|in)\s*(\([^)]*\)|"[^"]*"|\S+)', re.IGNORECASE)
+
+class StubState:
+    """Pages, users, tiny links and created issues, plus request counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}       # page ID -> {'title', 'body', 'version'}
+        self.users = {}       # account ID -> display name
+        self.tiny_links = {}  # opaque code -> page ID (codes that cannot be decoded locally)
+        self.issues = {}      # key -> {'id', 'key', 'fields'}
+        self.counters = {}
+        self.next_issue_id = 10000
+
+    def build(self, base_url, page_count=20, task_count=10, user_count=25, seed=0):
+        """Generate the planning page and page_count project pages, linked through base_url"""
+        rng = random.Random(seed)
+        users = account_ids(user_count)
+        self.users = {account_id: f'Bench User {i}' for i, account_id in enumerate(users)}
+        projects = []
+        for i in range(page_count):
+            page_id = str(FIRST_PROJECT_PAGE_ID + i)
+            name = f'KP{i + 1}.1: Benchmark project {i + 1}'
+            self.pages[page_id] = {
+                'title': name,
+                'body': scope_page(name, task_count, rng.sample(users, min(5, len(users))), seed=seed + i),
+                'version': 1
+            }
+            # Half the links decode locally, the other half need a HEAD request through the redirect
+            if i % 2 == 0:
+                code = tiny_link_code(page_id)
+            else:
+                code = 'tinylink' + ''.join(chr(ord('a') + int(digit)) for digit in f'{i:05d}')  # Too long to decode, no digits
+                self.tiny_links[code] = page_id
+            projects.append({'name': name, 'owner': rng.choice(users), 'link': f'{base_url}/wiki/x/{code}'})
+        self.pages[PLANNING_PAGE_ID] = {'title': 'IDS H2 planning', 'body': planning_page(projects, seed=seed), 'version': 1}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, issues=len(self.issues))
+
+    def create_issue(self, fields):
+        with self.lock:
+            self.next_issue_id += 1
+            issue_id = str(self.next_issue_id)
+            key = f"{(fields.get('project') or {}).get('key') or STUB_PROJECT}-{self.next_issue_id}"
+            self.issues[key] = {'id': issue_id, 'key': key, 'fields': dict(fields)}
+            self.counters['issues_created'] = self.counters.get('issues_created', 0) + 1
+            return {'id': issue_id, 'key': key, 'self': f'/rest/api/2/issue/{issue_id}'}
+
+    def search(self, jql, start, limit):
+        """Evaluate the `field = value` / `field != value` / `field in (...)` clauses joined by AND that the tools send"""
+        clauses = []
+        for field, operator, value in _JQL_CLAUSE.findall(jql):
+            if value.startswith('('):
+                values = {item.strip().strip('"') for item in value[1:-1].split(',')}
+            else:
+                values = {value.strip('"')}
+            clauses.append((field.lower(), operator == '!=', values))
+        with self.lock:
+            matches = [issue for issue in self.issues.values()
+                       if all(_issue_matches(issue, field, values) != negated for field, negated, values in clauses)]
+        return {
+            'startAt': start,
+            'maxResults': limit,
+            'total': len(matches),
+            'issues': [_issue_json(issue) for issue in matches[start:start + limit]]
+        }
+
+    def search_jql(self, jql, next_page_token, limit):
+        """Cloud enhanced search: same matching, paginated with nextPageToken/isLast instead of startAt/total"""
+        start = int(next_page_token or 0)
+        result = self.search(jql, start, limit)
+        is_last = start + limit >= result['total']
+        for issue in result['issues']:
+            if isinstance(issue['fields'].get('description'), str):
+                issue['fields']['description'] = _adf_document(issue['fields']['description'])
+        response = {'issues': result['issues'], 'isLast': is_last}
+        if not is_last:
+            response['nextPageToken'] = str(start + limit)
+        return response
+
+def _issue_matches(issue, field, values):
+    fields = issue['fields']
+    if field == 'key':
+        return issue['key'] in values
+    if field == 'project':
+        return (fields.get('project') or {}).get('key') in values
+    if field == 'labels':
+        return bool(values & set(fields.get('labels') or []))
+    if field == 'issuetype':
+        return (fields.get('issuetype') or {}).get('name') in values
+    return True
+
+_WIKI_BOLD_LINE = re.compile(r'^\*([^*]+)\*$')
+
+def _adf_inline(line):
+    """ADF inline nodes for one line of wiki markup: bold lines, bare URLs as link cards, text"""
+    match = _WIKI_BOLD_LINE.match(line)
+    if match:
+        return [{'type': 'text', 'text': match.group(1), 'marks': [{'type': 'strong'}]}]
+    if re.match(r'^https?://\S+$', line):
+        return [{'type': 'inlineCard', 'attrs': {'url': line}}]
+    return [{'type': 'text', 'text': line}]
+
+def _adf_document(text):
+    """Wiki markup description as the ADF document Jira Cloud's v3 API returns for it"""
+    paragraphs = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        content = []
+        for line in (line.strip() for line in block.splitlines()):
+            if line:
+                content.extend(([{'type': 'hardBreak'}] if content else []) + _adf_inline(line))
+        if content:
+            paragraphs.append({'type': 'paragraph', 'content': content})
+    return {'type': 'doc', 'version': 1, 'content': paragraphs}
+
+def _issue_json(issue):
+    fields = dict(issue['fields'])
+    if fields.get('assignee'):
+        fields['assignee'] = {'accountId': fields['assignee'].get('id') or fields['assignee'].get('accountId')}
+    return {'id': issue['id'], 'key': issue['key'], 'self': f"/rest/api/2/issue/{issue['id']}", 'fields': fields}
+
+def make_handler(state, latency=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1):
+    """Build a request handler class bound to a StubState and fault injection settings"""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=None, headers=None):
+            payload = json.dumps(body).encode('utf-8') if body is not None else b''
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if body is not None:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(payload)
+            state.count('bytes_sent', len(payload))
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            return json.loads(raw) if raw else {}
+
+        def _inject_faults(self):
+            """Returns True if the request was answered with an injected fault"""
+            if latency:
+                time.sleep(random.uniform(latency * 0.5, latency * 1.5))
+            roll = random.random()
+            if roll < throttle_rate:
+                state.count('throttled')
+                self._send(429, {'message': 'Rate limit exceeded'}, {'Retry-After': str(retry_after)})
+                return True
+            if roll < throttle_rate + error_rate:
+                state.count('server_errors')
+                self._send(503, {'message': 'Injected failure'})
+                return True
+            return False
+
+        def _dispatch(self):
+            url = urlsplit(self.path)
+            path, query = url.path, parse_qs(url.query)
+            if path == '/__stats':
+                return self._send(200, state.stats())
+            # Bodies must be drained before answering so the connection can be reused
+            body = self._read_json() if self.command in ('POST', 'PUT') else None
+            state.count('requests')
+            if self._inject_faults():
+                return
+            route = getattr(self, f'_{self.command.lower()}', None)
+            if route is None or not route(path, query, body):
+                state.count('not_found')
+                self._send(404, {'message': f'No stub for {self.command} {path}'})
+
+        do_GET = do_HEAD = do_POST = do_PUT = _dispatch
+
+        def _get(self, path, query, body):
+            match = _CONTENT_PATH.match(path)
+            if match:
+                page = state.pages.get(match.group(1))
+                if page is None:
+                    return False
+                state.count('pages_served')
+                result = {'id': match.group(1), 'type': 'page', 'title': page['title'], 'version': {'number': page['version']}}
+                if 'body.storage' in ','.join(query.get('expand', [])):
+                    state.count('page_bodies_served')
+                    result['body'] = {'storage': {'value': page['body'], 'representation': 'storage'}}
+                self._send(200, result)
+                return True
+            if path == '/wiki/rest/api/user':
+                account_id = (query.get('accountId') or [''])[0]
+                if account_id not in state.users:
+                    return False
+                state.count('user_lookups')
+                self._send(200, {'accountId': account_id, 'displayName': state.users[account_id]})
+                return True
+            if path == '/wiki/rest/api/user/bulk':
+                state.count('user_bulk_lookups')
+                results = [{'accountId': account_id, 'displayName': state.users[account_id]}
+                           for account_id in query.get('accountId', []) if account_id in state.users]
+                self._send(200, {'results': results, 'size': len(results)})
+                return True
+            if path in ('/rest/api/2/search', '/rest/api/3/search'):
+                state.count('searches')
+                start = int((query.get('startAt') or ['0'])[0])
+                limit = int((query.get('maxResults') or ['50'])[0])
+                self._send(200, state.search((query.get('jql') or [''])[0], start, limit))
+                return True
+            if path == '/rest/api/3/search/jql':
+                state.count('searches')
+                limit = int((query.get('maxResults') or ['50'])[0])
+                self._send(200, state.search_jql((query.get('jql') or [''])[0], (query.get('nextPageToken') or [None])[0], limit))
+                return True
+            return self._head(path, query, body)
+
+        def _head(self, path, query, body):
+            match = _TINY_LINK_PATH.match(path)
+            if match and match.group(1) in state.tiny_links:
+                state.count('tiny_link_redirects')
+                page_id = state.tiny_links[match.group(1)]
+                self._send(302, headers={'Location': f'/wiki/spaces/BENCH/pages/{page_id}/Project+page'})
+                return True
+            if _PAGE_PATH.match(path):
+                self._send(200, {})
+                return True
+            return False
+
+        def _post(self, path, query, body):
+            if path in ('/rest/api/2/issue', '/rest/api/3/issue'):
+                self._send(201, state.create_issue(body.get('fields', {})))
+                return True
+            if path in ('/rest/api/2/issue/bulk', '/rest/api/3/issue/bulk'):
+                state.count('bulk_creates')
+                issues = [state.create_issue(update.get('fields', {})) for update in body.get('issueUpdates', [])]
+                self._send(201, {'issues': issues, 'errors': []})
+                return True
+            if path in ('/rest/api/2/search', '/rest/api/3/search'):
+                state.count('searches')
+                self._send(200, state.search(body.get('jql', ''), int(body.get('startAt', 0)), int(body.get('maxResults', 50))))
+                return True
+            if path == '/rest/api/3/search/jql':
+                state.count('searches')
+                self._send(200, state.search_jql(body.get('jql', ''), body.get('nextPageToken'), int(body.get('maxResults', 50))))
+                return True
+            return False
+
+        def _put(self, path, query, body):
+            match = _ISSUE_PATH.match(path)
+            if not match or match.group(1) not in state.issues:
+                return False
+            with state.lock:
+                state.issues[match.group(1)]['fields'].update(body.get('fields', {}))
+            state.count('issues_updated')
+            self._send(204)
+            return True
+
+    return StubHandler
+
+def start_server(state, port=0, **faults):
+    """
+    Serve a StubState on a background thread.
+    Args:
+        faults: latency, error_rate, throttle_rate and retry_after for make_handler
+    Returns: (server, base_url)
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state, **faults))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Confluence/Jira stand-in for benchmarks')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--pages', type=int, default=20, help='Project pages (and KP rows on the planning page)')
+    parser.add_argument('--tasks', type=int, default=10, help='Tasks in each project page scope table')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mean response latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    state = StubState()
+    server, base_url = start_server(state, args.port, latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    state.build(base_url, args.pages, args.tasks)
+    print(f"Stub Confluence/Jira listening on {base_url}")
+    print(f"  CONFLUENCE_URL={base_url} PAGE_ID={PLANNING_PAGE_ID} JIRA_PROJECT={STUB_PROJECT} "
+          f"PAGE_TABLE_HEADER='Planned for H2' PRD_PAGE_TABLE_HEADER=Scope")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
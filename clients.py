@@ -0,0 +1,58 @@
+"""
+Shared HTTP session and Atlassian clients for IDS automation tools
+
+requests, atlassian and the rate limiter are imported on first use, so
+commands that never make a request (--help, page listing) start quickly.
+"""
+import threading
+from config import HTTP_POOL_SIZE, ATLASSIAN_CLOUD
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+
+def get_session():
+    """
+    Get the process-wide pooled requests.Session.
+    Connections are kept alive and reused across every Jira and Confluence call,
+    and every request is scheduled through its host's rate limiter.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from rate_limit import RateLimitedAdapter
+            session = requests.Session()
+            adapter = RateLimitedAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+def _get_client(client_class, url, username, api_token, **options):
+    """Build or reuse an Atlassian client bound to the shared session"""
+    session = get_session()
+    key = (client_class.__name__, url, username)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = client_class(
+                url=url,
+                username=username,
+                password=api_token,
+                session=session,
+                **options
+            )
+            _clients[key] = client
+        return client
+
+def get_jira(url, username, api_token):
+    """Get the shared Jira client for the given URL and credentials"""
+    from atlassian import Jira
+    # Jira does not detect Cloud from the URL; without it searches go to the v2 endpoint Cloud has removed
+    return _get_client(Jira, url, username, api_token, cloud=ATLASSIAN_CLOUD)
+
+def get_confluence(url, username, api_token):
+    """Get the shared Confluence client for the given URL and credentials"""
+    from atlassian import Confluence
+    return _get_client(Confluence, url, username, api_token)
@@ -2,11 +2,26 @@
 Shared configuration for IDS automation tools
 """
 import os
-from dotenv import load_dotenv
+from urllib.parse import urlsplit
 from colorama import Fore, Style
 
-# Load environment variables
-load_dotenv()
+def _find_env_file():
+    """Find .env in this directory or the nearest parent, as dotenv's find_dotenv does"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+# Load environment variables (dotenv is only imported when there is a file to load)
+_env_file = _find_env_file()
+if _env_file:
+    from dotenv import load_dotenv
+    load_dotenv(_env_file)
 
 # Confluence configuration
 CONFLUENCE_URL = os.getenv('CONFLUENCE_URL')
@@ -22,10 +37,101 @@ PRD_PAGE_TABLE_HEADER = os.getenv('PRD_PAGE_TABLE_HEADER')  # For main.py
 JIRA_URL = os.getenv('CONFLUENCE_URL')
 JIRA_PROJECT = os.getenv('JIRA_PROJECT')
 
+# Atlassian Cloud - searches use /rest/api/3/search/jql (the v2 search is gone on Cloud);
+# detected from an *.atlassian.net URL unless set
+def _is_cloud_url(url):
+    """Whether a site URL is an Atlassian Cloud host"""
+    hostname = urlsplit(url or '').hostname or ''
+    return hostname.endswith(('.atlassian.net', '.jira.com'))
+
+ATLASSIAN_CLOUD = os.getenv('ATLASSIAN_CLOUD', str(_is_cloud_url(CONFLUENCE_URL))).lower() in ('1', 'true', 'yes')
+
+# HTTP configuration - size of the shared keep-alive connection pool
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+
+# Per-host rate limiting - token bucket, 429 retries and AIMD concurrency bounds
+RATE_LIMIT_REQUESTS_PER_SECOND = float(os.getenv('RATE_LIMIT_REQUESTS_PER_SECOND', '10'))
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', '20'))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '5'))
+ADAPTIVE_CONCURRENCY_MIN = int(os.getenv('ADAPTIVE_CONCURRENCY_MIN', '1'))
+ADAPTIVE_CONCURRENCY_MAX = int(os.getenv('ADAPTIVE_CONCURRENCY_MAX', str(HTTP_POOL_SIZE)))
+ADAPTIVE_LATENCY_TARGET = float(os.getenv('ADAPTIVE_LATENCY_TARGET', '2.0'))  # Seconds
+
+# Jira write retries - attempts, full-jitter exponential backoff (seconds) and circuit breaker
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '4'))
+RETRY_BACKOFF_BASE = float(os.getenv('RETRY_BACKOFF_BASE', '1.0'))
+RETRY_BACKOFF_MAX = float(os.getenv('RETRY_BACKOFF_MAX', '30'))
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5'))
+CIRCUIT_BREAKER_RESET = float(os.getenv('CIRCUIT_BREAKER_RESET', '60'))  # Seconds before a trial call
+
+# Jira bulk create - issues per request (Jira allows at most 50)
+JIRA_BULK_CREATE_SIZE = min(int(os.getenv('JIRA_BULK_CREATE_SIZE', '50')), 50)
+
+# Confluence user lookups - account IDs per bulk request
+USER_BULK_CHUNK_SIZE = int(os.getenv('USER_BULK_CHUNK_SIZE', '100'))
+
+# Jira searches (existing automation tickets) - issues per page
+JIRA_SEARCH_PAGE_SIZE = int(os.getenv('JIRA_SEARCH_PAGE_SIZE', '100'))
+
+# Concurrent resolution of Confluence links that cannot be decoded locally
+LINK_RESOLVE_WORKERS = int(os.getenv('LINK_RESOLVE_WORKERS', '8'))
+
+# "All pages" run - background prefetch of upcoming pages' scope tables
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '2'))
+PREFETCH_DEPTH = int(os.getenv('PREFETCH_DEPTH', '3'))  # Pages fetched ahead of the one under review
+
+# plan.py - default plan file and worker threads used by apply
+PLAN_FILE = os.getenv('PLAN_FILE', 'plan.json')
+APPLY_WORKERS = int(os.getenv('APPLY_WORKERS', '4'))
+
+# create_ticket.py --yes - pages fetched and processed in parallel
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+
+# asyncio pipeline (pipeline.py) - workers per stage and queue depth between stages
+PIPELINE_FETCH_CONCURRENCY = int(os.getenv('PIPELINE_FETCH_CONCURRENCY', '8'))
+PIPELINE_PARSE_CONCURRENCY = int(os.getenv('PIPELINE_PARSE_CONCURRENCY', '2'))
+PIPELINE_RESOLVE_CONCURRENCY = int(os.getenv('PIPELINE_RESOLVE_CONCURRENCY', '4'))
+PIPELINE_CREATE_CONCURRENCY = int(os.getenv('PIPELINE_CREATE_CONCURRENCY', '4'))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '8'))
+
+# Local cache configuration
+CACHE_DIR = os.getenv('IDS_CACHE_DIR', '.cache')
+USER_CACHE_ENABLED = os.getenv('USER_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', str(7 * 24 * 3600)))  # Seconds
+USER_CACHE_MEMORY_SIZE = int(os.getenv('USER_CACHE_MEMORY_SIZE', '1024'))
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+# Run journal (CACHE_DIR/runs) - fsync after this many records or seconds, whichever comes first
+RUN_JOURNAL_FSYNC_BATCH = int(os.getenv('RUN_JOURNAL_FSYNC_BATCH', '20'))
+RUN_JOURNAL_FSYNC_INTERVAL = float(os.getenv('RUN_JOURNAL_FSYNC_INTERVAL', '2.0'))
+
+# Logging - console level ('debug', 'info', 'warning'), optional JSON-lines file and its level
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'info')
+LOG_JSON_FILE = os.getenv('LOG_JSON_FILE', '')
+LOG_JSON_LEVEL = os.getenv('LOG_JSON_LEVEL', 'info')
+
+# Run metrics - summary table at exit, optional JSON export, tracemalloc peak memory (slows the run)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+METRICS_JSON_FILE = os.getenv('METRICS_JSON_FILE', '')
+METRICS_TRACE_MEMORY = os.getenv('METRICS_TRACE_MEMORY', 'false').lower() in ('1', 'true', 'yes')
+
+# Span tracing - Chrome Trace Event JSON file to write (empty to disable)
+TRACE_FILE = os.getenv('TRACE_FILE', '')
+
+# HTML parser backend for page bodies: 'lxml' (default, faster) or 'html.parser'
+HTML_PARSER = os.getenv('HTML_PARSER', 'lxml')
+
+# Epic registry backend: 'json' (epic.json) or 'sqlite' (row-level writes, safe across processes)
+EPIC_REGISTRY_BACKEND = os.getenv('EPIC_REGISTRY_BACKEND', 'json').lower()
+EPIC_REGISTRY_DB = os.getenv('EPIC_REGISTRY_DB', 'epic.db')
+
 # Issue types - different scripts create different types
 EPIC_ISSUE_TYPE = "Epic"
 TASK_ISSUE_TYPE = "Task"
 
+# Label on every issue the tools create (epics and tickets)
+AUTOMATION_LABEL = "ids-automation"
+
 # Validation function
 def validate_epic_config():
     """Validate that all required configuration is present for create_epic.py"""
@@ -79,4 +185,22 @@ def handle_help_request(usage_lines):
         for line in usage_lines:
             print(f"  {line}")
         return True
-    return False 
\ No newline at end of file
+    return False
+
+def pop_flag(flag):
+    """Remove a boolean flag from the command line, returning whether it was present"""
+    import sys
+    if flag in sys.argv[1:]:
+        sys.argv.remove(flag)
+        return True
+    return False
+
+def pop_option(flag):
+    """Remove a flag and its value from the command line, returning the value (or None)"""
+    import sys
+    if flag in sys.argv[1:-1]:
+        index = sys.argv.index(flag)
+        value = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+        return value
+    return None
@@ -1,267 +1,359 @@
-from atlassian import Confluence
+import logging
 import re
-from bs4 import BeautifulSoup
 from colorama import init, Fore, Style
-from tabulate import tabulate
-import requests
 import json
-from main import get_user_details, extract_tagged_users  # Import the functions from main.py
+from main import get_user_details, extract_tagged_users, collect_page_users  # Import the functions from main.py
 from update_epic import *
 from config import *
+from page_parser import parse_page_html
+from page_index import PageIndex
+from epic_registry import get_epic_registry
+from clients import get_confluence
+from user_cache import apply_user_cache_flags
+from page_cache import get_page_version, load_cached_page, store_cached_page, apply_page_cache_flags
+from run_journal import start_run, record_done, get_done
+from log import get_logger, color, apply_logging_flags
+from metrics import stage, apply_metrics_flags
+from tracing import trace_tags, apply_tracing_flags
 
 # Initialize colorama
 init()
 
+logger = get_logger('create_epic')
+
 # Jira functions are now imported from update_epic module
 
 def get_planned_epics():
     """
     Fetch and parse the table under "Planned for H2" from the Confluence page.
     """
-    # Load existing epic data
-    epic_data = load_epic_json()
-    
-    # Initialize Confluence client
-    confluence = Confluence(
-        url=CONFLUENCE_URL,
-        username=USERNAME,
-        password=API_TOKEN
-    )
+    result = load_planned_rows()
+    if result:
+        process_planned_rows(*result)
+
+def load_planned_rows():
+    """
+    Fetch the planning page (or reuse its cached parse) and parse the "Planned for H2" table.
+    Returns: (rows, row_links) as returned by parse_planned_table, or None on failure
+    """
+    # Reuse the cached parse if the planning page has not changed since it was stored
+    with stage('confluence.page_version'):
+        version = get_page_version(PAGE_ID)
+    cached = load_cached_page(PAGE_ID, 'planned', version)
+    if cached:
+        return cached['rows'], cached['row_links']
+
+    # Get the shared Confluence client, only needed when the page has to be fetched
+    confluence = get_confluence(CONFLUENCE_URL, USERNAME, API_TOKEN)
 
     # Get page content
-    page_content = confluence.get_page_by_id(page_id=PAGE_ID, expand="body.storage")
+    with stage('confluence.page_fetch'):
+        page_content = confluence.get_page_by_id(page_id=PAGE_ID, expand="body.storage,version")
     if not page_content:
         print(f"{Fore.RED}Failed to fetch Confluence page content.{Style.RESET_ALL}")
-        return
+        return None
 
     # Get the HTML content
     html_content = page_content.get('body', {}).get('storage', {}).get('value', '')
     
-    # Parse HTML with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # Parse only the headings, paragraphs and tables, then index them in one pass
+    with stage('parse.html'):
+        index = PageIndex(parse_page_html(html_content))
+
+    # Resolve all tagged users on the page up front
+    with stage('users.bulk'):
+        user_map = collect_page_users(index, CONFLUENCE_URL, USERNAME, API_TOKEN)
+
+    with stage('parse.planned_table'):
+        result = parse_planned_table(index, user_map)
+    if not result:
+        return None
+    rows, row_links = result
+    store_cached_page(PAGE_ID, 'planned', page_content.get('version', {}).get('number'), {
+        'rows': rows,
+        'row_links': row_links
+    })
+    return rows, row_links
+
+def build_epic_details(row):
+    """Project details used for epic operations, from a parsed planning table row"""
+    return {
+        'Project': row[0],
+        'Priority': row[2],
+        'Description': row[3],  # Note column
+        'Owner': row[4],  # Owner display name
+        'Owner Account ID': row[-1],  # Owner account ID (last element)
+        'Success Measures': row[5],  # Success measure(s)
+        'Link': row[6] if len(row) > 6 else 'No link'  # Link if available
+    }
+
+def log_epic_details(details):
+    """Log the project details an epic is created from (debug level)"""
+    logger.debug("KP Project Details:\n%s", '\n'.join(f"{name}: {value}" for name, value in details.items()))
+
+def is_confluence_link(link_url):
+    """Whether a link looks like it points at a Confluence page"""
+    return bool(link_url) and ('confluence' in link_url.lower() or '/pages/' in link_url or 'pageId=' in link_url or '/wiki/x/' in link_url)
+
+def find_row_confluence_link(row_index, title, link_cells):
+    """
+    Find the first Confluence link in a table row's cells.
+    Args:
+        link_cells: the row's Cells from the page index
+    Returns: the link URL, or None if the row has no Confluence link
+    """
+    logger.debug("Found %d cells in row %d for project: %s", len(link_cells), row_index, title)
+    
+    # Try to find links in multiple columns, not just column 6
+    for col_idx in range(len(link_cells)):
+        link_cell = link_cells[col_idx]
+        link_element = link_cell.element.find('a')
+        if link_element:
+            link_url = link_element.get('href', '')
+            if is_confluence_link(link_url):
+                logger.debug("Found Confluence link in column %d: %s", col_idx, link_url)
+                return link_url
+            else:
+                logger.debug("Found non-Confluence link in column %d: %s", col_idx, link_url)
     
+    logger.warning("No Confluence link found in any column for project: %s", title)
+    # Debug: show all cell contents
+    if logger.isEnabledFor(logging.DEBUG):
+        for col_idx, cell in enumerate(link_cells):
+            if cell.text:
+                logger.debug("  Column %d: %s...", col_idx, cell.text[:50])
+    return None
+
+def parse_planned_table(index, user_map=None):
+    """
+    Extract the rows of the "Planned for H2" table from an indexed page.
+    Args:
+        index: PageIndex of the planning page's storage body
+        user_map: Pre-resolved users from collect_page_users
+    Returns:
+        (rows, row_links) tuple where row_links[i] is the Confluence link of KP row i (or None),
+        or None if the header or table is missing
+    """
     # Debug print all headers to see what we're working with
-    print(f"\n{Fore.YELLOW}Debug - All Headers:{Style.RESET_ALL}")
-    for header in soup.find_all(['h1', 'h2', 'h3']):
-        print(f"Header level {header.name}: {header.get_text(strip=True)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("All headers:")
+        for header in index.headings:
+            if header.name in ('h1', 'h2', 'h3'):
+                logger.debug("Header level %s: %s", header.name, header.get_text(strip=True))
     
     # Try different ways to find the header
     planned_header = None
     
     # Method 1: Direct h1 search
-    planned_header = soup.find('h1', string=PAGE_TABLE_HEADER)
+    planned_header = index.find_heading('h1', PAGE_TABLE_HEADER)
     
     # Method 2: Case-insensitive search
     if not planned_header:
-        planned_header = soup.find('h1', string=lambda text: text and PAGE_TABLE_HEADER.lower() in text.lower())
+        planned_header = index.find_heading('h1', lambda text: text and PAGE_TABLE_HEADER.lower() in text.lower())
     
     # Method 3: Partial match
     if not planned_header:
-        planned_header = soup.find('h1', string=lambda text: text and 'planned' in text.lower())
+        planned_header = index.find_heading('h1', lambda text: text and 'planned' in text.lower())
     
     if not planned_header:
         print(f"{Fore.RED}Could not find '{PAGE_TABLE_HEADER}' header{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}Debug - HTML content around headers:{Style.RESET_ALL}")
-        # Print some HTML content to help debug
-        for header in soup.find_all(['h1', 'h2', 'h3']):
-            print(f"\nHeader: {header}")
-            print(f"Next element: {header.next_sibling}")
-        return
+        # Log some HTML content to help debug
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("HTML content around headers:")
+            for header in index.headings:
+                if header.name not in ('h1', 'h2', 'h3'):
+                    continue
+                logger.debug("Header: %s\nNext element: %s", header, header.next_sibling)
+        return None
     
     print(f"\n{Fore.GREEN}Found header: {planned_header.get_text(strip=True)}{Style.RESET_ALL}")
     
     # Find the next table after the header
-    table = planned_header.find_next('table')
+    table = index.table_after(planned_header)
     if not table:
         print(f"{Fore.RED}Could not find table under '{PAGE_TABLE_HEADER}' header{Style.RESET_ALL}")
-        return
-    
-    # Extract table data
-    headers = [th.get_text(strip=True) for th in table.find_all('th')]
+        return None
     
     rows = []
-    for row in table.find_all('tr')[1:]:  # Skip header row
+    row_links = []
+    for row in table.rows:
         cells = []
         owner_account_id = None
-        for i, td in enumerate(row.find_all('td')):
+        for i, cell in enumerate(row):
             if i == 4:  # Owner column (4th column)
                 # Get the first user element for account ID
-                user_element = td.find('ri:user')
+                user_element = cell.element.find('ri:user')
                 if user_element:
                     owner_account_id = user_element.get('ri:account-id')
                 # Get display names for display
-                users = extract_tagged_users(td, CONFLUENCE_URL, USERNAME, API_TOKEN)
+                users = extract_tagged_users(cell.element, CONFLUENCE_URL, USERNAME, API_TOKEN, user_map)
                 owner_text = ', '.join(users) if users else ''
                 cells.append(owner_text)
-            elif i == 3:  # Note column (5th column)
-                cells.append(td.get_text(strip=True))
             else:
-                cells.append(td.get_text(strip=True))
+                cells.append(cell.text)
         if cells:
             # Add the owner account ID as the last element
             cells.append(owner_account_id)
+            # Only KP rows need their project page link, found from the cells already in hand
+            row_links.append(find_row_confluence_link(len(rows), cells[0], row) if "KP" in cells[0] else None)
             rows.append(cells)
 
+    return rows, row_links
+
+def process_planned_page(index, user_map=None):
+    """
+    Create or update Jira Epics for the KP projects in the "Planned for H2" table of an indexed page.
+    Args:
+        index: PageIndex of the planning page's storage body
+        user_map: Pre-resolved users from collect_page_users
+    """
+    result = parse_planned_table(index, user_map)
+    if result:
+        process_planned_rows(*result)
+
+def restore_journaled_epic(registry, project_name, record):
+    """
+    Make sure an epic created earlier in a resumed run is in the registry, since
+    epic.json is only written once all rows are processed.
+    Returns: True if the registry changed
+    """
+    jira_key = record.get('jira_key')
+    if not jira_key:
+        return False
+    entry = registry.find_by_project(project_name)
+    if entry:
+        return registry.update_entry(entry, confluence_page_id=record.get('page_id'), jira_epic_id=jira_key)
+    registry.add_entry(project_name, record.get('page_id'), jira_key)
+    return True
+
+def process_planned_rows(rows, row_links):
+    """
+    Create or update Jira Epics for the KP projects among the parsed planning table rows.
+    Args:
+        rows: Parsed table rows (owner account ID as the last element)
+        row_links: Confluence link per row, as returned by parse_planned_table
+    """
+    # Load existing epic data (indexed, loaded once per process)
+    registry = get_epic_registry()
+
+    # Turn every project link into a page ID up front (tiny links decode locally)
+    link_page_ids = resolve_page_links(row_links, USERNAME, API_TOKEN)
+
+    # Fetch every existing epic in one search so unchanged epics are not rewritten
+    existing_keys = [(registry.find_by_project(row[0]) or {}).get('jira_epic_id') for row in rows if "KP" in row[0]]
+    current_epics = fetch_epic_fields(existing_keys, JIRA_URL, USERNAME, API_TOKEN)
+
     # Create Jira Epics for each row
     if rows:
         print(f"\n{Fore.YELLOW}Processing KP projects...{Style.RESET_ALL}")
         kp_count = 0
         updated = False
         
-        # Get the table rows again to extract links
-        table_rows = table.find_all('tr')[1:]  # Skip header row
-        
         for i, row in enumerate(rows):
             # Check if the project title includes "KP"
             if "KP" in row[0]:
-                print(f"\n{Fore.CYAN}Found KP project: {row[0]}{Style.RESET_ALL}")
+                logger.info("Found KP project: %s", row[0], extra=color(Fore.CYAN))
                 # create_jira_epic(row, dri_account_id)
                 kp_count += 1
+
+                # Skip projects already handled earlier in a resumed run
+                journaled = get_done('epic', row[0])
+                if journaled:
+                    logger.info("Already %s epic %s in this run, skipping", journaled.get('action'), journaled.get('jira_key'), extra=color(Fore.GREEN))
+                    if restore_journaled_epic(registry, row[0], journaled):
+                        updated = True
+                    continue
                 
-                # Extract page ID from the link in the corresponding table row
-                project_page_id = None
-                if i < len(table_rows):
-                    table_row = table_rows[i]
-                    # Find the link column (usually the last column with links)
-                    link_cells = table_row.find_all('td')
-                    print(f"{Fore.CYAN}Debug - Found {len(link_cells)} cells in row {i} for project: {row[0]}{Style.RESET_ALL}")
-                    
-                    # Try to find links in multiple columns, not just column 6
-                    link_found = False
-                    for col_idx in range(len(link_cells)):
-                        link_cell = link_cells[col_idx]
-                        link_element = link_cell.find('a')
-                        if link_element:
-                            link_url = link_element.get('href', '')
-                            if link_url and ('confluence' in link_url.lower() or '/pages/' in link_url or 'pageId=' in link_url or '/wiki/x/' in link_url):
-                                print(f"{Fore.CYAN}Debug - Found Confluence link in column {col_idx}: {link_url}{Style.RESET_ALL}")
-                                project_page_id = extract_page_id_from_link(link_url, USERNAME, API_TOKEN)
-                                link_found = True
-                                break
-                            else:
-                                print(f"{Fore.YELLOW}Debug - Found non-Confluence link in column {col_idx}: {link_url}{Style.RESET_ALL}")
-                    
-                    if not link_found:
-                        print(f"{Fore.YELLOW}No Confluence link found in any column for project: {row[0]}{Style.RESET_ALL}")
-                        # Debug: show all cell contents
-                        for col_idx, cell in enumerate(link_cells):
-                            cell_text = cell.get_text(strip=True)
-                            if cell_text:
-                                print(f"{Fore.YELLOW}  Column {col_idx}: {cell_text[:50]}...{Style.RESET_ALL}")
-                else:
-                    print(f"{Fore.RED}Error: Could not find table row {i}{Style.RESET_ALL}")
+                # Extract page ID from the link found in the corresponding table row
+                project_page_id = link_page_ids.get(row_links[i])
                 
                 # Check if this project already exists in epic.json
-                existing_entry = find_epic_entry(epic_data, row[0])
+                existing_entry = registry.find_by_project(row[0])
                 
                 if existing_entry:
-                    print(f"{Fore.YELLOW}Project already exists in epic.json with Jira epic: {existing_entry.get('jira_epic_id', 'N/A')}{Style.RESET_ALL}")
-                    print(f"  Current page ID: {existing_entry.get('confluence_page_id', 'None')}")
-                    print(f"  Extracted page ID: {project_page_id}")
+                    logger.info("Project already exists in epic.json with Jira epic: %s", existing_entry.get('jira_epic_id', 'N/A'), extra=color(Fore.YELLOW))
+                    logger.debug("  Current page ID: %s\n  Extracted page ID: %s", existing_entry.get('confluence_page_id', 'None'), project_page_id)
                     
                     # If page ID is missing (null) or different, update it
                     if not existing_entry.get('confluence_page_id') and project_page_id:
-                        update_epic_entry(existing_entry, confluence_page_id=project_page_id)
+                        registry.update_entry(existing_entry, confluence_page_id=project_page_id)
                         updated = True
-                        print(f"{Fore.GREEN}✓ Added missing page ID for {row[0]}: {project_page_id}{Style.RESET_ALL}")
+                        logger.info("✓ Added missing page ID for %s: %s", row[0], project_page_id, extra=color(Fore.GREEN))
                     elif project_page_id and existing_entry.get('confluence_page_id') != project_page_id:
                         # Update confluence_page_id if it's different
-                        update_epic_entry(existing_entry, confluence_page_id=project_page_id)
+                        registry.update_entry(existing_entry, confluence_page_id=project_page_id)
                         updated = True
-                        print(f"{Fore.YELLOW}✓ Updated confluence page ID for {row[0]} from {existing_entry.get('confluence_page_id')} to {project_page_id}{Style.RESET_ALL}")
+                        logger.info("✓ Updated confluence page ID for %s from %s to %s", row[0], existing_entry.get('confluence_page_id'), project_page_id, extra=color(Fore.YELLOW))
                     elif not project_page_id:
-                        print(f"{Fore.RED}⚠ Could not extract page ID for {row[0]}{Style.RESET_ALL}")
+                        logger.warning("⚠ Could not extract page ID for %s", row[0])
                     
                     # Prepare project details for epic operations
-                    details = {
-                        'Project': row[0],
-                        'Priority': row[2],
-                        'Description': row[3],  # Note column
-                        'Owner': row[4],  # Owner display name
-                        'Owner Account ID': row[-1],  # Owner account ID (last element)
-                        'Success Measures': row[5],  # Success measure(s)
-                        'Link': row[6] if len(row) > 6 else 'No link'  # Link if available
-                    }
+                    details = build_epic_details(row)
                     
                     # Check if this project needs a Jira epic created (jira_epic_id is null)
                     if not existing_entry.get('jira_epic_id'):
-                        print(f"{Fore.CYAN}Project exists but has no Jira epic yet. Creating epic for {row[0]}{Style.RESET_ALL}")
-                        
-                        print(f"\n{Fore.CYAN}KP Project Details:{Style.RESET_ALL}")
-                        print(f"Project: {details['Project']}")
-                        print(f"Priority: {details['Priority']}")
-                        print(f"Description: {details['Description']}")
-                        print(f"Owner: {details['Owner']}")
-                        print(f"Owner Account ID: {details['Owner Account ID']}")
-                        print(f"Success Measures: {details['Success Measures']}")
-                        print(f"Link: {details['Link']}")
-                        print("-" * 50)
+                        logger.info("Project exists but has no Jira epic yet. Creating epic for %s", row[0], extra=color(Fore.CYAN))
+                        log_epic_details(details)
                         
                         # Create Jira Epic for this project
-                        ticket = create_jira_epic(details, details['Owner Account ID'], JIRA_URL, USERNAME, API_TOKEN, JIRA_PROJECT)
+                        with trace_tags(page_id=existing_entry.get('confluence_page_id')):
+                            ticket = create_jira_epic(details, details['Owner Account ID'], JIRA_URL, USERNAME, API_TOKEN, JIRA_PROJECT)
                         
                         if ticket:
                             # Update existing entry with the new epic ID
-                            update_epic_entry(existing_entry, jira_epic_id=ticket['key'])
+                            registry.update_entry(existing_entry, jira_epic_id=ticket['key'])
                             updated = True
-                            print(f"{Fore.GREEN}Created epic {ticket['key']} for {row[0]}{Style.RESET_ALL}")
+                            record_done('epic', row[0], action='created', jira_key=ticket['key'], page_id=existing_entry.get('confluence_page_id'))
+                            logger.info("Created epic %s for %s", ticket['key'], row[0], extra=color(Fore.GREEN))
                         else:
-                            print(f"{Fore.RED}Failed to create epic for {row[0]}{Style.RESET_ALL}")
+                            logger.error("Failed to create epic for %s", row[0])
                     else:
-                        # Epic exists, update it with new data from the table
-                        print(f"{Fore.CYAN}Updating existing epic {existing_entry.get('jira_epic_id')} for {row[0]}{Style.RESET_ALL}")
+                        # Epic exists, update only the fields that differ from the table
+                        changes = diff_epic_fields(current_epics.get(existing_entry.get('jira_epic_id')), build_epic_fields(details))
+                        if not changes:
+                            logger.info("Epic %s is up to date for %s", existing_entry.get('jira_epic_id'), row[0], extra=color(Fore.GREEN))
+                            record_done('epic', row[0], action='checked', jira_key=existing_entry.get('jira_epic_id'), page_id=existing_entry.get('confluence_page_id'))
+                            continue
+                        logger.info("Updating %s of existing epic %s for %s", ', '.join(changes), existing_entry.get('jira_epic_id'), row[0], extra=color(Fore.CYAN))
                         
-                        if update_jira_epic(existing_entry.get('jira_epic_id'), details, JIRA_URL, USERNAME, API_TOKEN):
-                            print(f"{Fore.GREEN}Updated epic {existing_entry.get('jira_epic_id')} for {row[0]}{Style.RESET_ALL}")
+                        with trace_tags(page_id=existing_entry.get('confluence_page_id'), epic_key=existing_entry.get('jira_epic_id')):
+                            epic_updated = update_jira_epic(existing_entry.get('jira_epic_id'), details, JIRA_URL, USERNAME, API_TOKEN, fields=changes)
+                        if epic_updated:
+                            logger.info("Updated epic %s for %s", existing_entry.get('jira_epic_id'), row[0], extra=color(Fore.GREEN))
+                            record_done('epic', row[0], action='updated', jira_key=existing_entry.get('jira_epic_id'), page_id=existing_entry.get('confluence_page_id'))
                         else:
-                            print(f"{Fore.RED}Failed to update epic {existing_entry.get('jira_epic_id')} for {row[0]}{Style.RESET_ALL}")
+                            logger.error("Failed to update epic %s for %s", existing_entry.get('jira_epic_id'), row[0])
                 else:
                     # Create new entry for this project - now processing ALL KP projects
-                    print(f"\n{Fore.YELLOW}Debug - Row contents for {row[0]}:{Style.RESET_ALL}")
-                    for idx, content in enumerate(row):
-                        print(f"Index {idx}: {content}")
+                    logger.debug("Row contents for %s: %s", row[0], row)
                     
-                    details = {
-                        'Project': row[0],
-                        'Priority': row[2],
-                        'Description': row[3],  # Note column
-                        'Owner': row[4],  # Owner display name
-                        'Owner Account ID': row[-1],  # Owner account ID (last element)
-                        'Success Measures': row[5],  # Success measure(s)
-                        'Link': row[6] if len(row) > 6 else 'No link'  # Link if available
-                    }
+                    details = build_epic_details(row)
                     
-                    print(f"\n{Fore.CYAN}KP Project Details:{Style.RESET_ALL}")
-                    print(f"\n{Fore.YELLOW}Project: {details['Project']}{Style.RESET_ALL}")
-                    print(f"Priority: {details['Priority']}")
-                    print(f"Description: {details['Description']}")
-                    print(f"Owner: {details['Owner']}")
-                    print(f"Owner Account ID: {details['Owner Account ID']}")
-                    print(f"Success Measures: {details['Success Measures']}")
-                    print(f"Link: {details['Link']}")
-                    print("-" * 50)
+                    log_epic_details(details)
                     
                     # Create Jira Epic for this project
-                    ticket = create_jira_epic(details, details['Owner Account ID'], JIRA_URL, USERNAME, API_TOKEN, JIRA_PROJECT)
+                    with trace_tags(page_id=project_page_id):
+                        ticket = create_jira_epic(details, details['Owner Account ID'], JIRA_URL, USERNAME, API_TOKEN, JIRA_PROJECT)
                     
                     if ticket:
-                        # Add new entry to epic_data using the extracted page ID
-                        add_epic_entry(epic_data, row[0], project_page_id, ticket['key'])
+                        # Add new entry to the registry using the extracted page ID
+                        registry.add_entry(row[0], project_page_id, ticket['key'])
                         updated = True
-                        print(f"{Fore.GREEN}Added {row[0]} to epic.json with page ID {project_page_id}{Style.RESET_ALL}")
+                        record_done('epic', row[0], action='created', jira_key=ticket['key'], page_id=project_page_id)
+                        logger.info("Added %s to epic.json with page ID %s", row[0], project_page_id, extra=color(Fore.GREEN))
                     else:
                         # If epic creation failed, still add to JSON without epic ID
-                        add_epic_entry(epic_data, row[0], project_page_id)
+                        registry.add_entry(row[0], project_page_id)
                         updated = True
-                        print(f"{Fore.YELLOW}Added {row[0]} to epic.json (epic creation failed) with page ID {project_page_id}{Style.RESET_ALL}")
+                        logger.warning("Added %s to epic.json (epic creation failed) with page ID %s", row[0], project_page_id)
             else:
-                print(f"DEBUG: Skipped: '{row[0]}'")
+                logger.debug("Skipped: '%s'", row[0])
         
         print(f"\n{Fore.GREEN}Total KP projects found: {kp_count}{Style.RESET_ALL}")
         
         # Save updated epic.json if there were changes
         if updated:
-            save_epic_json(epic_data)
+            registry.save()
         else:
             print(f"{Fore.YELLOW}No changes to epic.json{Style.RESET_ALL}")
     else:
@@ -270,7 +362,31 @@ def get_planned_epics():
 def main():
     """
     Main function to fetch and create Epics from the Planned for H2 table.
+    Usage:
+      python create_epic.py             # Create or update epics for the PAGE_ID planning page
     """
+    # Show help if requested
+    if handle_help_request([
+        "python create_epic.py             # Create or update epics from the planning page (PAGE_ID)",
+        "",
+        "Options:",
+        "  --no-user-cache        Bypass the cached Confluence user lookups",
+        "  --refresh-user-cache   Invalidate the user cache before running",
+        "  --no-page-cache        Always refetch and reparse the planning page",
+        "  --resume <run_id>      Resume an interrupted run, skipping epics it completed",
+        "  --quiet                Hide per-row progress; show warnings, errors and summaries",
+        "  --verbose              Print debug output (task data, issue payloads)",
+        "  --log-json <path>      Also write JSON-lines logs and events to a file",
+        "  --metrics-json <path>  Also write the run metrics (stage timings, API calls) to a file",
+        "  --trace-memory         Report peak memory (tracemalloc) with the run metrics",
+        "  --no-metrics           Do not print the run metrics table",
+        "  --trace <path>         Write a Chrome trace of every page, parse, lookup and Jira write",
+        "",
+        "Epics are recorded in the epic registry (epic.json, or EPIC_REGISTRY_DB with EPIC_REGISTRY_BACKEND=sqlite)",
+        "for create_ticket.py to link tickets to."
+    ]):
+        return
+
     # Validate configuration
     is_valid, missing_vars = validate_epic_config()
     if not is_valid:
@@ -280,6 +396,13 @@ def main():
         print(f"\n{Fore.YELLOW}Please ensure all required variables are set in your .env file{Style.RESET_ALL}")
         return
 
+    apply_logging_flags()
+    apply_metrics_flags()
+    apply_tracing_flags()
+    apply_user_cache_flags()
+    apply_page_cache_flags()
+    start_run('create_epic')
+
     print(f"{Fore.GREEN}Fetching table from Confluence page...{Style.RESET_ALL}")
     get_planned_epics()
     print(f"\n{Fore.GREEN}Done!{Style.RESET_ALL}")
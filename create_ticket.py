@@ -1,17 +1,27 @@
 import sys
 from colorama import init, Fore, Style
 from config import *
-from update_epic import load_epic_json
-from main import get_scope_table, create_jira_ticket
+from epic_registry import get_epic_registry
+from main import get_scope_table, build_ticket_issue_data, create_jira_tickets_bulk, log_created_ticket
+from user_cache import apply_user_cache_flags
+from page_cache import apply_page_cache_flags
+from sync_state import get_synced_row, record_synced_row, row_changed, row_fingerprint, row_keys, save_sync_state, apply_sync_state_flags
+from run_journal import start_run, record_done, get_done
+from ticket_index import find_existing_ticket, add_existing_ticket
+from log import get_logger, log_event, color, buffered_output, apply_logging_flags
+from metrics import stage, apply_metrics_flags
+from tracing import trace_tags, submit_in_context, apply_tracing_flags
 
 # Initialize colorama
 init()
 
+logger = get_logger('create_ticket')
+
 def get_available_pages():
     """
     Get available Confluence page IDs from epic.json
     """
-    epic_data = load_epic_json()
+    epic_data = get_epic_registry().entries()
     
     if not epic_data:
         print(f"{Fore.RED}No epic.json data found. Please run create_epic.py first.{Style.RESET_ALL}")
@@ -70,21 +80,53 @@ def find_epic_for_page(page_id):
     """
     Find the epic key associated with a given Confluence page ID
     """
-    epic_data = load_epic_json()
+    entry = get_epic_registry().find_by_page(page_id)
     
-    for entry in epic_data:
-        if entry.get('confluence_page_id') == str(page_id):
-            epic_key = entry.get('jira_epic_id')
-            if epic_key:
-                print(f"{Fore.GREEN}Found epic {epic_key} for page {page_id}{Style.RESET_ALL}")
-                return epic_key
-            else:
-                print(f"{Fore.YELLOW}Page {page_id} found in epic.json but no epic key set{Style.RESET_ALL}")
-                return None
+    if entry:
+        epic_key = entry.get('jira_epic_id')
+        if epic_key:
+            print(f"{Fore.GREEN}Found epic {epic_key} for page {page_id}{Style.RESET_ALL}")
+            return epic_key
+        else:
+            print(f"{Fore.YELLOW}Page {page_id} found in epic.json but no epic key set{Style.RESET_ALL}")
+            return None
     
     print(f"{Fore.YELLOW}Page {page_id} not found in epic.json - tickets will not be linked to an epic{Style.RESET_ALL}")
     return None
 
+def fetch_scope_table(page_id, epic_key=None):
+    """Fetch and parse a page's scope table quietly, traced under its page ID and epic key"""
+    with trace_tags(page_id=page_id, epic_key=epic_key), stage('page.fetch'):
+        return get_scope_table(page_id, create_tickets=False, verbose=False)
+
+def page_epic_key(page):
+    """Epic key of a get_available_pages() entry, or None if it has none"""
+    return page['jira_epic'] if page['jira_epic'] != 'N/A' else None
+
+def schedule_prefetch(executor, futures, pages, current_index):
+    """
+    Make sure scope tables for the current page and the next PREFETCH_DEPTH pages
+    are being fetched and parsed in the background.
+    """
+    for page in pages[current_index:current_index + PREFETCH_DEPTH + 1]:
+        if page['page_id'] not in futures:
+            futures[page['page_id']] = submit_in_context(executor, fetch_scope_table, page['page_id'], page_epic_key(page))
+
+def get_prefetched_scope_table(futures, page_id):
+    """
+    Wait for a prefetched scope table.
+    Returns: (rows, dri_account_id) tuple, or None if fetching/parsing failed
+    """
+    future = futures.pop(page_id, None)
+    if future is None:
+        with trace_tags(page_id=page_id), stage('page.fetch'):
+            return get_scope_table(page_id, create_tickets=False)
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"{Fore.RED}Error fetching page {page_id}: {str(e)}{Style.RESET_ALL}")
+        return None
+
 def process_all_pages_with_confirmation():
     """
     Process all pages from epic.json with user confirmation for each page
@@ -100,9 +142,22 @@ def process_all_pages_with_confirmation():
     total_successful = 0
     total_attempted = 0
     total_skipped = []
+    failed_pages = []
     pages_processed = 0
+
+    # Upcoming pages are fetched and parsed while the operator reviews the current one
+    from concurrent.futures import ThreadPoolExecutor
+    executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+    prefetched = {}
     
     for i, page in enumerate(pages, 1):
+        if get_done('page', page['page_id']):
+            print(f"{Fore.GREEN}Page {i}/{len(pages)} already completed in this run, skipping: {page['project_name']}{Style.RESET_ALL}")
+            pages_processed += 1
+            continue
+
+        schedule_prefetch(executor, prefetched, pages, i - 1)
+
         print(f"\n{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}Page {i}/{len(pages)}: {page['project_name']}{Style.RESET_ALL}")
         print(f"Page ID: {page['page_id']}")
@@ -121,38 +176,148 @@ def process_all_pages_with_confirmation():
                 # Look up the epic for this page
                 epic_key = find_epic_for_page(page['page_id'])
                 
-                # Get the table data from this page
-                result = get_scope_table(page['page_id'], create_tickets=False)
+                # Get the table data from this page (usually already prefetched)
+                result = get_prefetched_scope_table(prefetched, page['page_id'])
                 
                 if result and len(result) == 2:
                     rows, dri_account_id = result
                     if rows:
                         print(f"{Fore.CYAN}Found {len(rows)} tasks on this page{Style.RESET_ALL}")
-                        successful, attempted, skipped = process_tickets_interactively(rows, dri_account_id, epic_key)
+                        with trace_tags(page_id=page['page_id'], epic_key=epic_key), stage('page.process'):
+                            successful, attempted, skipped = process_tickets_interactively(rows, dri_account_id, epic_key, page['page_id'])
                         total_successful += successful
                         total_attempted += attempted
                         total_skipped.extend(skipped)
                         pages_processed += 1
+                        if successful == attempted:
+                            record_done('page', page['page_id'], successful=successful, attempted=attempted)
                     else:
                         print(f"{Fore.YELLOW}No tasks found on this page{Style.RESET_ALL}")
                         pages_processed += 1
+                        record_done('page', page['page_id'], successful=0, attempted=0)
                 else:
                     print(f"{Fore.RED}Failed to extract table data from page {page['page_id']}{Style.RESET_ALL}")
-                    pages_processed += 1
+                    failed_pages.append(page)
                     
             elif response == 'n':
                 print(f"{Fore.YELLOW}Skipping page: {page['project_name']}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.YELLOW}Invalid response. Skipping page: {page['project_name']}{Style.RESET_ALL}")
+
+            # Drop the prefetched result for a skipped page
+            skipped_future = prefetched.pop(page['page_id'], None)
+            if skipped_future:
+                skipped_future.cancel()
                 
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}Process interrupted by user.{Style.RESET_ALL}")
             break
+
+    executor.shutdown(wait=False, cancel_futures=True)
     
-    # Print overall summary for all pages
+    print_overall_summary(pages_processed, len(pages), total_successful, total_attempted, total_skipped, failed_pages)
+
+def filter_pages(pages, page_ids=None, epic_keys=None):
+    """
+    Keep only the pages matching the --page / --epic filters.
+    Args:
+        page_ids: comma-separated Confluence page IDs, or None for all
+        epic_keys: comma-separated Jira epic keys, or None for all
+    """
+    if page_ids:
+        wanted_pages = {page_id.strip() for page_id in page_ids.split(',')}
+        pages = [page for page in pages if str(page['page_id']) in wanted_pages]
+    if epic_keys:
+        wanted_epics = {epic_key.strip().upper() for epic_key in epic_keys.split(',')}
+        pages = [page for page in pages if (page['jira_epic'] or '').upper() in wanted_epics]
+    return pages
+
+def process_all_pages_headless(page_ids=None, epic_keys=None, workers=BATCH_WORKERS):
+    """
+    Process every (filtered) page from epic.json without prompting, for cron/CI.
+    Scope tables are fetched on `workers` threads, then pages are processed in
+    parallel with the largest tables scheduled first. Each page's output is
+    printed in one piece once the page is done. Pages that could not be fetched
+    or processed are reported as failed and left out of the run journal.
+    """
+    pages = filter_pages(get_available_pages(), page_ids, epic_keys)
+    if not pages:
+        print(f"{Fore.RED}No pages found to process.{Style.RESET_ALL}")
+        return
+
+    pending_pages = []
+    for page in pages:
+        if get_done('page', page['page_id']):
+            print(f"{Fore.GREEN}Page already completed in this run, skipping: {page['project_name']}{Style.RESET_ALL}")
+        else:
+            pending_pages.append(page)
+    pages_processed = len(pages) - len(pending_pages)
+
+    print(f"\n{Fore.MAGENTA}Fetching {len(pending_pages)} pages on {workers} workers...{Style.RESET_ALL}")
+    total_skipped = []
+    failed_pages = []
+    tables = []
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [submit_in_context(executor, fetch_scope_table, page['page_id'], page_epic_key(page)) for page in pending_pages]
+        for page, future in zip(pending_pages, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"{Fore.RED}Error fetching page {page['page_id']}: {str(e)}{Style.RESET_ALL}")
+                result = None
+            if result and len(result) == 2:
+                tables.append((page, result[0] or [], result[1]))
+            else:
+                print(f"{Fore.RED}Failed to extract table data from page {page['page_id']}{Style.RESET_ALL}")
+                failed_pages.append(page)
+
+    # Largest tables first, so the longest page does not start last
+    tables.sort(key=lambda table: len(table[1]), reverse=True)
+
+    def process_page(page, rows, dri_account_id):
+        epic_key = page_epic_key(page)
+        with buffered_output():
+            print(f"\n{Fore.GREEN}Processing page: {page['project_name']} ({len(rows)} tasks){Style.RESET_ALL}")
+            if not rows:
+                print(f"{Fore.YELLOW}No tasks found on page {page['page_id']}{Style.RESET_ALL}")
+                return 0, 0, []
+            with trace_tags(page_id=page['page_id'], epic_key=epic_key), stage('page.process'):
+                return process_tickets_interactively(rows, dri_account_id, epic_key, page['page_id'])
+
+    total_successful = 0
+    total_attempted = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [submit_in_context(executor, process_page, *table) for table in tables]
+        for (page, _, _), future in zip(tables, futures):
+            try:
+                successful, attempted, skipped = future.result()
+            except Exception as e:
+                print(f"{Fore.RED}Error processing page {page['page_id']}: {str(e)}{Style.RESET_ALL}")
+                failed_pages.append(page)
+                continue
+            pages_processed += 1
+            total_successful += successful
+            total_attempted += attempted
+            total_skipped.extend(skipped)
+            if successful == attempted:  # Otherwise --resume has to revisit the page for its failed tickets
+                record_done('page', page['page_id'], successful=successful, attempted=attempted)
+
+    save_sync_state()
+    print_overall_summary(pages_processed, len(pages), total_successful, total_attempted, total_skipped, failed_pages)
+
+def print_overall_summary(pages_processed, page_count, total_successful, total_attempted, total_skipped, failed_pages=None):
+    """
+    Print the overall summary and skipped-ticket report for a multi-page run.
+    Args:
+        failed_pages: get_available_pages() entries whose table could not be fetched or processed
+    """
+    failed_pages = failed_pages or []
     print(f"\n{Fore.MAGENTA}{'='*80}{Style.RESET_ALL}")
     print(f"{Fore.MAGENTA}OVERALL SUMMARY FOR ALL PAGES{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}Pages processed: {pages_processed}/{len(pages)}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Pages processed: {pages_processed}/{page_count}{Style.RESET_ALL}")
+    if failed_pages:
+        print(f"{Fore.RED}✗ {len(failed_pages)} pages failed: {', '.join(page['project_name'] for page in failed_pages)}{Style.RESET_ALL}")
     
     if total_attempted == 0:
         print(f"{Fore.YELLOW}No tickets were created across all pages{Style.RESET_ALL}")
@@ -174,25 +339,22 @@ def process_all_pages_with_confirmation():
     
     print(f"{Fore.MAGENTA}{'='*80}{Style.RESET_ALL}")
     print(f"\n{Fore.GREEN}Finished processing all pages.{Style.RESET_ALL}")
+    log_event(logger, 'run_summary', "Created %(successful)s/%(attempted)s tickets", pages_processed=pages_processed, page_count=page_count,
+              failed_pages=[page['page_id'] for page in failed_pages],
+              successful=total_successful, attempted=total_attempted, skipped=len(total_skipped))
 
-def process_tickets_interactively(rows, dri_account_id, epic_key):
+def prepare_ticket_payloads(rows, dri_account_id, epic_key, page_id=None):
     """
-    Process each row and create tickets automatically
-    Returns: (successful_count, total_attempted_count, skipped_list)
+    Validate each row and build its Jira payload without creating anything.
+    Args:
+        page_id: Confluence page the rows come from; part of each ticket's idempotency label
+    Returns: (pending_list, total_attempted_count, skipped_list)
+        where pending_list holds (row_number, row, issue_data) for rows with a valid payload
     """
-    if not rows:
-        print(f"{Fore.RED}No tasks found in the table.{Style.RESET_ALL}")
-        return 0, 0, []
-    
-    print(f"\n{Fore.CYAN}Found {len(rows)} tasks. Creating all tickets automatically...{Style.RESET_ALL}")
-    if epic_key:
-        print(f"{Fore.CYAN}All tickets will be linked to epic: {epic_key}{Style.RESET_ALL}")
-    else:
-        print(f"{Fore.YELLOW}No epic found - tickets will be created as standalone items{Style.RESET_ALL}")
-    
-    successful_count = 0
     total_attempted = 0
     skipped_tickets = []
+    pending = []  # (row_number, row, issue_data) for rows with a valid payload
+    keys = row_keys(page_id, rows)
     
     for i, row in enumerate(rows, 1):
         # Check if row has enough columns (need at least 5: title, priority, effort, owner, note, plus account_id)
@@ -200,36 +362,29 @@ def process_tickets_interactively(rows, dri_account_id, epic_key):
             if len(row) < 6:  # Need at least 6 elements including account_id
                 skip_reason = "incomplete data (merged cell or missing columns)"
                 title = row[0] if len(row) > 0 else "No title"
-                print(f"\n{Fore.YELLOW}Skipping incomplete row {i}/{len(rows)}: {title} ({skip_reason}){Style.RESET_ALL}")
+                logger.warning("Skipping incomplete row %d/%d: %s (%s)", i, len(rows), title, skip_reason)
                 skipped_tickets.append({
                     'title': title,
                     'reason': skip_reason
                 })
                 continue
                 
-            print(f"\n{Fore.YELLOW}{'='*60}{Style.RESET_ALL}")
-            print(f"{Fore.YELLOW}Task {i}/{len(rows)}: {row[0]}{Style.RESET_ALL}")
-            print(f"Priority: {row[1]}")
-            print(f"Effort: {row[2]}")
-            print(f"Owner: {row[3]}")
-            print(f"Note: {row[4]}")
-            print(f"{Fore.YELLOW}{'='*60}{Style.RESET_ALL}")
+            logger.info("Task %d/%d: %s", i, len(rows), row[0], extra=color(Fore.YELLOW))
+            logger.debug("Priority: %s\nEffort: %s\nOwner: %s\nNote: %s", row[1], row[2], row[3], row[4])
             
-            # Create ticket automatically
-            print(f"{Fore.GREEN}Creating ticket for: {row[0]}{Style.RESET_ALL}")
+            # Build the ticket payload; creation happens in bulk below
             total_attempted += 1
-            ticket = create_jira_ticket(row, dri_account_id, epic_key)
-            if ticket:
-                print(f"{Fore.GREEN}✓ Successfully created: {ticket['key']}{Style.RESET_ALL}")
-                successful_count += 1
+            issue_data = build_ticket_issue_data(row, dri_account_id, epic_key, keys[i - 1])
+            if issue_data:
+                pending.append((i, row, issue_data))
             else:
-                print(f"{Fore.RED}✗ Failed to create ticket{Style.RESET_ALL}")
+                logger.error("✗ Failed to create ticket: %s", row[0])
                 
         except IndexError as e:
             skip_reason = "index error accessing row data (likely merged cell)"
             title = row[0] if len(row) > 0 else "No title"
-            print(f"\n{Fore.YELLOW}Skipping malformed row {i}/{len(rows)}: {title} ({skip_reason}){Style.RESET_ALL}")
-            print(f"{Fore.YELLOW}Row data: {row}{Style.RESET_ALL}")
+            logger.warning("Skipping malformed row %d/%d: %s (%s)", i, len(rows), title, skip_reason)
+            logger.debug("Row data: %s", row)
             skipped_tickets.append({
                 'title': title,
                 'reason': skip_reason
@@ -238,13 +393,144 @@ def process_tickets_interactively(rows, dri_account_id, epic_key):
         except Exception as e:
             skip_reason = f"exception: {str(e)}"
             title = row[0] if len(row) > 0 else "No title"
-            print(f"\n{Fore.RED}Error processing row {i}/{len(rows)}: {title} ({skip_reason}){Style.RESET_ALL}")
-            print(f"{Fore.YELLOW}Row data: {row}{Style.RESET_ALL}")
+            logger.error("Error processing row %d/%d: %s (%s)", i, len(rows), title, skip_reason)
+            logger.debug("Row data: %s", row)
             skipped_tickets.append({
                 'title': title,
                 'reason': skip_reason
             })
             continue
+
+    return pending, total_attempted, skipped_tickets
+
+def filter_synced_rows(rows, page_id):
+    """
+    Drop rows that already got a ticket on an earlier run, using the sync state
+    and, when resuming, the run journal.
+    Returns: (rows_to_create, flagged_list)
+        where flagged_list reports rows that were edited since their ticket was created
+    """
+    rows_to_create = []
+    flagged = []
+    unchanged_count = 0
+    journaled_count = 0
+    for row in rows:
+        if row and get_done('ticket', row_fingerprint(page_id, row[0])):
+            journaled_count += 1
+            continue
+        synced = get_synced_row(page_id, row[0]) if row else None
+        if not synced:
+            rows_to_create.append(row)
+        elif not row_changed(synced, row):
+            unchanged_count += 1
+        else:
+            logger.warning("Row changed since %s was created: %s", synced['jira_key'], row[0])
+            flagged.append({
+                'title': row[0],
+                'reason': f"changed since {synced['jira_key']} was created (not re-created)"
+            })
+
+    if journaled_count:
+        logger.info("Run journal: %d rows already created in this run", journaled_count, extra=color(Fore.CYAN))
+    if unchanged_count or flagged:
+        logger.info("Sync state: %d rows already synced, %d changed, %d new", unchanged_count, len(flagged), len(rows_to_create), extra=color(Fore.CYAN))
+    return rows_to_create, flagged
+
+def filter_existing_tickets(rows, page_id, epic_key):
+    """
+    Drop rows whose ticket already exists in Jira (same parent epic and summary),
+    using the index of automation tickets loaded once per run.
+    Returns: (rows_to_create, skipped_list)
+    """
+    rows_to_create = []
+    skipped = []
+    for row in rows:
+        existing_key = find_existing_ticket(epic_key, row[0]) if row else None
+        if not existing_key:
+            rows_to_create.append(row)
+            continue
+        logger.info("Ticket already exists in Jira as %s: %s", existing_key, row[0], extra=color(Fore.YELLOW))
+        skipped.append({
+            'title': row[0],
+            'reason': f"already exists as {existing_key}"
+        })
+        if page_id:
+            record_synced_row(page_id, row, existing_key)  # Next run skips it without asking Jira
+    return rows_to_create, skipped
+
+def record_created_tickets(pending, results, page_id=None):
+    """
+    Journal the tickets created by one bulk chunk and persist the sync state right away,
+    so a run that dies later neither --resume nor the next run creates them again.
+    Args:
+        pending: the (row_number, row, issue_data) entries submitted in the chunk
+        results: the chunk's (ticket, error) tuples
+    """
+    if not page_id:
+        return
+    for (_, row, _), (ticket, _) in zip(pending, results):
+        if ticket:
+            record_synced_row(page_id, row, ticket['key'])
+            record_done('ticket', row_fingerprint(page_id, row[0]), page_id=str(page_id), jira_key=ticket['key'])
+    save_sync_state()
+
+def report_created_tickets(pending, results, row_count, page_id=None):
+    """
+    Log the outcome of each bulk-created ticket (already recorded by record_created_tickets).
+    Returns: number of tickets successfully created
+    """
+    successful_count = 0
+    for (i, row, issue_data), (ticket, error) in zip(pending, results):
+        if ticket:
+            log_created_ticket(ticket['key'], row, issue_data)
+            log_event(logger, 'ticket_created', "Created ticket %(key)s", key=ticket['key'], summary=row[0], page_id=page_id,
+                      epic=issue_data["fields"].get("parent", {}).get("key"))
+            add_existing_ticket(issue_data["fields"].get("parent", {}).get("key"), row[0], ticket['key'])
+            successful_count += 1
+        else:
+            logger.error("✗ Failed to create ticket for row %d/%d: %s (%s)", i, row_count, row[0], error)
+            log_event(logger, 'ticket_failed', "Failed to create ticket %(summary)s", summary=row[0], page_id=page_id, error=error)
+    return successful_count
+
+def process_tickets_interactively(rows, dri_account_id, epic_key, page_id=None):
+    """
+    Process each row and create tickets automatically.
+    If page_id is given, rows already created on an earlier run are skipped
+    and rows edited since then are flagged instead of re-created. Rows whose
+    ticket already exists in Jira under the same epic are skipped as well.
+    Returns: (successful_count, total_attempted_count, skipped_list)
+    """
+    if not rows:
+        print(f"{Fore.RED}No tasks found in the table.{Style.RESET_ALL}")
+        return 0, 0, []
+
+    flagged = []
+    if page_id:
+        rows, flagged = filter_synced_rows(rows, page_id)
+    rows, existing = filter_existing_tickets(rows, page_id, epic_key)
+    flagged.extend(existing)
+    if not rows:
+        logger.info("All tasks on this page already have tickets", extra=color(Fore.GREEN))
+        return 0, 0, flagged
+    
+    logger.info("Found %d tasks. Creating all tickets automatically...", len(rows), extra=color(Fore.CYAN))
+    if epic_key:
+        logger.info("All tickets will be linked to epic: %s", epic_key, extra=color(Fore.CYAN))
+    else:
+        logger.warning("No epic found - tickets will be created as standalone items")
+    
+    pending, total_attempted, skipped_tickets = prepare_ticket_payloads(rows, dri_account_id, epic_key, page_id)
+    skipped_tickets = flagged + skipped_tickets
+    
+    # Create all prepared tickets through the bulk endpoint
+    successful_count = 0
+    if pending:
+        logger.info("Creating %d tickets...", len(pending), extra=color(Fore.GREEN))
+        results = create_jira_tickets_bulk(
+            [issue_data for _, _, issue_data in pending],
+            on_chunk_created=lambda start, chunk_results: record_created_tickets(pending[start:start + len(chunk_results)], chunk_results, page_id)
+        )
+        successful_count = report_created_tickets(pending, results, len(rows), page_id)
     
     # Print summary
     print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
@@ -283,6 +569,25 @@ def main():
         "python create_ticket.py                     # Interactive mode - select from epic.json",
         "python create_ticket.py <page_id>          # Direct mode - use specific page ID",
         "python create_ticket.py all                # Process all pages with page-level confirmation",
+        "python create_ticket.py all --yes          # Process all pages in parallel without prompting (cron/CI)",
+        "",
+        "Options:",
+        "  --no-user-cache        Bypass the cached Confluence user lookups",
+        "  --refresh-user-cache   Invalidate the user cache before running",
+        "  --no-page-cache        Always refetch and reparse pages",
+        "  --ignore-sync-state    Create tickets even for rows created on an earlier run",
+        "  --resume <run_id>      Resume an interrupted run, skipping pages and tickets it completed",
+        "  --yes                  Do not prompt; process all pages in parallel (implies 'all')",
+        "  --page <ids>           With --yes, only these comma-separated page IDs",
+        "  --epic <keys>          With --yes, only pages of these comma-separated epic keys",
+        f"  --workers <n>          With --yes, pages processed in parallel (default {BATCH_WORKERS})",
+        "  --quiet                Hide per-row progress; show warnings, errors and summaries",
+        "  --verbose              Print debug output (task data, issue payloads)",
+        "  --log-json <path>      Also write JSON-lines logs and events to a file",
+        "  --metrics-json <path>  Also write the run metrics (stage timings, API calls) to a file",
+        "  --trace-memory         Report peak memory (tracemalloc) with the run metrics",
+        "  --no-metrics           Do not print the run metrics table",
+        "  --trace <path>         Write a Chrome trace of every page, parse, lookup and Jira write",
         "",
         "Interactive mode allows you to:",
         "- Select a specific page: creates all tickets automatically",
@@ -297,6 +602,31 @@ def main():
     if not handle_config_validation():
         return
 
+    apply_logging_flags()
+    apply_metrics_flags()
+    apply_tracing_flags()
+    apply_user_cache_flags()
+    apply_page_cache_flags()
+    apply_sync_state_flags()
+    start_run('create_ticket')
+
+    # Headless batch mode (no prompts)
+    headless = pop_flag('--yes')
+    page_filter = pop_option('--page')
+    epic_filter = pop_option('--epic')
+    workers = pop_option('--workers')
+    if headless:
+        if len(sys.argv) > 1 and sys.argv[1].lower() != 'all':
+            page_filter = ','.join(filter(None, [page_filter, sys.argv[1]]))
+        try:
+            workers = int(workers) if workers else BATCH_WORKERS
+        except ValueError:
+            print(f"{Fore.RED}--workers expects a number, got {workers}{Style.RESET_ALL}")
+            return
+        process_all_pages_headless(page_filter, epic_filter, max(1, workers))
+        print(f"\n{Fore.GREEN}Done!{Style.RESET_ALL}")
+        return
+
     # Check if page ID provided as command line argument
     page_selection = None
     if len(sys.argv) > 1:
@@ -319,19 +649,27 @@ def main():
     
     # Handle single page case
     page_id = page_selection
+    if get_done('page', page_id):
+        print(f"{Fore.GREEN}Page {page_id} already completed in this run{Style.RESET_ALL}")
+        return
     print(f"\n{Fore.GREEN}Fetching table from Confluence page {page_id}...{Style.RESET_ALL}")
     
     # Look up the epic for this page
     epic_key = find_epic_for_page(page_id)
     
-    # Use main.py's get_scope_table function to get the data without creating tickets
-    result = get_scope_table(page_id, create_tickets=False)
-    
-    if result and len(result) == 2:
-        rows, dri_account_id = result
-        successful, attempted, skipped = process_tickets_interactively(rows, dri_account_id, epic_key)
-    else:
-        print(f"{Fore.RED}Failed to extract table data from the page.{Style.RESET_ALL}")
+    with trace_tags(page_id=page_id, epic_key=epic_key):
+        # Use main.py's get_scope_table function to get the data without creating tickets
+        with stage('page.fetch'):
+            result = get_scope_table(page_id, create_tickets=False)
+
+        if result and len(result) == 2:
+            rows, dri_account_id = result
+            with stage('page.process'):
+                successful, attempted, skipped = process_tickets_interactively(rows, dri_account_id, epic_key, page_id)
+            if successful == attempted:
+                record_done('page', page_id, successful=successful, attempted=attempted)
+        else:
+            print(f"{Fore.RED}Failed to extract table data from the page.{Style.RESET_ALL}")
     
     print(f"\n{Fore.GREEN}Done!{Style.RESET_ALL}")
 
@@ -0,0 +1,202 @@
+"""
+Indexed registry of project -> Confluence page -> Jira epic mappings.
+
+The default backend is epic.json, loaded once per process and indexed by
+project name, Confluence page ID and Jira epic key. The SQLite backend
+(EPIC_REGISTRY_BACKEND=sqlite) keeps the same mappings in indexed tables with
+atomic row-level writes, safe to share between several processes.
+"""
+import threading
+from colorama import Fore, Style
+from config import EPIC_REGISTRY_BACKEND, EPIC_REGISTRY_DB
+from update_epic import load_epic_json, save_epic_json
+
+class EpicRegistry:
+    """epic.json entries with in-memory indexes; save() writes the file back if anything changed"""
+
+    def __init__(self, entries):
+        self._entries = entries
+        self._by_project = {}
+        self._by_page = {}
+        self._by_epic = {}
+        self._dirty = False
+        for entry in entries:
+            self._index(entry)
+
+    def _index(self, entry):
+        # First entry wins, matching the old linear scans
+        if entry.get('project_name'):
+            self._by_project.setdefault(entry['project_name'], entry)
+        if entry.get('confluence_page_id'):
+            self._by_page.setdefault(str(entry['confluence_page_id']), entry)
+        if entry.get('jira_epic_id'):
+            self._by_epic.setdefault(entry['jira_epic_id'], entry)
+
+    def entries(self):
+        """All entries in file order"""
+        return list(self._entries)
+
+    def find_by_project(self, project_name):
+        return self._by_project.get(project_name)
+
+    def find_by_page(self, page_id):
+        return self._by_page.get(str(page_id))
+
+    def find_by_epic(self, epic_key):
+        return self._by_epic.get(epic_key)
+
+    def add_entry(self, project_name, confluence_page_id, jira_epic_id=None):
+        """Add a new entry and index it"""
+        entry = {
+            "project_name": project_name,
+            "confluence_page_id": confluence_page_id,
+            "jira_epic_id": jira_epic_id
+        }
+        self._entries.append(entry)
+        self._index(entry)
+        self._dirty = True
+        return entry
+
+    def update_entry(self, entry, confluence_page_id=None, jira_epic_id=None):
+        """Update an existing entry, keeping the indexes in step. Returns True if anything changed"""
+        updated = False
+        if confluence_page_id and entry.get('confluence_page_id') != confluence_page_id:
+            if self._by_page.get(str(entry.get('confluence_page_id'))) is entry:
+                del self._by_page[str(entry['confluence_page_id'])]
+            entry['confluence_page_id'] = confluence_page_id
+            updated = True
+        if jira_epic_id and entry.get('jira_epic_id') != jira_epic_id:
+            if self._by_epic.get(entry.get('jira_epic_id')) is entry:
+                del self._by_epic[entry['jira_epic_id']]
+            entry['jira_epic_id'] = jira_epic_id
+            updated = True
+        if updated:
+            self._index(entry)
+            self._dirty = True
+        return updated
+
+    def save(self):
+        """Write epic.json if the registry changed"""
+        if self._dirty:
+            save_epic_json(self._entries)
+            self._dirty = False
+
+class SqliteEpicRegistry:
+    """Same interface as EpicRegistry, backed by SQLite with per-row writes"""
+
+    COLUMNS = ('project_name', 'confluence_page_id', 'jira_epic_id')
+
+    def __init__(self, path):
+        import sqlite3
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")  # Readers do not block the writer across processes
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS epics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name TEXT NOT NULL,
+                confluence_page_id TEXT,
+                jira_epic_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS epics_project ON epics (project_name);
+            CREATE INDEX IF NOT EXISTS epics_page ON epics (confluence_page_id);
+            CREATE INDEX IF NOT EXISTS epics_epic ON epics (jira_epic_id);
+        """)
+        self._import_epic_json()
+
+    def _import_epic_json(self):
+        """
+        Seed an empty database from epic.json.
+        The emptiness check and the inserts share one write transaction, so processes
+        starting together seed it once, and a run that died before seeding is retried.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT COUNT(*) FROM epics").fetchone()[0]:
+                    self._conn.execute("ROLLBACK")
+                    return
+                entries = load_epic_json()
+                self._conn.executemany(
+                    "INSERT INTO epics (project_name, confluence_page_id, jira_epic_id) VALUES (?, ?, ?)",
+                    [tuple(entry.get(column) for column in self.COLUMNS) for entry in entries if entry.get('project_name')]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if not entries:
+            return
+        print(f"{Fore.GREEN}Imported {len(entries)} entries from epic.json into {EPIC_REGISTRY_DB}{Style.RESET_ALL}")
+
+    def _to_entry(self, row):
+        if row is None:
+            return None
+        entry = {column: row[column] for column in self.COLUMNS}
+        entry['_id'] = row['id']
+        return entry
+
+    def _find(self, column, value):
+        with self._lock:
+            row = self._conn.execute(f"SELECT * FROM epics WHERE {column} = ? ORDER BY id LIMIT 1", (value,)).fetchone()
+        return self._to_entry(row)
+
+    def entries(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM epics ORDER BY id").fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def find_by_project(self, project_name):
+        return self._find('project_name', project_name)
+
+    def find_by_page(self, page_id):
+        return self._find('confluence_page_id', str(page_id))
+
+    def find_by_epic(self, epic_key):
+        return self._find('jira_epic_id', epic_key)
+
+    def add_entry(self, project_name, confluence_page_id, jira_epic_id=None):
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO epics (project_name, confluence_page_id, jira_epic_id) VALUES (?, ?, ?)",
+                (project_name, confluence_page_id, jira_epic_id)
+            )
+        return {
+            "project_name": project_name,
+            "confluence_page_id": confluence_page_id,
+            "jira_epic_id": jira_epic_id,
+            "_id": cursor.lastrowid
+        }
+
+    def update_entry(self, entry, confluence_page_id=None, jira_epic_id=None):
+        changes = {}
+        if confluence_page_id and entry.get('confluence_page_id') != confluence_page_id:
+            changes['confluence_page_id'] = confluence_page_id
+        if jira_epic_id and entry.get('jira_epic_id') != jira_epic_id:
+            changes['jira_epic_id'] = jira_epic_id
+        if not changes:
+            return False
+        assignments = ', '.join(f"{column} = ?" for column in changes)
+        with self._lock:
+            self._conn.execute(f"UPDATE epics SET {assignments} WHERE id = ?", (*changes.values(), entry['_id']))
+        entry.update(changes)
+        return True
+
+    def save(self):
+        """Writes are committed as they happen"""
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_epic_registry():
+    """Get the process-wide registry, loading it on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            if EPIC_REGISTRY_BACKEND == 'sqlite':
+                _registry = SqliteEpicRegistry(EPIC_REGISTRY_DB)
+            else:
+                _registry = EpicRegistry(load_epic_json())
+        return _registry
@@ -0,0 +1,169 @@
+"""
+Structured logging for IDS automation tools.
+
+Debug output goes through the standard logging module under the "ids" logger,
+with %-style arguments so messages below the active level are never built.
+The console shows colored messages at LOG_LEVEL (--quiet: warnings only,
+--verbose: debug). A JSON-lines sink (LOG_JSON_FILE or --log-json <path>)
+receives the same messages plus structured events such as created tickets.
+Per-row progress is logged at info (details at debug) so --quiet silences it;
+pass extra=color(Fore.GREEN) to color an info message on the console.
+Work running in parallel can wrap itself in buffered_output() so its prints and
+log lines come out in one piece instead of interleaved with other workers'.
+"""
+import contextvars
+import json
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from colorama import Fore, Style
+from config import LOG_LEVEL, LOG_JSON_FILE, LOG_JSON_LEVEL, pop_flag, pop_option
+
+LEVEL_COLORS = {
+    logging.DEBUG: Fore.CYAN,
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED
+}
+
+_root = logging.getLogger('ids')
+_root.propagate = False
+_console_handler = None
+_json_handler = None
+_output_buffer = contextvars.ContextVar('output_buffer', default=None)
+_output_lock = threading.Lock()
+
+class ConsoleFormatter(logging.Formatter):
+    """Colors a message by level (or its own color), like the tools' colorama prints"""
+
+    def format(self, record):
+        message = record.getMessage()
+        color = getattr(record, 'color', None) or LEVEL_COLORS.get(record.levelno)
+        return f"{color}{message}{Style.RESET_ALL}" if color else message
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, with any structured fields passed as extra={'fields': {...}}"""
+
+    def format(self, record):
+        entry = {
+            'ts': record.created,
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def _skip_events(record):
+    """Events duplicate what the tools already print, so they only go to the JSON sink"""
+    return not getattr(record, 'event', False)
+
+def configure_logging(level=LOG_LEVEL, json_path=LOG_JSON_FILE, json_level=LOG_JSON_LEVEL):
+    """
+    (Re)configure the console and JSON-lines handlers.
+    Args:
+        level: Console level name ('debug', 'info', 'warning', 'error')
+        json_path: File to append JSON lines to, or empty for no JSON sink
+        json_level: Level name for the JSON sink
+    """
+    global _console_handler, _json_handler
+    console_level = logging.getLevelName(level.upper())
+    if _console_handler is None:
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setFormatter(ConsoleFormatter())
+        _console_handler.addFilter(_skip_events)
+        _root.addHandler(_console_handler)
+    _console_handler.setLevel(console_level)
+
+    if _json_handler is not None:
+        _root.removeHandler(_json_handler)
+        _json_handler.close()
+        _json_handler = None
+    levels = [console_level]
+    if json_path:
+        _json_handler = logging.FileHandler(json_path, encoding='utf-8')
+        _json_handler.setFormatter(JsonLinesFormatter())
+        _json_handler.setLevel(logging.getLevelName(json_level.upper()))
+        _root.addHandler(_json_handler)
+        levels.append(_json_handler.level)
+
+    # The logger itself drops anything no handler wants, before the message is built
+    _root.setLevel(min(levels))
+
+def apply_logging_flags():
+    """Handle the --quiet, --verbose and --log-json <path> command line flags"""
+    level = LOG_LEVEL
+    if pop_flag('--quiet'):
+        level = 'warning'
+    if pop_flag('--verbose'):
+        level = 'debug'
+    json_path = pop_option('--log-json') or LOG_JSON_FILE
+    configure_logging(level, json_path)
+
+def get_logger(name):
+    """Get a logger under the "ids" hierarchy"""
+    return logging.getLogger(f"ids.{name}")
+
+class _RoutedStdout:
+    """Stand-in for sys.stdout that sends writes made inside buffered_output() to its buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = _output_buffer.get()
+        if buffer is None:
+            return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if _output_buffer.get() is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+@contextmanager
+def buffered_output():
+    """
+    Hold everything printed or logged to the console inside the block (in this thread
+    or task only) and write it out at once when the block ends.
+    """
+    with _output_lock:
+        if not isinstance(sys.stdout, _RoutedStdout):
+            sys.stdout = _RoutedStdout(sys.stdout)
+            if _console_handler is not None:
+                _console_handler.setStream(sys.stdout)
+    buffer = []
+    token = _output_buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _output_buffer.reset(token)
+        with _output_lock:
+            sys.stdout.write(''.join(buffer))
+            sys.stdout.flush()
+
+def color(fore):
+    """extra= for a log call that shows the message in a colorama color on the console"""
+    return {'color': fore}
+
+def log_event(logger, event, message, **fields):
+    """Record a structured event (JSON sink only); message may use %(field)s placeholders"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(message, fields, extra={'event': True, 'fields': {'event': event, **fields}})
+
+class LazyJson:
+    """Defers json.dumps until a log record is actually formatted"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data, indent=2)
+
+configure_logging()
@@ -1,68 +1,71 @@
-from atlassian import Confluence, Jira
 import re
-from bs4 import BeautifulSoup
 from colorama import init, Fore, Style
-from tabulate import tabulate
-import requests
-import json
+import logging
 import sys
 from config import *
+from page_parser import parse_page_html
+from page_index import PageIndex
+from clients import get_session, get_jira, get_confluence
+from user_cache import get_cached_user, cache_user, apply_user_cache_flags
+from sync_state import row_keys
+from page_cache import get_page_version, load_cached_page, store_cached_page, apply_page_cache_flags
+from log import get_logger, log_event, color, LazyJson, apply_logging_flags
+from metrics import stage, timed_stage, apply_metrics_flags
+from tracing import trace_tags, apply_tracing_flags
+from resilience import call_with_retry, create_issue_idempotent, add_idempotency_label, get_idempotency_label, find_issues_by_labels
 
 # Initialize colorama
 init()
 
+logger = get_logger('main')
+
 # Use the main.py specific variables
 ISSUE_TYPE = TASK_ISSUE_TYPE
 
-def create_jira_ticket(task_data, reporter_account_id, epic_key):
+# Map effort levels to story points
+EFFORT_STORY_POINTS = {
+    "SMALL (1-3 DAYS)": 2,
+    "MEDIUM (1-2 WEEKS)": 5,
+    "LARGE (3+ WEEKS)": 8
+}
+
+def clean_status_text(text):
+    """Strip status macro colour names from a cell value"""
+    return text.replace('Red', '').replace('Yellow', '').replace('Green', '').replace('Blue', '').strip()
+
+def build_ticket_issue_data(task_data, reporter_account_id, epic_key, row_key=None):
+    """
+    Validate a scope table row and build the Jira issue payload for it.
+    Args:
+        row_key: identity of the row (sync_state.row_keys), folded into its idempotency label
+    Returns: issue data dict ({"fields": {...}}) or None if the row is invalid
+    """
     # Validate task data has required fields
     try:
         if len(task_data) < 6:
-            print(f"{Fore.RED}Error: Incomplete task data - need at least 6 fields, got {len(task_data)}{Style.RESET_ALL}")
+            logger.error("Error: Incomplete task data - need at least 6 fields, got %d", len(task_data))
             return None
             
         # Check for required fields
         if not task_data[0] or not task_data[0].strip():
-            print(f"{Fore.RED}Error: Task title is empty or missing{Style.RESET_ALL}")
+            logger.error("Error: Task title is empty or missing")
             return None
             
     except (IndexError, TypeError) as e:
-        print(f"{Fore.RED}Error: Invalid task data structure: {str(e)}{Style.RESET_ALL}")
+        logger.error("Error: Invalid task data structure: %s", e)
         return None
-    
-    # Initialize Jira client
-    jira = Jira(
-        url=JIRA_URL,
-        username=USERNAME,
-        password=API_TOKEN
-    )
-
-    # Map effort levels to story points
-    effort_map = {
-        "SMALL (1-3 DAYS)": 2,
-        "MEDIUM (1-2 WEEKS)": 5,
-        "LARGE (3+ WEEKS)": 8
-    }
 
     try:
         # Get the owner account ID from the table (last element)
         assignee_account_id = task_data[-1]  # The account ID we stored at the end of the cells
 
-        # Debug print for task data
-        print(f"\n{Fore.YELLOW}Debug - Task Data:{Style.RESET_ALL}")
-        print(f"Title: {task_data[0]}")
-        print(f"Priority (raw): {task_data[1] if len(task_data) > 1 else 'None'}")
-        print(f"Level of Effort: {task_data[2] if len(task_data) > 2 else 'None'}")
-        print(f"Owner: {task_data[3] if len(task_data) > 3 else 'None'}")
-        print(f"Owner Account ID: {assignee_account_id}")
-        print(f"Note: {task_data[4] if len(task_data) > 4 else 'None'}")
-
-        # Clean up effort text and get story points
-        effort_text = (task_data[2] if len(task_data) > 2 and task_data[2] else "").replace('Red', '').replace('Yellow', '').replace('Green', '').replace('Blue', '').strip()
-        story_points = effort_map.get(effort_text, 3)  # Default to 3 if not found
+        logger.debug(
+            "Task data: title=%s priority=%s effort=%s owner=%s owner_account_id=%s note=%s",
+            task_data[0], task_data[1], task_data[2], task_data[3], assignee_account_id, task_data[4]
+        )
         
     except (IndexError, TypeError) as e:
-        print(f"{Fore.RED}Error processing task data: {str(e)}{Style.RESET_ALL}")
+        logger.error("Error processing task data: %s", e)
         return None
 
     # Create issue data with safe field access
@@ -70,7 +73,7 @@ def create_jira_ticket(task_data, reporter_account_id, epic_key):
         # Process priority - only set if there's a valid value from the table
         priority_text = None
         if len(task_data) > 1 and task_data[1] and task_data[1].strip():
-            priority_text = task_data[1].replace('Red', '').replace('Yellow', '').replace('Green', '').replace('Blue', '').strip()
+            priority_text = clean_status_text(task_data[1])
             if not priority_text:  # If after cleaning it's empty, don't set priority
                 priority_text = None
             
@@ -87,7 +90,7 @@ def create_jira_ticket(task_data, reporter_account_id, epic_key):
                 "issuetype": {"name": ISSUE_TYPE},
                 "assignee": {"id": assignee_account_id},
                 "reporter": {"id": reporter_account_id},
-                "labels": ["ids-automation"],
+                "labels": [AUTOMATION_LABEL],
                 "components": [{"name": "IDS Internal"}]
             }
         }
@@ -96,43 +99,185 @@ def create_jira_ticket(task_data, reporter_account_id, epic_key):
         if priority_text:
             issue_data["fields"]["priority"] = {"name": priority_text}
     except (IndexError, TypeError) as e:
-        print(f"{Fore.RED}Error creating issue data: {str(e)}{Style.RESET_ALL}")
+        logger.error("Error creating issue data: %s", e)
         return None
     
     # Link to epic if provided
     if epic_key:
         issue_data["fields"]["parent"] = {"key": epic_key}
-        print(f"{Fore.CYAN}Linking ticket to epic: {epic_key}{Style.RESET_ALL}")
+        logger.debug("Linking ticket to epic: %s", epic_key)
+
+    # Mark the issue so a retried create can tell whether it already went through
+    add_idempotency_label(issue_data["fields"], row_key)
+
+    logger.debug("Issue data:\n%s", LazyJson(issue_data))
+
+    return issue_data
 
-    # Debug print the complete issue data
-    print(f"\n{Fore.YELLOW}Debug - Issue Data:{Style.RESET_ALL}")
-    print(json.dumps(issue_data, indent=2))
+def log_created_ticket(ticket_key, task_data, issue_data):
+    """Log a successfully created ticket (its details at debug level)"""
+    logger.info("✓ Successfully created Jira ticket: %s (%s)", ticket_key, task_data[0], extra=color(Fore.GREEN))
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    fields = issue_data["fields"]
+    effort_text = clean_status_text(task_data[2] if task_data[2] else "")
+    priority = fields.get("priority", {}).get("name")
+    logger.debug(
+        "Priority: %s\nStory Points: %s\nAssignee: %s\nLabels: %s\nComponents: %s",
+        priority if priority else 'Not set (will use Jira default)',
+        EFFORT_STORY_POINTS.get(effort_text, 3),  # Default to 3 if not found
+        task_data[3],
+        ', '.join(fields['labels']),
+        ', '.join(c['name'] for c in fields['components'])
+    )
+
+@timed_stage('jira.create_ticket')
+def create_jira_ticket(task_data, reporter_account_id, epic_key, row_key=None):
+    issue_data = build_ticket_issue_data(task_data, reporter_account_id, epic_key, row_key)
+    if not issue_data:
+        return None
+
+    # Get the shared Jira client
+    jira = get_jira(JIRA_URL, USERNAME, API_TOKEN)
 
     try:
-        # Create the issue
-        ticket = jira.issue_create(fields=issue_data["fields"])
-        print(f"{Fore.GREEN}Successfully created Jira ticket: {ticket['key']}{Style.RESET_ALL}")
-        print(f"Title: {task_data[0]}")
-        print(f"Priority: {priority_text if priority_text else 'Not set (will use Jira default)'}")
-        print(f"Story Points: {story_points}")
-        print(f"Assignee: {task_data[3]}")
-        print(f"Labels: {', '.join(issue_data['fields']['labels'])}")
-        print(f"Components: {', '.join(c['name'] for c in issue_data['fields']['components'])}")
+        # Create the issue (retried without duplicates on transient failures)
+        ticket = create_issue_idempotent(jira, issue_data["fields"])
+        log_created_ticket(ticket['key'], task_data, issue_data)
+        log_event(logger, 'ticket_created', "Created ticket %(key)s", key=ticket['key'], summary=task_data[0], epic=epic_key)
         return ticket
     except Exception as e:
-        print(f"{Fore.RED}Failed to create Jira ticket: {str(e)}{Style.RESET_ALL}")
+        logger.error("Failed to create Jira ticket: %s", e)
+        log_event(logger, 'ticket_failed', "Failed to create ticket %(summary)s", summary=task_data[0], epic=epic_key, error=str(e))
         return None
 
+def format_bulk_error(error):
+    """Turn one entry of a bulk create 'errors' list into a readable message"""
+    element_errors = error.get('elementErrors', {})
+    messages = list(element_errors.get('errorMessages', []))
+    messages.extend(f"{field}: {message}" for field, message in element_errors.get('errors', {}).items())
+    return '; '.join(messages) or f"status {error.get('status', 'unknown')}"
+
+def create_jira_tickets_bulk(issue_data_list, on_chunk_created=None):
+    """
+    Create many Jira issues through the bulk create endpoint, JIRA_BULK_CREATE_SIZE per request.
+    Args:
+        issue_data_list: list of issue data dicts as built by build_ticket_issue_data
+        on_chunk_created: optional callback(start, chunk_results), called as soon as each chunk's
+            results are known, where start is the chunk's offset in issue_data_list
+    Returns:
+        list of (ticket, error) tuples in the same order as issue_data_list;
+        ticket is the created issue ({'id', 'key', 'self'}) or None, error is a message or None
+    """
+    results = [(None, None)] * len(issue_data_list)
+
+    for start in range(0, len(issue_data_list), JIRA_BULK_CREATE_SIZE):
+        chunk = issue_data_list[start:start + JIRA_BULK_CREATE_SIZE]
+        logger.info("Submitting %d tickets in one bulk request...", len(chunk), extra=color(Fore.CYAN))
+        on_created = (lambda chunk_results, start=start: on_chunk_created(start, chunk_results)) if on_chunk_created else None
+        results[start:start + len(chunk)] = create_bulk_chunk(chunk, on_created)
+
+    return results
+
+def submit_bulk_chunk(chunk):
+    """
+    Send one bulk create request.
+    Returns: list of (ticket, error) tuples, one per submitted issue
+    Raises: requests.HTTPError on a 5xx/429 response so the chunk can be retried
+    """
+    response = get_session().post(
+        f"{JIRA_URL}/rest/api/2/issue/bulk",
+        json={"issueUpdates": chunk},
+        auth=(USERNAME, API_TOKEN),
+        headers={'Accept': 'application/json'}
+    )
+    if response.status_code >= 500 or response.status_code == 429:
+        response.raise_for_status()
+    body = response.json() if response.content else {}
+    return map_bulk_create_results(body, len(chunk), response.status_code)
+
+def recover_created_issues(chunk, remaining, results):
+    """
+    After a failed bulk attempt, find the issues of chunk it created anyway by their idempotency label.
+    Their results are filled in and their indexes dropped from remaining (both in place).
+    Returns: [] once nothing is left to resubmit, otherwise None (a before_retry result for call_with_retry)
+    """
+    labels = {get_idempotency_label(chunk[i]["fields"]): i for i in remaining}
+    found = find_issues_by_labels(get_jira(JIRA_URL, USERNAME, API_TOKEN), [label for label in labels if label])
+    for label, ticket in found.items():
+        results[labels[label]] = (ticket, None)
+        remaining.remove(labels[label])
+    if found:
+        logger.info("%d tickets were already created by the failed request, resubmitting %d", len(found), len(remaining), extra=color(Fore.GREEN))
+    return [] if not remaining else None
+
+@timed_stage('jira.bulk_create')
+def create_bulk_chunk(chunk, on_created=None):
+    """
+    Create one bulk chunk, retrying transient failures. Before each retry, issues
+    that an earlier attempt already created are found by their idempotency label
+    and dropped from the resubmitted chunk.
+    Args:
+        on_created: optional callback(results), called with the chunk's results before returning,
+            so callers can record what was created before the next chunk is sent
+    Returns: list of (ticket, error) tuples, one per issue in chunk
+    """
+    results = [(None, None)] * len(chunk)
+    remaining = list(range(len(chunk)))
+
+    try:
+        chunk_results = call_with_retry(
+            'jira.issue_bulk',
+            lambda: submit_bulk_chunk([chunk[i] for i in remaining]),
+            before_retry=lambda: recover_created_issues(chunk, remaining, results)
+        )
+    except Exception as e:
+        for i in remaining:
+            results[i] = (None, f"bulk request failed: {str(e)}")
+    else:
+        # recover_created only runs between attempts, so remaining matches the last submitted chunk
+        for i, result in zip(remaining, chunk_results):
+            results[i] = result
+    if on_created:
+        on_created(results)  # Includes issues recovered from a failed attempt
+    return results
+
+def map_bulk_create_results(body, chunk_size, status_code):
+    """
+    Map a bulk create response back to the submitted chunk.
+    Returns: list of (ticket, error) tuples, one per submitted issue
+    """
+    # Failed elements are reported by index; created issues come back in order for the rest
+    failed = {error.get('failedElementNumber'): format_bulk_error(error) for error in body.get('errors', [])}
+    created = iter(body.get('issues', []))
+    results = []
+    for offset in range(chunk_size):
+        if offset in failed:
+            results.append((None, failed[offset]))
+        else:
+            ticket = next(created, None)
+            if ticket:
+                results.append((ticket, None))
+            else:
+                results.append((None, f"no result returned (status {status_code})"))
+    return results
+
+@timed_stage('users.lookup')
 def get_user_details(account_id, confluence_url, username, api_token):
     """
     Get user details using direct REST API call.
+    Results are served from the persistent user cache when available.
     """
+    cached = get_cached_user(account_id)
+    if cached:
+        return cached
+
     # Construct the API URL - using the correct Confluence API endpoint
     api_url = f"{confluence_url}/wiki/rest/api/user"
     params = {'accountId': account_id}  # Use the complete account ID
     
     # Make the API request
-    response = requests.get(
+    response = get_session().get(
         api_url,
         params=params,
         auth=(username, api_token),
@@ -140,14 +285,67 @@ def get_user_details(account_id, confluence_url, username, api_token):
     )
     
     if response.status_code == 200:
-        return response.json()
+        user_details = response.json()
+        cache_user(account_id, user_details)
+        return user_details
     else:
         print(f"{Fore.RED}API request failed with status {response.status_code}: {response.text}{Style.RESET_ALL}")
         return None
 
-def extract_tagged_users(cell, confluence_url, username, api_token):
+def get_users_bulk(account_ids, confluence_url, username, api_token):
+    """
+    Resolve many account IDs at once using the bulk user endpoint.
+    Cached users are served locally; the rest are fetched in chunks of USER_BULK_CHUNK_SIZE.
+    Returns: dict mapping account ID to user details
+    """
+    users = {}
+    missing = []
+    for account_id in dict.fromkeys(account_ids):  # Distinct, order preserved
+        cached = get_cached_user(account_id)
+        if cached:
+            users[account_id] = cached
+        else:
+            missing.append(account_id)
+
+    api_url = f"{confluence_url}/wiki/rest/api/user/bulk"
+    for start in range(0, len(missing), USER_BULK_CHUNK_SIZE):
+        chunk = missing[start:start + USER_BULK_CHUNK_SIZE]
+        try:
+            response = get_session().get(
+                api_url,
+                params={'accountId': chunk, 'limit': len(chunk)},
+                auth=(username, api_token),
+                headers={'Accept': 'application/json'}
+            )
+        except Exception as e:
+            print(f"{Fore.RED}Bulk user request failed: {str(e)}{Style.RESET_ALL}")
+            continue
+
+        if response.status_code == 200:
+            for user_details in response.json().get('results', []):
+                account_id = user_details.get('accountId')
+                if account_id:
+                    users[account_id] = user_details
+                    cache_user(account_id, user_details)
+        else:
+            print(f"{Fore.RED}Bulk user request failed with status {response.status_code}: {response.text}{Style.RESET_ALL}")
+
+    return users
+
+def collect_page_users(index, confluence_url, username, api_token):
+    """
+    Resolve every distinct user tagged anywhere on the page (owners and DRI) in one pass.
+    Args:
+        index: PageIndex of the page
+    Returns: dict mapping account ID to user details, for use with extract_tagged_users
+    """
+    return get_users_bulk(index.account_ids, confluence_url, username, api_token)
+
+def extract_tagged_users(cell, confluence_url, username, api_token, user_map=None):
     """
     Extract tagged users from a Confluence cell and get their display names.
+    If user_map is given (see collect_page_users), users are resolved from it
+    and only users missing from the map fall back to a REST call.
     """
     users = []
     
@@ -160,8 +358,10 @@ def extract_tagged_users(cell, confluence_url, username, api_token):
         
         if account_id:
             try:
-                # Get user details using direct API call
-                user_details = get_user_details(account_id, confluence_url, username, api_token)
+                # Get user details from the pre-resolved map, falling back to a direct API call
+                user_details = user_map.get(account_id) if user_map else None
+                if not user_details:
+                    user_details = get_user_details(account_id, confluence_url, username, api_token)
                 
                 if user_details and 'displayName' in user_details:
                     display_name = user_details['displayName']
@@ -179,104 +379,127 @@ def extract_tagged_users(cell, confluence_url, username, api_token):
     
     return users
 
-def get_scope_table(page_id, create_tickets=True):
+def parse_scope_table(index, user_map=None, verbose=True):
     """
-    Fetch and parse the table under the Scope header from the Confluence page.
+    Extract the DRI and the table under the Scope header from an indexed page.
     Args:
-        page_id: The Confluence page ID to process
-        create_tickets: If True, create tickets; if False, just return the data
+        index: PageIndex of the page's storage body
+        user_map: Pre-resolved users from collect_page_users (misses fall back to REST calls)
+        verbose: If False, skip the debug output
     Returns:
-        If create_tickets=False: (rows, dri_account_id) tuple
-        If create_tickets=True: None (creates tickets directly)
+        (headers, rows, dri_account_id) tuple, or None if the header or table is missing
     """
-    # Initialize Confluence client
-    confluence = Confluence(
-        url=CONFLUENCE_URL,
-        username=USERNAME,
-        password=API_TOKEN
-    )
-
-    # Get page content
-    page_content = confluence.get_page_by_id(page_id=page_id, expand="body.storage")
-    if not page_content:
-        print(f"{Fore.RED}Failed to fetch Confluence page content.{Style.RESET_ALL}")
-        return
-
-    # Get the HTML content
-    html_content = page_content.get('body', {}).get('storage', {}).get('value', '')
-    
-    # Parse HTML with BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Find the DRI line
-    dri = None
-    dri_account_id = None
-    for p in soup.find_all('p'):
-        text = p.get_text(strip=True)
-        if text.startswith('DRI:'):
-            # Find the user element to get account ID
-            user_element = p.find('ri:user')
-            if user_element:
-                dri_account_id = user_element.get('ri:account-id')
-                # Get display name for debug
-                users = extract_tagged_users(p, CONFLUENCE_URL, USERNAME, API_TOKEN)
-                if users:
-                    print(f"\n{Fore.YELLOW}Debug - DRI/Reporter:{Style.RESET_ALL}")
-                    print(f"Original: {users[0]}")
-                    print(f"Account ID: {dri_account_id}")
-                break
+    # The DRI line was located while indexing
+    dri_account_id = index.dri_account_id
+    if index.dri_paragraph is not None and verbose and logger.isEnabledFor(logging.DEBUG):
+        # Get display name for debug
+        users = extract_tagged_users(index.dri_paragraph, CONFLUENCE_URL, USERNAME, API_TOKEN, user_map)
+        if users:
+            logger.debug("DRI/Reporter: %s (account ID %s)", users[0], dri_account_id)
     
     # Find the Scope header
-    scope_header = soup.find('h1', string=PRD_PAGE_TABLE_HEADER)
+    scope_header = index.find_heading('h1', PRD_PAGE_TABLE_HEADER)
     if not scope_header:
         print(f"{Fore.RED}Could not find '{PRD_PAGE_TABLE_HEADER}' header{Style.RESET_ALL}")
-        return
+        return None
     
     # Find the next table after the Scope header
-    table = scope_header.find_next('table')
+    table = index.table_after(scope_header)
     if not table:
         print(f"{Fore.RED}Could not find table under '{PRD_PAGE_TABLE_HEADER}' header{Style.RESET_ALL}")
-        return
+        return None
     
     # Extract table data
-    headers = [th.get_text(strip=True) for th in table.find_all('th')]
-    print(f"\n{Fore.YELLOW}Debug - Headers:{Style.RESET_ALL}")
-    print(headers)
+    headers = table.headers
+    if verbose:
+        logger.debug("Headers: %s", headers)
     
     rows = []
-    for row in table.find_all('tr')[1:]:  # Skip header row
+    for row in table.rows:
         cells = []
         owner_account_id = None
-        for i, td in enumerate(row.find_all('td')):
+        for i, cell in enumerate(row):
             if i == 3:  # Owner column (4th column)
                 # Get the first user element for account ID
-                user_element = td.find('ri:user')
+                user_element = cell.element.find('ri:user')
                 if user_element:
                     owner_account_id = user_element.get('ri:account-id')
                 # Get display names for display
-                users = extract_tagged_users(td, CONFLUENCE_URL, USERNAME, API_TOKEN)
+                users = extract_tagged_users(cell.element, CONFLUENCE_URL, USERNAME, API_TOKEN, user_map)
                 owner_text = ', '.join(users) if users else ''
                 cells.append(owner_text)
-            elif i == 4:  # Note column (5th column)
-                cells.append(td.get_text(strip=True))
             else:
-                cells.append(td.get_text(strip=True))
+                cells.append(cell.text)
         if cells:
             # Add the owner account ID as the last element
             cells.append(owner_account_id)
             rows.append(cells)
+
+    return headers, rows, dri_account_id
+
+def get_scope_table(page_id, create_tickets=True, verbose=True):
+    """
+    Fetch and parse the table under the Scope header from the Confluence page.
+    Args:
+        page_id: The Confluence page ID to process
+        create_tickets: If True, create tickets; if False, just return the data
+        verbose: If False, skip the debug and table output (used when prefetching in the background)
+    Returns:
+        If create_tickets=False: (rows, dri_account_id) tuple
+        If create_tickets=True: None (creates tickets directly)
+    """
+    # Reuse the cached parse if the page has not changed since it was stored
+    with stage('confluence.page_version'):
+        version = get_page_version(page_id)
+    cached = load_cached_page(page_id, 'scope', version)
+    if cached:
+        headers, rows, dri_account_id = cached['headers'], cached['rows'], cached['dri_account_id']
+    else:
+        # Get the shared Confluence client, only needed when the page has to be fetched
+        confluence = get_confluence(CONFLUENCE_URL, USERNAME, API_TOKEN)
+
+        # Get page content
+        with stage('confluence.page_fetch'):
+            page_content = confluence.get_page_by_id(page_id=page_id, expand="body.storage,version")
+        if not page_content:
+            print(f"{Fore.RED}Failed to fetch Confluence page content.{Style.RESET_ALL}")
+            return
+
+        # Get the HTML content
+        html_content = page_content.get('body', {}).get('storage', {}).get('value', '')
+        
+        # Parse only the headings, paragraphs and tables, then index them in one pass
+        with stage('parse.html'):
+            index = PageIndex(parse_page_html(html_content))
+
+        # Resolve all tagged users on the page up front
+        with stage('users.bulk'):
+            user_map = collect_page_users(index, CONFLUENCE_URL, USERNAME, API_TOKEN)
+
+        with stage('parse.scope_table'):
+            result = parse_scope_table(index, user_map, verbose)
+        if not result:
+            return
+        headers, rows, dri_account_id = result
+        store_cached_page(page_id, 'scope', page_content.get('version', {}).get('number'), {
+            'headers': headers,
+            'rows': rows,
+            'dri_account_id': dri_account_id
+        })
     
     # Print the table with formatting
-    print(f"\n{Fore.CYAN}Table under Scope header:{Style.RESET_ALL}")
-    # Create a copy of rows without the account ID for display
-    display_rows = [row[:-1] for row in rows] if rows and len(rows[0]) > 5 else rows
-    print(tabulate(display_rows, headers=headers, tablefmt="grid"))
+    if verbose:
+        from tabulate import tabulate
+        print(f"\n{Fore.CYAN}Table under Scope header:{Style.RESET_ALL}")
+        # Create a copy of rows without the account ID for display
+        display_rows = [row[:-1] for row in rows] if rows and len(rows[0]) > 5 else rows
+        print(tabulate(display_rows, headers=headers, tablefmt="grid"))
 
     if create_tickets:
         # Create Jira ticket for the first row (original behavior)
         if rows:
             print(f"\n{Fore.YELLOW}Creating Jira ticket for first task...{Style.RESET_ALL}")
-            create_jira_ticket(rows[0], dri_account_id, None)  # Pass None for epic_key since main.py doesn't link to epics
+            create_jira_ticket(rows[0], dri_account_id, None, row_keys(page_id, rows)[0])  # Pass None for epic_key since main.py doesn't link to epics
         else:
             print(f"{Fore.RED}No tasks found in the table.{Style.RESET_ALL}")
     else:
@@ -294,6 +517,18 @@ def main():
     if handle_help_request([
         "python main.py <page_id>          # Process specific Confluence page ID",
         "",
+        "Options:",
+        "  --no-user-cache        Bypass the cached Confluence user lookups",
+        "  --refresh-user-cache   Invalidate the user cache before running",
+        "  --no-page-cache        Always refetch and reparse the page",
+        "  --quiet                Hide per-row progress; show warnings, errors and summaries",
+        "  --verbose              Print debug output (task data, issue payloads)",
+        "  --log-json <path>      Also write JSON-lines logs and events to a file",
+        "  --metrics-json <path>  Also write the run metrics (stage timings, API calls) to a file",
+        "  --trace-memory         Report peak memory (tracemalloc) with the run metrics",
+        "  --no-metrics           Do not print the run metrics table",
+        "  --trace <path>         Write a Chrome trace of every page, parse, lookup and Jira write",
+        "",
         "This script processes a Confluence page and creates a Jira ticket from the first task"
     ]):
         return
@@ -302,6 +537,12 @@ def main():
     if not handle_config_validation():
         return
 
+    apply_logging_flags()
+    apply_metrics_flags()
+    apply_tracing_flags()
+    apply_user_cache_flags()
+    apply_page_cache_flags()
+
     # Require page ID as command line argument
     if len(sys.argv) < 2:
         print(f"{Fore.RED}Error: Page ID is required{Style.RESET_ALL}")
@@ -313,7 +554,8 @@ def main():
     print(f"{Fore.CYAN}Processing page ID: {page_id}{Style.RESET_ALL}")
     
     print(f"{Fore.GREEN}Fetching table from Confluence page...{Style.RESET_ALL}")
-    get_scope_table(page_id, create_tickets=True)
+    with trace_tags(page_id=page_id):
+        get_scope_table(page_id, create_tickets=True)
     print(f"\n{Fore.GREEN}Done!{Style.RESET_ALL}")
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+"""
+Per-stage timing and API call accounting for a run.
+
+Stages (page fetch, parsing, user lookups, link resolution, Jira writes) are
+timed with stage() / @timed_stage. Every HTTP request made through the shared
+session or the pipeline's httpx client is recorded per endpoint with its
+latency, status and bytes sent/received. At exit a summary table is printed
+(p50/p95 latency per endpoint), optionally exported as JSON, together with
+the tracemalloc peak when memory tracing is on. Stages and requests are also
+recorded as trace spans when tracing.py is enabled.
+"""
+import atexit
+import functools
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from colorama import Fore, Style
+from tracing import add_span
+from config import METRICS_ENABLED, METRICS_JSON_FILE, METRICS_TRACE_MEMORY, pop_flag, pop_option
+
+_lock = threading.Lock()
+_stages = {}     # name -> {'calls', 'total', 'max'}
+_endpoints = {}  # "METHOD /path" -> {'calls', 'errors', 'latencies', 'bytes_sent', 'bytes_received'}
+_started_at = time.monotonic()
+_enabled = METRICS_ENABLED
+_json_path = METRICS_JSON_FILE
+
+# Path segments that vary per call are collapsed so calls group by endpoint
+_ID_PATTERNS = [
+    (re.compile(r'/wiki/x/[^/]+'), '/wiki/x/{code}'),
+    (re.compile(r'/[A-Z][A-Z0-9]+-\d+(?=/|$)'), '/{key}'),
+    (re.compile(r'/\d{3,}(?=/|$)'), '/{id}'),  # Not API versions like /rest/api/2
+]
+
+def apply_metrics_flags():
+    """Handle the --no-metrics, --metrics-json <path> and --trace-memory command line flags"""
+    global _enabled, _json_path
+    if pop_flag('--no-metrics'):
+        _enabled = False
+    _json_path = pop_option('--metrics-json') or _json_path
+    if pop_flag('--trace-memory') or METRICS_TRACE_MEMORY:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+def endpoint_name(method, url):
+    """Group a request by method and path, with IDs and keys collapsed"""
+    path = urlsplit(str(url)).path
+    for pattern, replacement in _ID_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return f"{method.upper()} {path}"
+
+def record_request(method, url, status_code, latency, bytes_sent=0, bytes_received=0):
+    """Account one HTTP request (status_code 0 for a request that raised)"""
+    name = endpoint_name(method, url)
+    add_span(name, time.perf_counter() - latency, latency, 'http', status=status_code)
+    with _lock:
+        entry = _endpoints.setdefault(name, {'calls': 0, 'errors': 0, 'latencies': [], 'bytes_sent': 0, 'bytes_received': 0})
+        entry['calls'] += 1
+        if not status_code or status_code >= 400:
+            entry['errors'] += 1
+        entry['latencies'].append(latency)
+        entry['bytes_sent'] += bytes_sent
+        entry['bytes_received'] += bytes_received
+
+def record_stage(name, elapsed):
+    """Account one run of a stage"""
+    with _lock:
+        entry = _stages.setdefault(name, {'calls': 0, 'total': 0.0, 'max': 0.0})
+        entry['calls'] += 1
+        entry['total'] += elapsed
+        entry['max'] = max(entry['max'], elapsed)
+
+@contextmanager
+def stage(name, **tags):
+    """Time a block as one run of the named stage (and a span tagged with tags when tracing)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        record_stage(name, elapsed)
+        add_span(name, started, elapsed, 'stage', **tags)
+
+def timed_stage(name):
+    """Decorator timing every call of a function as the named stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+def get_metrics():
+    """
+    Snapshot of everything recorded so far.
+    Returns: dict with 'wall_time', 'stages', 'endpoints' and 'peak_memory_bytes' (None unless tracing)
+    """
+    tracemalloc = sys.modules.get('tracemalloc')  # Only imported when memory tracing was requested
+    with _lock:
+        stages = {
+            name: {'calls': entry['calls'], 'total_seconds': entry['total'], 'max_seconds': entry['max']}
+            for name, entry in _stages.items()
+        }
+        endpoints = {
+            name: {
+                'calls': entry['calls'],
+                'errors': entry['errors'],
+                'p50_seconds': percentile(entry['latencies'], 0.50),
+                'p95_seconds': percentile(entry['latencies'], 0.95),
+                'total_seconds': sum(entry['latencies']),
+                'bytes_sent': entry['bytes_sent'],
+                'bytes_received': entry['bytes_received']
+            }
+            for name, entry in _endpoints.items()
+        }
+    return {
+        'wall_time': time.monotonic() - _started_at,
+        'stages': stages,
+        'endpoints': endpoints,
+        'peak_memory_bytes': tracemalloc.get_traced_memory()[1] if tracemalloc and tracemalloc.is_tracing() else None
+    }
+
+def _format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+def print_metrics_report():
+    """Print the stage and endpoint summary tables, and export them if requested"""
+    if not _enabled:
+        return
+    metrics = get_metrics()
+    if not metrics['stages'] and not metrics['endpoints']:
+        return
+
+    from tabulate import tabulate
+
+    print(f"\n{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}RUN METRICS (wall time {metrics['wall_time']:.2f}s){Style.RESET_ALL}")
+    if metrics['stages']:
+        rows = [
+            [name, entry['calls'], f"{entry['total_seconds']:.3f}", f"{entry['total_seconds'] / entry['calls']:.3f}", f"{entry['max_seconds']:.3f}"]
+            for name, entry in sorted(metrics['stages'].items(), key=lambda item: -item[1]['total_seconds'])
+        ]
+        print(tabulate(rows, headers=['Stage', 'Calls', 'Total (s)', 'Mean (s)', 'Max (s)'], tablefmt="grid"))
+    if metrics['endpoints']:
+        rows = [
+            [name, entry['calls'], entry['errors'], f"{entry['p50_seconds'] * 1000:.0f}", f"{entry['p95_seconds'] * 1000:.0f}",
+             _format_bytes(entry['bytes_sent']), _format_bytes(entry['bytes_received'])]
+            for name, entry in sorted(metrics['endpoints'].items(), key=lambda item: -item[1]['total_seconds'])
+        ]
+        print(tabulate(rows, headers=['Endpoint', 'Calls', 'Errors', 'p50 (ms)', 'p95 (ms)', 'Sent', 'Received'], tablefmt="grid"))
+    if metrics['peak_memory_bytes'] is not None:
+        print(f"{Fore.CYAN}Peak traced memory: {_format_bytes(metrics['peak_memory_bytes'])}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
+
+    if _json_path:
+        with open(_json_path, 'w') as f:
+            json.dump(metrics, f, indent=2)
+        print(f"{Fore.GREEN}Metrics written to {_json_path}{Style.RESET_ALL}")
+
+atexit.register(print_metrics_report)
@@ -0,0 +1,79 @@
+"""
+Version-keyed cache of parsed Confluence pages.
+
+Parsed results are stored per page under CACHE_DIR/pages together with the
+Confluence version.number they were parsed from. A cheap version-only request
+decides whether the cached rows can be reused or the page must be refetched.
+"""
+import json
+import os
+from colorama import Fore, Style
+from config import CONFLUENCE_URL, USERNAME, API_TOKEN, CACHE_DIR, PAGE_CACHE_ENABLED, pop_flag
+from clients import get_session
+
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, 'pages')
+
+_enabled = PAGE_CACHE_ENABLED
+
+def apply_page_cache_flags():
+    """Handle the --no-page-cache command line flag"""
+    global _enabled
+    if pop_flag('--no-page-cache'):
+        _enabled = False
+
+def page_cache_enabled():
+    """Whether parsed pages are cached (PAGE_CACHE_ENABLED, unless --no-page-cache was given)"""
+    return _enabled
+
+def get_page_version(page_id):
+    """
+    Get the current version number of a page without downloading its body.
+    Uses the shared session directly, so a cache hit never has to build the Confluence client.
+    Returns: version number, or None if it could not be determined
+    """
+    if not _enabled:
+        return None
+    try:
+        response = get_session().get(
+            f"{CONFLUENCE_URL}/wiki/rest/api/content/{page_id}",
+            params={'expand': 'version'},
+            auth=(USERNAME, API_TOKEN),
+            headers={'Accept': 'application/json'}
+        )
+        response.raise_for_status()
+        return response.json().get('version', {}).get('number')
+    except Exception as e:
+        print(f"{Fore.YELLOW}Warning: could not check version of page {page_id}: {str(e)}{Style.RESET_ALL}")
+        return None
+
+def _cache_path(page_id, kind):
+    return os.path.join(PAGE_CACHE_DIR, f"{kind}-{page_id}.json")
+
+def load_cached_page(page_id, kind, version):
+    """
+    Return the cached parse result for a page if it was parsed from this version.
+    Args:
+        kind: Which parser produced the result ('scope' or 'planned')
+    """
+    if not _enabled or version is None:
+        return None
+    try:
+        with open(_cache_path(page_id, kind), 'r') as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if entry.get('version') != version:
+        return None
+    print(f"{Fore.GREEN}Page {page_id} unchanged (version {version}), using cached parse{Style.RESET_ALL}")
+    return entry.get('data')
+
+def store_cached_page(page_id, kind, version, data):
+    """Store the parse result for a page at the given version"""
+    if not _enabled or version is None:
+        return
+    os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+    path = _cache_path(page_id, kind)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': version, 'data': data}, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,87 @@
+"""
+Single-pass index of a parsed Confluence page shared by main.py and create_epic.py.
+
+One traversal of the document records the headings, the table that follows
+each heading, the DRI paragraph and every tagged user, so callers never have
+to search the whole DOM again.
+"""
+from collections import namedtuple
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# A table cell's extracted text alongside its element (for users and links)
+Cell = namedtuple('Cell', ['text', 'element'])
+
+class TableIndex:
+    """Header texts and body rows (as Cells) of one table"""
+
+    def __init__(self, table):
+        self.element = table
+        self.headers = [th.get_text(strip=True) for th in table.find_all('th')]
+        self.rows = [
+            [Cell(td.get_text(strip=True), td) for td in tr.find_all('td')]
+            for tr in table.find_all('tr')[1:]  # Skip header row
+        ]
+
+class PageIndex:
+    """
+    Headings, following tables, DRI and tagged users of a page, built in one traversal.
+    Attributes:
+        headings: heading elements in document order
+        dri_paragraph: first paragraph starting with "DRI:" that tags a user, or None
+        dri_account_id: account ID tagged in the DRI paragraph, or None
+        account_ids: every tagged account ID on the page, in document order
+    """
+
+    def __init__(self, soup):
+        self.headings = []
+        self.dri_paragraph = None
+        self.dri_account_id = None
+        self.account_ids = []
+        self._following_table = {}
+        self._tables = {}
+
+        waiting = []  # Headings whose following table has not been seen yet
+        for element in soup.find_all(True):
+            name = element.name
+            if name in HEADING_TAGS:
+                self.headings.append(element)
+                waiting.append(element)
+            elif name == 'table':
+                for heading in waiting:
+                    self._following_table[id(heading)] = element
+                waiting = []
+            elif name == 'ri:user':
+                account_id = element.get('ri:account-id')
+                if account_id:
+                    self.account_ids.append(account_id)
+            elif name == 'p' and self.dri_paragraph is None:
+                if element.get_text(strip=True).startswith('DRI:'):
+                    user_element = element.find('ri:user')
+                    if user_element:
+                        self.dri_paragraph = element
+                        self.dri_account_id = user_element.get('ri:account-id')
+
+    def find_heading(self, name, match):
+        """
+        Find the first heading of the given level whose string matches.
+        Args:
+            match: exact string, or a callable taking the heading string (like BeautifulSoup's string=)
+        """
+        for heading in self.headings:
+            if heading.name != name:
+                continue
+            if callable(match) and match(heading.string):
+                return heading
+            if not callable(match) and heading.string == match:
+                return heading
+        return None
+
+    def table_after(self, heading):
+        """Return the TableIndex for the first table following a heading, or None"""
+        table = self._following_table.get(id(heading))
+        if table is None:
+            return None
+        if id(table) not in self._tables:
+            self._tables[id(table)] = TableIndex(table)
+        return self._tables[id(table)]
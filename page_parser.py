@@ -0,0 +1,39 @@
+"""
+Pluggable HTML parser backend for Confluence storage-format pages.
+
+Pages are parsed with lxml by default (falling back to html.parser when lxml
+is not installed or HTML_PARSER=html.parser), and only the elements the tools
+read are materialized: headings, paragraphs (for the DRI line) and tables.
+Long prose, macros and images outside of those are skipped by the strainer.
+"""
+import html
+import re
+from colorama import Fore, Style
+from config import HTML_PARSER
+
+# Elements needed by get_scope_table and get_planned_epics; everything else is dropped while parsing
+PAGE_ELEMENTS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table']
+
+_CDATA_PATTERN = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+
+_backend = HTML_PARSER
+
+def _unwrap_cdata(html_content):
+    """lxml's HTML parser discards CDATA sections, which Confluence uses for link bodies"""
+    return _CDATA_PATTERN.sub(lambda match: html.escape(match.group(1)), html_content)
+
+def parse_page_html(html_content):
+    """
+    Parse a page's storage body, keeping only headings, paragraphs and tables.
+    Returns: BeautifulSoup document
+    """
+    global _backend
+    from bs4 import BeautifulSoup, SoupStrainer, FeatureNotFound  # Deferred: only needed once a page is parsed
+    strainer = SoupStrainer(PAGE_ELEMENTS)
+    if _backend == 'lxml':
+        try:
+            return BeautifulSoup(_unwrap_cdata(html_content), 'lxml', parse_only=strainer)
+        except FeatureNotFound:
+            print(f"{Fore.YELLOW}Warning: lxml is not installed, falling back to html.parser{Style.RESET_ALL}")
+            _backend = 'html.parser'
+    return BeautifulSoup(html_content, 'html.parser', parse_only=strainer)
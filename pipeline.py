@@ -0,0 +1,373 @@
+"""
+asyncio pipeline engine for bulk runs: fetch -> parse -> resolve -> create
+
+Each stage is a pool of workers connected to the next one by a bounded queue,
+so page downloads, HTML parsing, user lookups and Jira writes for different
+pages overlap instead of running strictly one after another. Like
+`create_ticket.py all --yes`, pages unchanged since their last parse come from
+the page cache, and runs are journaled so they can be resumed.
+"""
+import asyncio
+import importlib.util
+import sys
+from colorama import init, Fore, Style
+from config import *
+from page_parser import parse_page_html
+from page_index import PageIndex
+from user_cache import get_cached_user, cache_user, apply_user_cache_flags
+from page_cache import page_cache_enabled, load_cached_page, store_cached_page, apply_page_cache_flags
+from main import parse_scope_table, map_bulk_create_results, recover_created_issues
+from create_ticket import get_available_pages, filter_synced_rows, filter_existing_tickets, prepare_ticket_payloads, record_created_tickets, report_created_tickets, print_overall_summary
+from sync_state import save_sync_state, apply_sync_state_flags
+from run_journal import start_run, record_done, get_done
+from log import buffered_output, apply_logging_flags
+from resilience import call_with_retry_async
+from metrics import stage, apply_metrics_flags
+from tracing import trace_tags, apply_tracing_flags
+
+# Initialize colorama
+init()
+
+# Marker passed down the queues once a stage has no more work
+_STOP = object()
+
+def make_async_client():
+    """Build the pooled httpx client shared by every pipeline stage"""
+    import httpx
+    from rate_limit import RateLimitedAsyncTransport
+    return httpx.AsyncClient(
+        auth=(USERNAME, API_TOKEN),
+        headers={'Accept': 'application/json'},
+        transport=RateLimitedAsyncTransport(
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+        ),
+        timeout=30
+    )
+
+async def run_stage(name, handler, inbox, outbox, concurrency):
+    """
+    Run `concurrency` workers that take jobs from inbox, pass them through handler
+    and put the results on outbox. Jobs whose handler fails or returns None are dropped.
+    The stop marker is forwarded to outbox once every worker has finished.
+    """
+    async def worker():
+        while True:
+            job = await inbox.get()
+            if job is _STOP:
+                await inbox.put(_STOP)  # Let sibling workers see it too
+                return
+            try:
+                with trace_tags(page_id=job.get('page_id'), epic_key=job.get('epic_key')), stage(f"pipeline.{name}"):
+                    result = await handler(job)
+            except Exception as e:
+                print(f"{Fore.RED}Pipeline {name} stage failed for page {job.get('page_id')}: {str(e)}{Style.RESET_ALL}")
+                result = None
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    if outbox is not None:
+        await outbox.put(_STOP)
+
+def index_page_html(html_content):
+    """Parse and index a page body (runs in a worker thread)"""
+    return PageIndex(parse_page_html(html_content))
+
+async def fetch_page_version(client, page_id):
+    """
+    Async counterpart of page_cache.get_page_version.
+    Returns: version number, or None if it could not be determined
+    """
+    try:
+        response = await client.get(f"{CONFLUENCE_URL}/wiki/rest/api/content/{page_id}", params={'expand': 'version'})
+        response.raise_for_status()
+        return response.json().get('version', {}).get('number')
+    except Exception as e:
+        print(f"{Fore.YELLOW}Warning: could not check version of page {page_id}: {str(e)}{Style.RESET_ALL}")
+        return None
+
+async def fetch_page_html(client, page_id):
+    """
+    Fetch a page's storage-format body.
+    Returns: (html, version number)
+    """
+    response = await client.get(
+        f"{CONFLUENCE_URL}/wiki/rest/api/content/{page_id}",
+        params={'expand': 'body.storage,version'}
+    )
+    response.raise_for_status()
+    page = response.json()
+    return page.get('body', {}).get('storage', {}).get('value', ''), page.get('version', {}).get('number')
+
+async def get_users_bulk_async(client, account_ids):
+    """
+    Async counterpart of main.get_users_bulk; chunks are requested concurrently.
+    Returns: dict mapping account ID to user details
+    """
+    users = {}
+    missing = []
+    for account_id in dict.fromkeys(account_ids):
+        cached = get_cached_user(account_id)
+        if cached:
+            users[account_id] = cached
+        else:
+            missing.append(account_id)
+
+    async def fetch_chunk(chunk):
+        response = await client.get(
+            f"{CONFLUENCE_URL}/wiki/rest/api/user/bulk",
+            params={'accountId': chunk, 'limit': len(chunk)}
+        )
+        if response.status_code != 200:
+            print(f"{Fore.RED}Bulk user request failed with status {response.status_code}: {response.text}{Style.RESET_ALL}")
+            return []
+        return response.json().get('results', [])
+
+    chunks = [missing[start:start + USER_BULK_CHUNK_SIZE] for start in range(0, len(missing), USER_BULK_CHUNK_SIZE)]
+    for results in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+        for user_details in results:
+            account_id = user_details.get('accountId')
+            if account_id:
+                users[account_id] = user_details
+                cache_user(account_id, user_details)
+    return users
+
+async def submit_bulk_chunk_async(client, chunk):
+    """
+    Async counterpart of main.submit_bulk_chunk.
+    Returns: list of (ticket, error) tuples, one per submitted issue
+    Raises: httpx.HTTPStatusError on a 5xx/429 response, or on an error response without per-issue errors
+    """
+    response = await client.post(f"{JIRA_URL}/rest/api/2/issue/bulk", json={"issueUpdates": chunk})
+    if response.status_code >= 500 or response.status_code == 429:
+        response.raise_for_status()
+    body = response.json() if response.content else {}
+    if response.is_error and not body.get('errors'):  # Per-issue failures come back as a 400 listing them
+        response.raise_for_status()
+    return map_bulk_create_results(body, len(chunk), response.status_code)
+
+async def create_bulk_chunk_async(client, chunk):
+    """
+    Async counterpart of main.create_bulk_chunk: transient failures are retried through the
+    jira.issue_bulk circuit breaker, and issues a failed attempt already created are found by
+    their idempotency label instead of being resubmitted.
+    Returns: list of (ticket, error) tuples, one per issue in chunk
+    """
+    results = [(None, None)] * len(chunk)
+    remaining = list(range(len(chunk)))
+    with stage('jira.bulk_create'):
+        try:
+            chunk_results = await call_with_retry_async(
+                'jira.issue_bulk',
+                lambda: submit_bulk_chunk_async(client, [chunk[i] for i in remaining]),
+                before_retry=lambda: asyncio.to_thread(recover_created_issues, chunk, remaining, results)
+            )
+        except Exception as e:
+            for i in remaining:
+                results[i] = (None, f"bulk request failed: {str(e)}")
+        else:
+            for i, result in zip(remaining, chunk_results):
+                results[i] = result
+    return results
+
+async def create_issues_bulk_async(client, issue_data_list, on_chunk_created=None):
+    """
+    Async counterpart of main.create_jira_tickets_bulk; chunks are submitted concurrently.
+    Args:
+        on_chunk_created: optional callback(start, chunk_results), run in a thread as each chunk completes
+    Returns: list of (ticket, error) tuples in the same order as issue_data_list
+    """
+    async def create_chunk(start):
+        chunk_results = await create_bulk_chunk_async(client, issue_data_list[start:start + JIRA_BULK_CREATE_SIZE])
+        if on_chunk_created:
+            await asyncio.to_thread(on_chunk_created, start, chunk_results)
+        return chunk_results
+
+    starts = range(0, len(issue_data_list), JIRA_BULK_CREATE_SIZE)
+    results = []
+    for chunk_results in await asyncio.gather(*(create_chunk(start) for start in starts)):
+        results.extend(chunk_results)
+    return results
+
+async def run_pipeline(jobs, client, create_handler):
+    """
+    Push jobs (dicts with at least 'page_id') through fetch -> parse -> resolve -> create.
+    create_handler(job) receives the job with either 'cached' (the page cache's scope parse,
+    when the page is unchanged) or 'index' (a PageIndex), 'user_map' and 'version' filled in.
+    """
+    fetch_queue, parse_queue, resolve_queue, create_queue = (
+        asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE) for _ in range(4)
+    )
+
+    async def fetch(job):
+        if page_cache_enabled():
+            cached = load_cached_page(job['page_id'], 'scope', await fetch_page_version(client, job['page_id']))
+            if cached:
+                job['cached'] = cached
+                return job
+        job['html'], job['version'] = await fetch_page_html(client, job['page_id'])
+        return job
+
+    async def parse(job):
+        if 'html' in job:
+            job['index'] = await asyncio.to_thread(index_page_html, job.pop('html'))
+        return job
+
+    async def resolve(job):
+        if 'index' in job:
+            job['user_map'] = await get_users_bulk_async(client, job['index'].account_ids)
+        return job
+
+    async def feed():
+        for job in jobs:
+            await fetch_queue.put(job)
+        await fetch_queue.put(_STOP)
+
+    await asyncio.gather(
+        feed(),
+        run_stage('fetch', fetch, fetch_queue, parse_queue, PIPELINE_FETCH_CONCURRENCY),
+        run_stage('parse', parse, parse_queue, resolve_queue, PIPELINE_PARSE_CONCURRENCY),
+        run_stage('resolve', resolve, resolve_queue, create_queue, PIPELINE_RESOLVE_CONCURRENCY),
+        run_stage('create', create_handler, create_queue, None, PIPELINE_CREATE_CONCURRENCY)
+    )
+
+async def run_ticket_pipeline(pages):
+    """
+    Create tickets for every page, like `create_ticket.py all` without the per-page prompt.
+    Pages completed earlier in a resumed run are skipped, and each page's output is
+    printed in one piece once the page is done.
+    Returns: (pages_processed, total_successful, total_attempted, total_skipped, failed_pages)
+    """
+    summary = {'pages_processed': 0, 'successful': 0, 'attempted': 0, 'skipped': [], 'completed': set()}
+
+    pending_pages = []
+    for page in pages:
+        if get_done('page', page['page_id']):
+            print(f"{Fore.GREEN}Page already completed in this run, skipping: {page['project_name']}{Style.RESET_ALL}")
+            summary['pages_processed'] += 1
+        else:
+            pending_pages.append(page)
+
+    def page_done(job, successful, attempted):
+        summary['pages_processed'] += 1
+        summary['completed'].add(job['page_id'])
+        if successful == attempted:  # Otherwise --resume has to revisit the page for its failed tickets
+            record_done('page', job['page_id'], successful=successful, attempted=attempted)
+
+    async with make_async_client() as client:
+        async def create_page(job):
+            if 'cached' in job:
+                cached = job.pop('cached')
+                result = cached['headers'], cached['rows'], cached['dri_account_id']
+            else:
+                result = await asyncio.to_thread(parse_scope_table, job.pop('index'), job.pop('user_map'), False)
+                if result:
+                    headers, rows, dri_account_id = result
+                    store_cached_page(job['page_id'], 'scope', job['version'], {
+                        'headers': headers,
+                        'rows': rows,
+                        'dri_account_id': dri_account_id
+                    })
+            if not result:
+                print(f"{Fore.RED}Failed to extract table data from page {job['page_id']}{Style.RESET_ALL}")
+                return
+            _, rows, dri_account_id = result
+            if not rows:
+                print(f"{Fore.YELLOW}No tasks found on page {job['page_id']}{Style.RESET_ALL}")
+                page_done(job, 0, 0)
+                return
+
+            print(f"\n{Fore.CYAN}Found {len(rows)} tasks on {job['project_name']}{Style.RESET_ALL}")
+            rows, flagged = filter_synced_rows(rows, job['page_id'])
+            summary['skipped'].extend(flagged)
+            rows, existing = await asyncio.to_thread(filter_existing_tickets, rows, job['page_id'], job['epic_key'])
+            summary['skipped'].extend(existing)
+            pending, attempted, skipped = prepare_ticket_payloads(rows, dri_account_id, job['epic_key'], job['page_id'])
+            results = await create_issues_bulk_async(
+                client, [issue_data for _, _, issue_data in pending],
+                on_chunk_created=lambda start, chunk_results: record_created_tickets(pending[start:start + len(chunk_results)], chunk_results, job['page_id'])
+            )
+            successful = report_created_tickets(pending, results, len(rows), job['page_id'])
+            summary['successful'] += successful
+            summary['attempted'] += attempted
+            summary['skipped'].extend(skipped)
+            page_done(job, successful, attempted)
+
+        async def create(job):
+            with buffered_output():
+                await create_page(job)
+            return None
+
+        jobs = [
+            {'page_id': page['page_id'], 'project_name': page['project_name'], 'epic_key': page['jira_epic'] if page['jira_epic'] != 'N/A' else None}
+            for page in pending_pages
+        ]
+        await run_pipeline(jobs, client, create)
+
+    save_sync_state()
+    # Pages that failed in any stage never completed
+    failed_pages = [page for page in pending_pages if page['page_id'] not in summary['completed']]
+    return summary['pages_processed'], summary['successful'], summary['attempted'], summary['skipped'], failed_pages
+
+def main():
+    """
+    Run the ticket workflow through the asyncio pipeline.
+    Usage:
+      python pipeline.py tickets      # Create tickets for every page in epic.json
+    """
+    usage = [
+        "python pipeline.py tickets      # Create tickets for every page in epic.json (no per-page prompt)",
+        "",
+        "Epics have a single planning page and gain nothing from the pipeline; use create_epic.py.",
+        "",
+        "Options:",
+        "  --no-user-cache        Bypass the cached Confluence user lookups",
+        "  --refresh-user-cache   Invalidate the user cache before running",
+        "  --no-page-cache        Always refetch and reparse pages",
+        "  --ignore-sync-state    Create tickets even for rows created on an earlier run",
+        "  --resume <run_id>      Resume an interrupted run, skipping pages and tickets it completed",
+        "  --quiet                Hide per-row progress; show warnings, errors and summaries",
+        "  --verbose              Print debug output (task data, issue payloads)",
+        "  --log-json <path>      Also write JSON-lines logs and events to a file",
+        "  --metrics-json <path>  Also write the run metrics (stage timings, API calls) to a file",
+        "  --trace-memory         Report peak memory (tracemalloc) with the run metrics",
+        "  --no-metrics           Do not print the run metrics table",
+        "  --trace <path>         Write a Chrome trace of every page, parse, lookup and Jira write",
+        "",
+        "Stage concurrency is set with PIPELINE_*_CONCURRENCY in your .env file."
+    ]
+    if handle_help_request(usage):
+        return
+
+    apply_logging_flags()
+    apply_metrics_flags()
+    apply_tracing_flags()
+
+    if importlib.util.find_spec('httpx') is None:  # Optional dependency, only needed by the pipeline
+        print(f"{Fore.RED}Error: the pipeline requires httpx (pip install httpx){Style.RESET_ALL}")
+        return
+
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else None
+    if command != 'tickets':
+        print(f"{Fore.RED}Error: expected 'tickets'{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}Usage: python pipeline.py tickets (use create_epic.py for epics){Style.RESET_ALL}")
+        return
+    if not handle_config_validation():
+        return
+    apply_user_cache_flags()
+    apply_page_cache_flags()
+    apply_sync_state_flags()
+    start_run('pipeline')
+
+    pages = get_available_pages()
+    if not pages:
+        print(f"{Fore.RED}No pages found to process.{Style.RESET_ALL}")
+        return
+    print(f"{Fore.MAGENTA}Processing all {len(pages)} pages through the pipeline...{Style.RESET_ALL}")
+    pages_processed, successful, attempted, skipped, failed_pages = asyncio.run(run_ticket_pipeline(pages))
+    print_overall_summary(pages_processed, len(pages), successful, attempted, skipped, failed_pages)
+
+    print(f"\n{Fore.GREEN}Done!{Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Plan/apply: compile the full change set before touching Jira.
+
+`python plan.py plan` fetches and parses the planning page and every project
+page, then writes the epics to create, the epics to update and the tickets to
+create to a JSON plan. It makes no write calls, so the plan can be reviewed
+(and kept) before anything changes. `python plan.py apply` executes a plan:
+creates go through the bulk endpoint in parallel chunks and epic updates run
+concurrently.
+"""
+import json
+import os
+import sys
+import time
+from colorama import init, Fore, Style
+from config import *
+from clients import get_jira
+from epic_registry import get_epic_registry
+from main import build_ticket_issue_data, create_bulk_chunk
+from create_epic import load_planned_rows, build_epic_details
+from create_ticket import fetch_scope_table, filter_synced_rows, filter_existing_tickets, print_overall_summary
+from update_epic import resolve_page_links, build_epic_issue_data, build_epic_fields, fetch_epic_fields, diff_epic_fields
+from resilience import call_with_retry, add_idempotency_label
+from user_cache import apply_user_cache_flags
+from page_cache import apply_page_cache_flags
+from sync_state import get_synced_row, record_synced_row, row_keys, save_sync_state, apply_sync_state_flags
+from log import get_logger, color, apply_logging_flags
+from metrics import apply_metrics_flags
+from tracing import submit_in_context, apply_tracing_flags
+
+# Initialize colorama
+init()
+
+logger = get_logger('plan')
+
+PLAN_VERSION = 1
+
+def plan_epics(rows, row_links, registry):
+    """
+    Decide what to do for each KP project in the planning table.
+    Returns: (registry_updates, epics_to_create, epics_to_update, skipped) lists
+    """
+    link_page_ids = resolve_page_links(row_links, USERNAME, API_TOKEN)
+    existing_keys = [(registry.find_by_project(row[0]) or {}).get('jira_epic_id') for row in rows if "KP" in row[0]]
+    current_epics = fetch_epic_fields(existing_keys, JIRA_URL, USERNAME, API_TOKEN)
+    registry_updates = []
+    epics_to_create = []
+    epics_to_update = []
+    skipped = []
+
+    for i, row in enumerate(rows):
+        if "KP" not in row[0]:
+            continue
+        project_page_id = link_page_ids.get(row_links[i])
+        details = build_epic_details(row)
+        existing_entry = registry.find_by_project(row[0])
+
+        if existing_entry and project_page_id and existing_entry.get('confluence_page_id') != project_page_id:
+            registry_updates.append({'project_name': row[0], 'confluence_page_id': project_page_id})
+
+        if existing_entry and existing_entry.get('jira_epic_id'):
+            # Only epics whose fields differ from the table are updated, and only in those fields
+            changes = diff_epic_fields(current_epics.get(existing_entry['jira_epic_id']), build_epic_fields(details))
+            if changes:
+                epics_to_update.append({
+                    'project_name': row[0],
+                    'jira_key': existing_entry['jira_epic_id'],
+                    'fields': changes
+                })
+        elif not details['Owner Account ID']:
+            skipped.append({'title': row[0], 'reason': "no owner account ID to use as epic reporter"})
+        else:
+            epics_to_create.append({
+                'project_name': row[0],
+                'confluence_page_id': project_page_id or (existing_entry or {}).get('confluence_page_id'),
+                'issue_data': build_epic_issue_data(details, details['Owner Account ID'], JIRA_PROJECT)
+            })
+
+    return registry_updates, epics_to_create, epics_to_update, skipped
+
+def plan_tickets(pages):
+    """
+    Fetch every project page in parallel and build the tickets its new rows need.
+    Args:
+        pages: list of {'page_id', 'epic_key', 'epic_project'} dicts; epic_project names an
+            epic that only exists in the plan, whose key is filled in by apply
+    Returns: (tickets_to_create, skipped) lists
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        futures = [submit_in_context(executor, fetch_scope_table, page['page_id'], page['epic_key']) for page in pages]
+        results = []
+        for page, future in zip(pages, futures):
+            try:
+                results.append((page, future.result()))
+            except Exception as e:
+                print(f"{Fore.RED}Error fetching page {page['page_id']}: {str(e)}{Style.RESET_ALL}")
+                results.append((page, None))
+
+    tickets_to_create = []
+    skipped = []
+    for page, result in results:
+        if not result:
+            skipped.append({'title': f"page {page['page_id']}", 'reason': "failed to extract table data"})
+            continue
+        rows, dri_account_id = result
+        rows, flagged = filter_synced_rows(rows or [], page['page_id'])
+        skipped.extend(flagged)
+        if page['epic_key']:
+            rows, existing = filter_existing_tickets(rows, page['page_id'], page['epic_key'])
+            skipped.extend(existing)
+        for row, row_key in zip(rows, row_keys(page['page_id'], rows)):
+            if len(row) < 6:
+                skipped.append({'title': row[0] if row else "No title", 'reason': "incomplete data (merged cell or missing columns)"})
+                continue
+            issue_data = build_ticket_issue_data(row, dri_account_id, page['epic_key'], row_key)
+            if not issue_data:
+                skipped.append({'title': row[0], 'reason': "invalid row"})
+                continue
+            tickets_to_create.append({
+                'page_id': page['page_id'],
+                'row': row,
+                'row_key': row_key,
+                'epic_key': page['epic_key'],
+                'epic_project': page['epic_project'],
+                'issue_data': issue_data
+            })
+    return tickets_to_create, skipped
+
+def build_plan():
+    """
+    Fetch and parse everything and compile the change set, without writing to Jira.
+    Returns: plan dict, or None if the planning page could not be read
+    """
+    registry = get_epic_registry()
+    result = load_planned_rows()
+    if not result:
+        return None
+    registry_updates, epics_to_create, epics_to_update, skipped = plan_epics(*result, registry)
+
+    # Ticket pages: every page already in the registry, plus pages of epics this plan creates
+    pending_epics = {epic['confluence_page_id']: epic['project_name'] for epic in epics_to_create if epic['confluence_page_id']}
+    page_ids = {update['project_name']: update['confluence_page_id'] for update in registry_updates}
+    pages = {}
+    for entry in registry.entries():
+        page_id = page_ids.get(entry['project_name'], entry.get('confluence_page_id'))
+        if page_id and page_id not in pending_epics:
+            pages[page_id] = {'page_id': page_id, 'epic_key': entry.get('jira_epic_id'), 'epic_project': None}
+    for page_id, project_name in pending_epics.items():
+        pages[page_id] = {'page_id': page_id, 'epic_key': None, 'epic_project': project_name}
+
+    print(f"{Fore.CYAN}Fetching {len(pages)} project pages...{Style.RESET_ALL}")
+    tickets_to_create, ticket_skipped = plan_tickets(list(pages.values()))
+
+    return {
+        'version': PLAN_VERSION,
+        'created_at': time.time(),
+        'planning_page_id': PAGE_ID,
+        'registry_updates': registry_updates,
+        'epics_to_create': epics_to_create,
+        'epics_to_update': epics_to_update,
+        'tickets_to_create': tickets_to_create,
+        'skipped': skipped + ticket_skipped
+    }
+
+def print_plan_summary(plan):
+    """Print a reviewable summary of a plan"""
+    table = [['create epic', epic['project_name'], epic['confluence_page_id'] or '-'] for epic in plan['epics_to_create']]
+    table += [[f"update epic ({', '.join(epic['fields'])})", epic['project_name'], epic['jira_key']] for epic in plan['epics_to_update']]
+    table += [['set page ID', update['project_name'], update['confluence_page_id']] for update in plan['registry_updates']]
+    table += [
+        ['create ticket', ticket['row'][0], ticket['epic_key'] or (f"new epic: {ticket['epic_project']}" if ticket['epic_project'] else '-')]
+        for ticket in plan['tickets_to_create']
+    ]
+    print(f"\n{Fore.CYAN}Plan:{Style.RESET_ALL}")
+    from tabulate import tabulate
+    print(tabulate(table, headers=['Action', 'Title', 'Epic / Page'], tablefmt="grid") if table else "No changes")
+    print(f"{Fore.CYAN}{len(plan['epics_to_create'])} epics to create, {len(plan['epics_to_update'])} epics to update, "
+          f"{len(plan['tickets_to_create'])} tickets to create, {len(plan['skipped'])} skipped{Style.RESET_ALL}")
+    for skip_info in plan['skipped']:
+        print(f"{Fore.YELLOW}  ✗ {skip_info['title']} - {skip_info['reason']}{Style.RESET_ALL}")
+
+def save_plan(plan, path):
+    """Write a plan to disk"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_path, path)
+    print(f"{Fore.GREEN}Plan written to {path}{Style.RESET_ALL}")
+
+def load_plan(path):
+    """Read a plan from disk, or return None if it is missing or from another version"""
+    try:
+        with open(path, 'r') as f:
+            plan = json.load(f)
+    except FileNotFoundError:
+        print(f"{Fore.RED}No plan found at {path}. Run 'python plan.py plan' first.{Style.RESET_ALL}")
+        return None
+    except json.JSONDecodeError:
+        print(f"{Fore.RED}Plan at {path} is not valid JSON{Style.RESET_ALL}")
+        return None
+    if plan.get('version') != PLAN_VERSION:
+        print(f"{Fore.RED}Plan at {path} was written by a different version, please re-plan{Style.RESET_ALL}")
+        return None
+    return plan
+
+def create_issues_parallel(issue_data_list, on_chunk_created=None):
+    """
+    Bulk create issues, submitting JIRA_BULK_CREATE_SIZE-issue chunks on APPLY_WORKERS threads.
+    Args:
+        on_chunk_created: optional callback(start, chunk_results), called as each chunk completes
+    Returns: list of (ticket, error) tuples in the same order as issue_data_list
+    """
+    starts = range(0, len(issue_data_list), JIRA_BULK_CREATE_SIZE)
+
+    def create_chunk(start):
+        on_created = (lambda chunk_results: on_chunk_created(start, chunk_results)) if on_chunk_created else None
+        return create_bulk_chunk(issue_data_list[start:start + JIRA_BULK_CREATE_SIZE], on_created)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=APPLY_WORKERS) as executor:
+        futures = [submit_in_context(executor, create_chunk, start) for start in starts]
+        return [result for future in futures for result in future.result()]
+
+def apply_epics(plan, registry):
+    """
+    Apply the registry updates, epic creates and epic updates of a plan.
+    Returns: dict mapping project name -> key of each epic created
+    """
+    for update in plan['registry_updates']:
+        entry = registry.find_by_project(update['project_name'])
+        if entry:
+            registry.update_entry(entry, confluence_page_id=update['confluence_page_id'])
+
+    # Skip epics created since the plan was made (e.g. a plan applied twice)
+    to_create = []
+    for epic in plan['epics_to_create']:
+        entry = registry.find_by_project(epic['project_name'])
+        if entry and entry.get('jira_epic_id'):
+            logger.info("Epic for %s already exists (%s), skipping", epic['project_name'], entry['jira_epic_id'], extra=color(Fore.YELLOW))
+        else:
+            to_create.append(epic)
+
+    epic_keys = {}
+    if to_create:
+        print(f"\n{Fore.GREEN}Creating {len(to_create)} epics...{Style.RESET_ALL}")
+        for epic, (ticket, error) in zip(to_create, create_issues_parallel([epic['issue_data'] for epic in to_create])):
+            entry = registry.find_by_project(epic['project_name'])
+            if ticket:
+                epic_keys[epic['project_name']] = ticket['key']
+                logger.info("✓ Created epic %s for %s", ticket['key'], epic['project_name'], extra=color(Fore.GREEN))
+            else:
+                logger.error("✗ Failed to create epic for %s (%s)", epic['project_name'], error)
+            if entry:
+                registry.update_entry(entry, confluence_page_id=epic['confluence_page_id'], jira_epic_id=ticket and ticket['key'])
+            else:
+                # Added even when creation failed, like create_epic.py does
+                registry.add_entry(epic['project_name'], epic['confluence_page_id'], ticket and ticket['key'])
+
+    if plan['epics_to_update']:
+        print(f"\n{Fore.GREEN}Updating {len(plan['epics_to_update'])} epics...{Style.RESET_ALL}")
+        jira = get_jira(JIRA_URL, USERNAME, API_TOKEN)
+
+        def update(epic):
+            try:
+                call_with_retry('jira.issue_update', lambda: jira.issue_update(issue_key=epic['jira_key'], fields=epic['fields']))
+                return None
+            except Exception as e:
+                return str(e)
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=APPLY_WORKERS) as executor:
+            futures = [submit_in_context(executor, update, epic) for epic in plan['epics_to_update']]
+            for epic, error in zip(plan['epics_to_update'], (future.result() for future in futures)):
+                if error:
+                    logger.error("✗ Failed to update epic %s for %s: %s", epic['jira_key'], epic['project_name'], error)
+                else:
+                    logger.info("✓ Updated epic %s for %s", epic['jira_key'], epic['project_name'], extra=color(Fore.GREEN))
+
+    registry.save()
+    return epic_keys
+
+def apply_tickets(plan, epic_keys):
+    """
+    Create the planned tickets, linking those waiting on a new epic to its key.
+    Returns: (successful_count, attempted_count, skipped_list)
+    """
+    pending = []
+    skipped = []
+    for ticket in plan['tickets_to_create']:
+        synced = get_synced_row(ticket['page_id'], ticket['row'][0])
+        if synced:
+            skipped.append({'title': ticket['row'][0], 'reason': f"already created as {synced['jira_key']}"})
+            continue
+        fields = ticket['issue_data']['fields']
+        if ticket['epic_project']:
+            epic_key = epic_keys.get(ticket['epic_project']) or (get_epic_registry().find_by_project(ticket['epic_project']) or {}).get('jira_epic_id')
+            if epic_key:
+                fields['parent'] = {'key': epic_key}
+                add_idempotency_label(fields, ticket.get('row_key'))  # The parent is part of the label
+        pending.append(ticket)
+
+    if not pending:
+        return 0, 0, skipped
+
+    print(f"\n{Fore.GREEN}Creating {len(pending)} tickets...{Style.RESET_ALL}")
+    def record_chunk(start, chunk_results):
+        # Persisted per chunk, so tickets created before a crash are not planned again
+        for ticket, (created, _) in zip(pending[start:start + len(chunk_results)], chunk_results):
+            if created:
+                record_synced_row(ticket['page_id'], ticket['row'], created['key'])
+        save_sync_state()
+
+    successful = 0
+    results = create_issues_parallel([ticket['issue_data'] for ticket in pending], on_chunk_created=record_chunk)
+    for ticket, (created, error) in zip(pending, results):
+        if created:
+            logger.info("✓ %s: %s", created['key'], ticket['row'][0], extra=color(Fore.GREEN))
+            successful += 1
+        else:
+            logger.error("✗ Failed to create ticket: %s (%s)", ticket['row'][0], error)
+    return successful, len(pending), skipped
+
+def apply_plan(plan):
+    """Execute a plan: epics first (so new tickets can link to them), then tickets"""
+    epic_keys = apply_epics(plan, get_epic_registry())
+    successful, attempted, skipped = apply_tickets(plan, epic_keys)
+    page_count = len({ticket['page_id'] for ticket in plan['tickets_to_create']})
+    print_overall_summary(page_count, page_count, successful, attempted, plan['skipped'] + skipped)
+
+def main():
+    """
+    Plan or apply the full change set.
+    Usage:
+      python plan.py plan [file]     # Fetch and parse everything, write the change set (no Jira writes)
+      python plan.py apply [file]    # Execute a reviewed change set
+    """
+    usage = [
+        "python plan.py plan [file]     # Fetch and parse everything, write the change set (no Jira writes)",
+        "python plan.py apply [file]    # Execute a reviewed change set",
+        "",
+        f"The plan file defaults to PLAN_FILE ({PLAN_FILE}).",
+        "Options:",
+        "  --no-user-cache        Bypass the cached Confluence user lookups",
+        "  --refresh-user-cache   Invalidate the user cache before running",
+        "  --no-page-cache        Always refetch and reparse pages",
+        "  --ignore-sync-state    Plan tickets even for rows created on an earlier run",
+        "  --quiet                Hide per-row progress; show warnings, errors and summaries",
+        "  --verbose              Print debug output (task data, issue payloads)",
+        "  --log-json <path>      Also write JSON-lines logs and events to a file",
+        "  --metrics-json <path>  Also write the run metrics (stage timings, API calls) to a file",
+        "  --trace-memory         Report peak memory (tracemalloc) with the run metrics",
+        "  --no-metrics           Do not print the run metrics table",
+        "  --trace <path>         Write a Chrome trace of every page, parse, lookup and Jira write"
+    ]
+    if handle_help_request(usage):
+        return
+
+    is_valid, missing_vars = validate_epic_config()
+    if not is_valid:
+        print(f"{Fore.RED}Error: Missing required environment variables:{Style.RESET_ALL}")
+        for var in missing_vars:
+            print(f"{Fore.YELLOW}- {var}{Style.RESET_ALL}")
+        return
+
+    apply_logging_flags()
+    apply_metrics_flags()
+    apply_tracing_flags()
+    apply_user_cache_flags()
+    apply_page_cache_flags()
+    apply_sync_state_flags()
+
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else None
+    path = sys.argv[2] if len(sys.argv) > 2 else PLAN_FILE
+    if command == 'plan':
+        plan = build_plan()
+        if not plan:
+            return
+        print_plan_summary(plan)
+        save_plan(plan, path)
+    elif command == 'apply':
+        plan = load_plan(path)
+        if not plan:
+            return
+        print_plan_summary(plan)
+        apply_plan(plan)
+    else:
+        print(f"{Fore.RED}Error: expected 'plan' or 'apply'{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}Usage: python plan.py plan|apply [file]{Style.RESET_ALL}")
+        return
+
+    print(f"\n{Fore.GREEN}Done!{Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Rate-limit-aware scheduling for every outgoing Jira/Confluence request.
+
+Each host gets a HostLimiter combining a token bucket (steady request rate
+with a burst allowance) and an AIMD concurrency limit: the limit grows by one
+slot per window of fast successful responses and is halved on 429s,
+X-RateLimit-NearLimit warnings or latency well above target. Retry-After and
+X-RateLimit-Remaining/Reset pause the whole host until the tenant allows more.
+
+RateLimitedAdapter plugs this into the shared requests.Session (and so every
+Atlassian client); RateLimitedAsyncTransport does the same for pipeline.py's
+httpx client. Throttled (429) requests are retried after the advised delay.
+Every attempt is also recorded in metrics for the end-of-run report.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from colorama import Fore, Style
+from metrics import record_request
+from config import (
+    RATE_LIMIT_REQUESTS_PER_SECOND, RATE_LIMIT_BURST, RATE_LIMIT_MAX_RETRIES,
+    ADAPTIVE_CONCURRENCY_MIN, ADAPTIVE_CONCURRENCY_MAX, ADAPTIVE_LATENCY_TARGET
+)
+
+try:
+    import httpx
+except ImportError:  # Optional dependency, only needed by the pipeline
+    httpx = None
+
+# Wait used when the host is at its concurrency limit, or throttled without a usable Retry-After
+_POLL_INTERVAL = 0.05
+_DEFAULT_RETRY_AFTER = 5.0
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta seconds or HTTP date).
+    Returns: seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def parse_rate_limit_reset(value):
+    """
+    Parse X-RateLimit-Reset, which Atlassian sends as an ISO 8601 timestamp.
+    Returns: seconds until the reset, or None
+    """
+    if not value:
+        return None
+    try:
+        reset = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if reset.tzinfo is None:
+        reset = reset.replace(tzinfo=timezone.utc)
+    return max(0.0, reset.timestamp() - time.time())
+
+class HostLimiter:
+    """Token bucket plus AIMD concurrency limit for one host"""
+
+    def __init__(self, host, rate=RATE_LIMIT_REQUESTS_PER_SECOND, burst=RATE_LIMIT_BURST,
+                 min_limit=ADAPTIVE_CONCURRENCY_MIN, max_limit=ADAPTIVE_CONCURRENCY_MAX,
+                 latency_target=ADAPTIVE_LATENCY_TARGET):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Take a token and a concurrency slot if both are available.
+        Returns: 0 if acquired, otherwise the number of seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= int(self.limit):
+                return _POLL_INTERVAL
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            self.in_flight += 1
+            return 0
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every request to this host for the given number of seconds"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def release(self, status_code, latency, headers):
+        """
+        Give the slot back and adapt to the response.
+        Returns: seconds to wait before retrying if the request was throttled, else None
+        """
+        retry_after = None
+        with self._lock:
+            self.in_flight -= 1
+            throttled = status_code == 429
+            near_limit = str(headers.get('X-RateLimit-NearLimit', '')).lower() == 'true'
+            if throttled or near_limit or latency > 2 * self.latency_target:
+                # Multiplicative decrease
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif latency <= self.latency_target:
+                # Additive increase: about one slot per limit's worth of fast responses
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            if throttled:
+                retry_after = parse_retry_after(headers.get('Retry-After'))
+                if retry_after is None:
+                    retry_after = parse_rate_limit_reset(headers.get('X-RateLimit-Reset')) or _DEFAULT_RETRY_AFTER
+            elif headers.get('X-RateLimit-Remaining') == '0':
+                reset = parse_rate_limit_reset(headers.get('X-RateLimit-Reset'))
+                if reset:
+                    self._paused_until = max(self._paused_until, time.monotonic() + reset)
+
+        if retry_after is not None:
+            self.pause(retry_after)
+        return retry_after
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_host_limiter(url):
+    """Get the shared limiter for a URL's host"""
+    host = urlsplit(str(url)).netloc
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(host)
+        return limiter
+
+def _report_throttle(limiter, status_code, retry_after, attempt):
+    print(f"{Fore.YELLOW}Rate limited by {limiter.host} (HTTP {status_code}), retrying in {retry_after:.1f}s "
+          f"(attempt {attempt}/{RATE_LIMIT_MAX_RETRIES}, concurrency limit {int(limiter.limit)}){Style.RESET_ALL}")
+
+def _body_size(body):
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    return len(body) if isinstance(body, bytes) else 0
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that schedules every request through its host's limiter and retries 429s"""
+
+    def send(self, request, **kwargs):
+        limiter = get_host_limiter(request.url)
+        attempt = 0
+        while True:
+            limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+                if not kwargs.get('stream'):
+                    response.content  # Read the body here (Session would next) so latency and size include it
+            except Exception:
+                latency = time.monotonic() - started
+                limiter.release(0, latency, {})
+                record_request(request.method, request.url, 0, latency, _body_size(request.body))
+                raise
+            latency = time.monotonic() - started
+            record_request(request.method, request.url, response.status_code, latency,
+                           _body_size(request.body), len(response._content or b'') if not kwargs.get('stream') else 0)
+            retry_after = limiter.release(response.status_code, latency, response.headers)
+            if retry_after is None or attempt >= RATE_LIMIT_MAX_RETRIES:
+                return response
+            attempt += 1
+            _report_throttle(limiter, response.status_code, retry_after, attempt)
+            response.close()
+
+if httpx is not None:
+    class RateLimitedAsyncTransport(httpx.AsyncHTTPTransport):
+        """httpx transport with the same scheduling as RateLimitedAdapter"""
+
+        async def handle_async_request(self, request):
+            limiter = get_host_limiter(request.url)
+            attempt = 0
+            while True:
+                await limiter.acquire_async()
+                started = time.monotonic()
+                bytes_sent = int(request.headers.get('content-length') or 0)
+                try:
+                    response = await super().handle_async_request(request)
+                    await response.aread()  # The pipeline reads every body anyway; time and size it here
+                except Exception:
+                    latency = time.monotonic() - started
+                    limiter.release(0, latency, {})
+                    record_request(request.method, request.url, 0, latency, bytes_sent)
+                    raise
+                latency = time.monotonic() - started
+                record_request(request.method, request.url, response.status_code, latency, bytes_sent, len(response.content))
+                retry_after = limiter.release(response.status_code, latency, response.headers)
+                if retry_after is None or attempt >= RATE_LIMIT_MAX_RETRIES:
+                    return response
+                attempt += 1
+                _report_throttle(limiter, response.status_code, retry_after, attempt)
+                await response.aclose()
@@ -0,0 +1,228 @@
+"""
+Retries, circuit breakers and idempotent issue creation for Jira writes.
+
+Transient failures (timeouts, connection errors, 5xx and exhausted 429s) are
+retried with full-jitter exponential backoff. Each endpoint has a circuit
+breaker that stops calling it for a while after repeated failures.
+
+Created issues carry an idempotency label derived from their project, type,
+parent and summary. Before a create is retried, Jira is searched for that
+label so a request that actually succeeded is not submitted twice.
+"""
+import hashlib
+import random
+import sys
+import threading
+import time
+from colorama import Fore, Style
+from config import (
+    RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+    CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_RESET
+)
+
+IDEMPOTENCY_LABEL_PREFIX = 'ids-fp-'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """Opens after CIRCUIT_BREAKER_THRESHOLD consecutive failures, lets one trial call through after CIRCUIT_BREAKER_RESET seconds"""
+
+    def __init__(self, name, threshold=CIRCUIT_BREAKER_THRESHOLD, reset_after=CIRCUIT_BREAKER_RESET):
+        self.name = name
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_after:
+                raise CircuitOpenError(f"circuit open for {self.name} after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()  # Half-open: allow this call, hold the rest until it reports back
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    print(f"{Fore.RED}Circuit breaker opened for {self.name} ({self.failures} consecutive failures){Style.RESET_ALL}")
+                self.opened_at = time.monotonic()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(endpoint):
+    """Get the shared circuit breaker for an endpoint name"""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+def is_transient(error):
+    """Whether an exception is worth retrying"""
+    import requests
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    httpx = sys.modules.get('httpx')  # Only loaded by the async pipeline
+    if httpx and isinstance(error, httpx.TransportError):
+        return True
+    response = getattr(error, 'response', None)
+    status_code = getattr(response, 'status_code', None)
+    return status_code is not None and (status_code >= 500 or status_code == 429)
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (1-based)"""
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+
+def _attempt_failed(endpoint, breaker, error, attempt):
+    """
+    Shared failure handling of call_with_retry and call_with_retry_async.
+    Args:
+        attempt: Number of attempts made so far, including the failed one
+    Returns: seconds to wait before the next attempt, or None once attempts have run out
+    Raises: error itself if it is not transient
+    """
+    if not is_transient(error):
+        breaker.record_success()  # The endpoint answered; the request itself was bad
+        raise error
+    breaker.record_failure()
+    if attempt >= RETRY_MAX_ATTEMPTS:
+        return None
+    delay = backoff_delay(attempt)
+    print(f"{Fore.YELLOW}{endpoint} failed ({str(error)[:200]}), retrying in {delay:.1f}s (attempt {attempt + 1}/{RETRY_MAX_ATTEMPTS}){Style.RESET_ALL}")
+    return delay
+
+def call_with_retry(endpoint, func, before_retry=None):
+    """
+    Call func, retrying transient failures through the endpoint's circuit breaker.
+    Args:
+        endpoint: Name of the endpoint, one circuit breaker per name
+        func: Callable making the request
+        before_retry: Optional callable run before each retry and once more before
+            giving up; if it returns anything other than None, that is returned instead
+    Returns: func's result
+    Raises: the last error once attempts run out, or CircuitOpenError
+    """
+    breaker = get_breaker(endpoint)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            attempt += 1
+            delay = _attempt_failed(endpoint, breaker, e, attempt)
+            if delay is not None:
+                time.sleep(delay)
+            # Before retrying, and before giving up: the failed attempt may still have gone through
+            recovered = before_retry() if before_retry else None
+            if recovered is not None:
+                return recovered
+            if delay is None:
+                raise
+            continue
+        breaker.record_success()
+        return result
+
+async def call_with_retry_async(endpoint, func, before_retry=None):
+    """
+    Async counterpart of call_with_retry, sharing its circuit breakers and retry policy.
+    Args:
+        func: Callable returning an awaitable that makes the request
+        before_retry: Optional callable returning an awaitable, run before each retry and once
+            more before giving up; if it resolves to anything other than None, that is returned instead
+    Returns: func's result
+    Raises: the last error once attempts run out, or CircuitOpenError
+    """
+    import asyncio
+    breaker = get_breaker(endpoint)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = await func()
+        except Exception as e:
+            attempt += 1
+            delay = _attempt_failed(endpoint, breaker, e, attempt)
+            if delay is not None:
+                await asyncio.sleep(delay)
+            recovered = await before_retry() if before_retry else None
+            if recovered is not None:
+                return recovered
+            if delay is None:
+                raise
+            continue
+        breaker.record_success()
+        return result
+
+def idempotency_label(fields, row_key=None):
+    """
+    Label identifying an issue by project, type, parent and summary.
+    Args:
+        row_key: identity of the source row (sync_state.row_keys), so rows sharing a title get distinct labels
+    """
+    key = '|'.join([
+        fields.get('project', {}).get('key') or '',
+        fields.get('issuetype', {}).get('name') or '',
+        fields.get('parent', {}).get('key') or '',
+        ' '.join((fields.get('summary') or '').lower().split()),
+        row_key or ''
+    ])
+    return IDEMPOTENCY_LABEL_PREFIX + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def add_idempotency_label(fields, row_key=None):
+    """Add the idempotency label to an issue's fields (in place)"""
+    fields['labels'] = [label for label in fields.get('labels', []) if not label.startswith(IDEMPOTENCY_LABEL_PREFIX)]
+    fields['labels'].append(idempotency_label(fields, row_key))
+    return fields
+
+def get_idempotency_label(fields):
+    """Return the idempotency label on an issue's fields, or None"""
+    return next((label for label in fields.get('labels', []) if label.startswith(IDEMPOTENCY_LABEL_PREFIX)), None)
+
+def find_issues_by_labels(jira, labels):
+    """
+    Look up issues already carrying any of the given idempotency labels.
+    Returns: dict mapping label -> issue ({'id', 'key', 'self'})
+    """
+    from ticket_index import search_all  # ticket_index imports this module
+    if not labels:
+        return {}
+    quoted = ', '.join(f'"{label}"' for label in labels)
+    found = {}
+    try:
+        issues = search_all(jira, f"labels in ({quoted})", ['labels'])
+    except Exception as e:
+        print(f"{Fore.YELLOW}Warning: could not check for already-created issues: {str(e)}{Style.RESET_ALL}")
+        return found
+    wanted = set(labels)
+    for issue in issues:
+        for label in issue.get('fields', {}).get('labels', []):
+            if label in wanted:
+                found[label] = {'id': issue.get('id'), 'key': issue.get('key'), 'self': issue.get('self')}
+    return found
+
+def create_issue_idempotent(jira, fields):
+    """
+    Create an issue, retrying transient failures without creating duplicates.
+    Returns: the created issue ({'id', 'key', 'self'})
+    """
+    label = get_idempotency_label(fields) or get_idempotency_label(add_idempotency_label(fields))
+
+    def already_created():
+        issue = find_issues_by_labels(jira, [label]).get(label)
+        if issue:
+            print(f"{Fore.GREEN}Earlier attempt already created {issue['key']}, not retrying{Style.RESET_ALL}")
+        return issue
+
+    return call_with_retry('jira.issue_create', lambda: jira.issue_create(fields=fields), before_retry=already_created)
@@ -0,0 +1,111 @@
+"""
+Append-only journal of completed work, so interrupted runs can be resumed.
+
+Every run writes one JSON line per completed page, epic or ticket to
+CACHE_DIR/runs/<run_id>.jsonl as it happens. Lines are flushed immediately
+and fsynced in batches (RUN_JOURNAL_FSYNC_BATCH records or
+RUN_JOURNAL_FSYNC_INTERVAL seconds). `--resume <run_id>` replays the journal
+and appends to it, letting callers skip everything already recorded.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from colorama import Fore, Style
+from config import CACHE_DIR, RUN_JOURNAL_FSYNC_BATCH, RUN_JOURNAL_FSYNC_INTERVAL, pop_option
+
+RUNS_DIR = os.path.join(CACHE_DIR, 'runs')
+
+_lock = threading.Lock()
+_file = None
+_run_id = None
+_completed = {}  # (kind, key) -> record
+_unsynced = 0
+_last_sync = 0.0
+
+def _journal_path(run_id):
+    return os.path.join(RUNS_DIR, f"{run_id}.jsonl")
+
+def _replay(path):
+    """Load completed records from an existing journal, ignoring a torn last line"""
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('kind') and record.get('key'):
+                _completed[(record['kind'], record['key'])] = record
+
+def start_run(command):
+    """
+    Open the journal for this run, resuming it if --resume <run_id> was given.
+    Args:
+        command: Name of the command being run, stored in the journal header
+    Returns: the run ID
+    """
+    global _file, _run_id, _last_sync
+    resume_id = pop_option('--resume')
+    os.makedirs(RUNS_DIR, exist_ok=True)
+
+    if resume_id:
+        path = _journal_path(resume_id)
+        if not os.path.exists(path):
+            print(f"{Fore.RED}No run journal found for {resume_id}, starting a new run{Style.RESET_ALL}")
+            resume_id = None
+        else:
+            _replay(path)
+            _run_id = resume_id
+            print(f"{Fore.CYAN}Resuming run {_run_id}: {len(_completed)} completed items will be skipped{Style.RESET_ALL}")
+
+    if not resume_id:
+        _run_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        print(f"{Fore.CYAN}Run journal: {_run_id} (resume with --resume {_run_id}){Style.RESET_ALL}")
+
+    _file = open(_journal_path(_run_id), 'a')
+    _last_sync = time.monotonic()
+    _write({'kind': 'run', 'command': command, 'resumed': bool(resume_id), 'at': time.time()})
+    return _run_id
+
+def _write(record):
+    global _unsynced, _last_sync
+    _file.write(json.dumps(record) + '\n')
+    _file.flush()
+    _unsynced += 1
+    if _unsynced >= RUN_JOURNAL_FSYNC_BATCH or time.monotonic() - _last_sync >= RUN_JOURNAL_FSYNC_INTERVAL:
+        os.fsync(_file.fileno())
+        _unsynced = 0
+        _last_sync = time.monotonic()
+
+def record_done(kind, key, **details):
+    """
+    Record that a unit of work finished. Does nothing when no run was started.
+    Args:
+        kind: 'page', 'epic' or 'ticket'
+        key: Identifier of the unit within its kind (page ID, project name, page ID + row title)
+    """
+    if _file is None:
+        return
+    record = {'kind': kind, 'key': str(key), 'at': time.time(), **details}
+    with _lock:
+        _completed[(kind, str(key))] = record
+        _write(record)
+
+def get_done(kind, key):
+    """Return the journal record for a completed unit of work, or None"""
+    return _completed.get((kind, str(key)))
+
+def close_run():
+    """Fsync and close the journal"""
+    global _file, _unsynced
+    with _lock:
+        if _file is None:
+            return
+        os.fsync(_file.fileno())
+        _file.close()
+        _file = None
+        _unsynced = 0
+
+atexit.register(close_run)
@@ -0,0 +1,124 @@
+"""
+Row-level sync state so reruns only create tickets for new scope-table rows.
+
+Each created ticket is recorded under a stable fingerprint of its row
+(page ID plus normalized title) together with a hash of the row's contents,
+so later runs can skip rows that already exist and flag rows that changed.
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from colorama import Fore, Style
+from config import CACHE_DIR, pop_flag
+
+SYNC_STATE_FILE = os.path.join(CACHE_DIR, 'sync_state.json')
+
+# Scope table owner column: display names resolved through the user lookup.
+# The owner's account ID is appended as the row's last element.
+OWNER_COLUMN = 3
+
+# Bumped when row_content_hash changes, so older records are compared the old way
+CONTENT_HASH_VERSION = 2
+
+_lock = threading.Lock()
+_state = None
+_dirty = False
+_enabled = True
+
+def apply_sync_state_flags():
+    """Handle the --ignore-sync-state command line flag"""
+    global _enabled
+    if pop_flag('--ignore-sync-state'):
+        _enabled = False
+
+def normalize_title(title):
+    """Normalize a row title so cosmetic edits do not change its fingerprint"""
+    return re.sub(r'\s+', ' ', (title or '').strip().lower())
+
+def row_fingerprint(page_id, title):
+    """Stable identifier for a scope-table row"""
+    key = f"{page_id}:{normalize_title(title)}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def row_keys(page_id, rows):
+    """
+    Identity of each row for idempotency labels: its fingerprint plus its occurrence among
+    the rows sharing that title, so repeated titles on a page still get distinct labels.
+    Returns: list of keys, one per row
+    """
+    seen = {}
+    keys = []
+    for row in rows:
+        fingerprint = row_fingerprint(page_id, row[0] if row else '')
+        seen[fingerprint] = seen.get(fingerprint, 0) + 1
+        keys.append(f"{fingerprint}:{seen[fingerprint]}")
+    return keys
+
+def row_content_hash(row):
+    """
+    Hash of a row's non-title fields, used to detect edits since the ticket was created.
+    Only the raw cell text and the owner's account ID are hashed; the owner's display
+    names change with a rename or a failed user lookup while the row itself does not.
+    """
+    content = [cell for i, cell in enumerate(row) if i and i != OWNER_COLUMN]
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def row_changed(synced, row):
+    """Whether a row was edited since its sync record was written"""
+    if synced.get('content_hash_version') != CONTENT_HASH_VERSION:
+        # Written before display names were left out of the hash
+        return synced['content_hash'] != hashlib.sha1(json.dumps(row[1:], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return synced['content_hash'] != row_content_hash(row)
+
+def _load_state():
+    global _state
+    if _state is None:
+        try:
+            with open(SYNC_STATE_FILE, 'r') as f:
+                _state = json.load(f)
+        except FileNotFoundError:
+            _state = {}
+        except json.JSONDecodeError:
+            print(f"{Fore.YELLOW}Warning: sync state is corrupted, starting fresh{Style.RESET_ALL}")
+            _state = {}
+    return _state
+
+def get_synced_row(page_id, title):
+    """Return the sync record for a row, or None if no ticket was created for it"""
+    if not _enabled:
+        return None
+    with _lock:
+        return _load_state().get(row_fingerprint(page_id, title))
+
+def record_synced_row(page_id, row, jira_key):
+    """Remember that a ticket was created for a row"""
+    global _dirty
+    with _lock:
+        _load_state()[row_fingerprint(page_id, row[0])] = {
+            'page_id': str(page_id),
+            'title': row[0],
+            'jira_key': jira_key,
+            'content_hash': row_content_hash(row),
+            'content_hash_version': CONTENT_HASH_VERSION,
+            'synced_at': time.time()
+        }
+        _dirty = True
+
+def save_sync_state():
+    """Write the sync state back to disk if anything changed"""
+    global _dirty
+    with _lock:
+        if not _dirty:
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = SYNC_STATE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(_state, f, indent=2)
+        os.replace(tmp_path, SYNC_STATE_FILE)
+        _dirty = False
+
+atexit.register(save_sync_state)
@@ -0,0 +1,76 @@
+"""
+Index of tickets already created by the automation, read back from Jira.
+
+One paginated JQL search (`project = X AND labels = ids-automation AND
+issuetype != Epic`; epics carry the label too) is run the first time the
+index is needed, mapping (parent epic key, normalized summary) to issue key. Rows whose ticket already exists in Jira can then be
+skipped without a search per row, even when the local sync state is missing.
+"""
+import threading
+from colorama import Fore, Style
+from config import JIRA_URL, USERNAME, API_TOKEN, JIRA_PROJECT, JIRA_SEARCH_PAGE_SIZE, AUTOMATION_LABEL, EPIC_ISSUE_TYPE
+from clients import get_jira
+from resilience import call_with_retry
+from sync_state import normalize_title
+
+_lock = threading.Lock()
+_index = None
+
+def _index_key(epic_key, summary):
+    return (epic_key or '', normalize_title(summary))
+
+def search_all(jira, jql, fields):
+    """
+    Run a JQL search, following pagination to the end.
+    Returns: list of issues
+    """
+    issues = []
+    if jira.cloud:
+        next_page_token = None
+        while True:
+            response = call_with_retry('jira.search', lambda: jira.enhanced_jql(jql, fields=fields, nextPageToken=next_page_token, limit=JIRA_SEARCH_PAGE_SIZE))
+            issues.extend(response.get('issues', []))
+            next_page_token = response.get('nextPageToken')
+            if response.get('isLast', True) or not next_page_token:
+                return issues
+    start = 0
+    while True:
+        response = call_with_retry('jira.search', lambda: jira.jql(jql, fields=fields, start=start, limit=JIRA_SEARCH_PAGE_SIZE))
+        page = response.get('issues', [])
+        issues.extend(page)
+        start += len(page)
+        if not page or start >= response.get('total', 0):
+            return issues
+
+def _build_index():
+    jira = get_jira(JIRA_URL, USERNAME, API_TOKEN)
+    jql = f'project = "{JIRA_PROJECT}" AND labels = "{AUTOMATION_LABEL}" AND issuetype != "{EPIC_ISSUE_TYPE}"'
+    index = {}
+    try:
+        issues = search_all(jira, jql, ['summary', 'parent'])
+    except Exception as e:
+        print(f"{Fore.YELLOW}Warning: could not load existing automation tickets, duplicates will not be detected: {str(e)}{Style.RESET_ALL}")
+        return index
+    for issue in issues:
+        fields = issue.get('fields', {})
+        parent_key = (fields.get('parent') or {}).get('key')
+        index.setdefault(_index_key(parent_key, fields.get('summary')), issue['key'])
+    print(f"{Fore.CYAN}Loaded {len(issues)} existing automation tickets from Jira{Style.RESET_ALL}")
+    return index
+
+def _get_index():
+    global _index
+    with _lock:
+        if _index is None:
+            _index = _build_index()
+        return _index
+
+def find_existing_ticket(epic_key, summary):
+    """Return the key of an automation ticket with this parent epic and summary, or None"""
+    return _get_index().get(_index_key(epic_key, summary))
+
+def add_existing_ticket(epic_key, summary, ticket_key):
+    """Record a ticket created during this run so later rows do not duplicate it"""
+    index = _get_index()
+    with _lock:
+        index.setdefault(_index_key(epic_key, summary), ticket_key)
@@ -0,0 +1,100 @@
+"""
+Span tracing in Chrome Trace Event format, for spotting serialization points.
+
+With --trace <path> (or TRACE_FILE), every metrics stage (page fetch, parse,
+user lookup, link resolution, Jira write) and every HTTP request becomes a
+complete ("X") event on the thread or asyncio task that ran it, so nested and
+overlapping work shows up as in a profiler. Spans inherit the page ID and epic
+key set with trace_tags(), also in thread pool work submitted through
+submit_in_context(). The file opens in chrome://tracing or
+https://ui.perfetto.dev.
+"""
+import atexit
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from colorama import Fore, Style
+from config import TRACE_FILE, pop_option
+
+_tags = contextvars.ContextVar('trace_tags', default={})
+_lock = threading.Lock()
+_events = []
+_tracks = {}  # tid -> thread or task name
+_origin = time.perf_counter()
+_trace_path = TRACE_FILE
+
+def apply_tracing_flags():
+    """Handle the --trace <path> command line option"""
+    global _trace_path
+    _trace_path = pop_option('--trace') or _trace_path
+
+@contextmanager
+def trace_tags(**tags):
+    """Tag every span started inside the block (including in asyncio.to_thread calls) with these args"""
+    token = _tags.set({**_tags.get(), **{key: value for key, value in tags.items() if value is not None}})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+def submit_in_context(executor, func, *args):
+    """executor.submit, running func in a copy of the caller's context so its trace tags carry over"""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+def _current_track():
+    asyncio = sys.modules.get('asyncio')  # Without asyncio loaded there can be no running task
+    try:
+        task = asyncio.current_task() if asyncio else None
+    except RuntimeError:  # No event loop in this thread
+        task = None
+    if task is not None:
+        return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident, thread.name
+
+def add_span(name, started, duration, category='stage', **tags):
+    """
+    Record a finished span.
+    Args:
+        started: time.perf_counter() value at the start of the span
+        duration: length of the span in seconds
+    """
+    if not _trace_path:
+        return
+    tid, track_name = _current_track()
+    args = {**_tags.get(), **{key: value for key, value in tags.items() if value is not None}}
+    event = {
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': round((started - _origin) * 1e6, 1),
+        'dur': round(duration * 1e6, 1),
+        'pid': os.getpid(),
+        'tid': tid,
+        'args': args
+    }
+    with _lock:
+        _events.append(event)
+        _tracks.setdefault(tid, track_name)
+
+def write_trace():
+    """Write the recorded spans as a Chrome Trace Event JSON file"""
+    if not _trace_path or not _events:
+        return
+    pid = os.getpid()
+    with _lock:
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': os.path.basename(sys.argv[0])}}]
+        metadata.extend(
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': track_name}}
+            for tid, track_name in _tracks.items()
+        )
+        events = sorted(_events, key=lambda event: event['ts'])
+    with open(_trace_path, 'w') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+    print(f"{Fore.GREEN}Trace with {len(events)} spans written to {_trace_path} (open in https://ui.perfetto.dev){Style.RESET_ALL}")
+
+atexit.register(write_trace)
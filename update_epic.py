@@ -1,25 +1,92 @@
+import base64
+import binascii
 import json
 import os
 import re
-import requests
+import struct
+import threading
 from colorama import Fore, Style
-from atlassian import Jira
+from clients import get_session, get_jira
+from config import CACHE_DIR, LINK_RESOLVE_WORKERS, AUTOMATION_LABEL, EPIC_ISSUE_TYPE
+from resilience import call_with_retry, create_issue_idempotent, add_idempotency_label
+from ticket_index import search_all
+from log import get_logger, log_event, color
+from metrics import timed_stage
+from tracing import submit_in_context
 
+logger = get_logger('update_epic')
+
+TINY_LINK_CACHE_FILE = os.path.join(CACHE_DIR, 'tiny_links.json')
+
+_tiny_link_lock = threading.Lock()
+_tiny_link_cache = None
+
+def decode_tiny_link(code):
+    """
+    Decode a Confluence tiny link code (/wiki/x/<code>) to a page ID without any HTTP request.
+    Tiny link codes are the page ID as little-endian bytes, base64 encoded with
+    '-'/'_' in place of '/'/'+' and trailing 'A's and padding stripped.
+    Returns: page ID string, or None if the code cannot be decoded
+    """
+    if not code or len(code) > 11:
+        return None
+    encoded = code.replace('-', '/').replace('_', '+').ljust(11, 'A') + '='
+    try:
+        page_id = struct.unpack('<Q', base64.b64decode(encoded, validate=True))[0]
+    except (binascii.Error, struct.error, ValueError):
+        return None
+    return str(page_id) if page_id else None
+
+def _load_tiny_link_cache():
+    global _tiny_link_cache
+    if _tiny_link_cache is None:
+        try:
+            with open(TINY_LINK_CACHE_FILE, 'r') as f:
+                _tiny_link_cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _tiny_link_cache = {}
+    return _tiny_link_cache
+
+def _cache_tiny_link(short_url, page_id):
+    """Persist a network-resolved tiny link so later runs skip the request"""
+    with _tiny_link_lock:
+        cache = _load_tiny_link_cache()
+        cache[short_url] = page_id
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = TINY_LINK_CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, TINY_LINK_CACHE_FILE)
+
+@timed_stage('links.resolve_tiny')
 def resolve_shortened_confluence_url(short_url, username, api_token):
     """
     Resolve a shortened Confluence URL to get the actual page ID.
+    Links resolved over the network before are served from the tiny link cache.
     """
+    with _tiny_link_lock:
+        cached_page_id = _load_tiny_link_cache().get(short_url)
+    if cached_page_id:
+        return cached_page_id
+
+    page_id = _resolve_shortened_confluence_url(short_url, username, api_token)
+    if page_id:
+        _cache_tiny_link(short_url, page_id)
+    return page_id
+
+def _resolve_shortened_confluence_url(short_url, username, api_token):
+    """Resolve a shortened Confluence URL by following its redirects"""
     try:
-        print(f"{Fore.CYAN}Debug - Resolving shortened URL: {short_url}{Style.RESET_ALL}")
+        logger.debug("Resolving shortened URL: %s", short_url)
         
         # First try to extract page ID directly from the URL if it's already in a recognizable format
         direct_page_id = extract_page_id_from_resolved_url(short_url)
         if direct_page_id:
-            print(f"{Fore.GREEN}Debug - Extracted page ID {direct_page_id} directly from URL without HTTP request{Style.RESET_ALL}")
+            logger.debug("Extracted page ID %s directly from URL without HTTP request", direct_page_id)
             return direct_page_id
         
         # Make a HEAD request to follow redirects without downloading content
-        response = requests.head(
+        response = get_session().head(
             short_url,
             auth=(username, api_token),
             allow_redirects=True,
@@ -29,7 +96,7 @@ def resolve_shortened_confluence_url(short_url, username, api_token):
         # Check if we got a redirect or if the final URL is different
         final_url = response.url
         if final_url != short_url:
-            print(f"{Fore.CYAN}Debug - URL redirected to: {final_url}{Style.RESET_ALL}")
+            logger.debug("URL redirected to: %s", final_url)
             # Try to extract page ID from the redirected URL
             page_id = extract_page_id_from_resolved_url(final_url)
             if page_id:
@@ -38,16 +105,16 @@ def resolve_shortened_confluence_url(short_url, username, api_token):
         # Even if we get an error status, try to extract from the final URL
         if response.status_code in [200, 302, 401, 403]:  # Include auth errors as they might still have valid redirects
             final_url = response.url
-            print(f"{Fore.CYAN}Debug - Final URL (status {response.status_code}): {final_url}{Style.RESET_ALL}")
+            logger.debug("Final URL (status %s): %s", response.status_code, final_url)
             
             # Now try to extract page ID from the resolved URL
             return extract_page_id_from_resolved_url(final_url)
         else:
-            print(f"{Fore.YELLOW}Warning: Could not resolve shortened URL {short_url}, status: {response.status_code}{Style.RESET_ALL}")
+            logger.warning("Warning: Could not resolve shortened URL %s, status: %s", short_url, response.status_code)
             return None
             
     except Exception as e:
-        print(f"{Fore.YELLOW}Warning: Error resolving shortened URL {short_url}: {str(e)}{Style.RESET_ALL}")
+        logger.warning("Warning: Error resolving shortened URL %s: %s", short_url, e)
         # As a fallback, try to extract page ID directly from the original URL
         return extract_page_id_from_resolved_url(short_url)
 
@@ -69,7 +136,7 @@ def extract_page_id_from_resolved_url(url):
         match = re.search(pattern, url)
         if match:
             page_id = match.group(1)
-            print(f"{Fore.GREEN}Debug - Extracted page ID {page_id} from resolved URL using {description} pattern{Style.RESET_ALL}")
+            logger.debug("Extracted page ID %s from resolved URL using %s pattern", page_id, description)
             return page_id
     
     return None
@@ -82,7 +149,7 @@ def extract_page_id_from_link(link_text, username=None, api_token=None):
     if not link_text or link_text == 'No link':
         return None
     
-    print(f"{Fore.CYAN}Debug - Processing link: {link_text}{Style.RESET_ALL}")
+    logger.debug("Processing link: %s", link_text)
     
     # Common Confluence URL patterns (ordered by specificity)
     patterns = [
@@ -93,7 +160,7 @@ def extract_page_id_from_link(link_text, username=None, api_token=None):
         (r'/display/[^/]+/(\d+)', 'display format'),  # /display/SPACE/123456
         (r'/(\d{6,})(?:/|$)', 'standalone ID'),  # /123456/ or /123456 (6+ digits to avoid false matches)
         (r'(\d{6,})$', 'ending with ID'),  # ending with 123456 (6+ digits)
-        (r'/wiki/x/([A-Za-z0-9]+)', 'shortened wiki format'),  # /wiki/x/BwB4NAE (Confluence shortened URLs)
+        (r'/wiki/x/([A-Za-z0-9_-]+)', 'shortened wiki format'),  # /wiki/x/BwB4NAE (Confluence shortened URLs)
     ]
     
     for pattern, description in patterns:
@@ -101,26 +168,43 @@ def extract_page_id_from_link(link_text, username=None, api_token=None):
         if match:
             page_id = match.group(1)
             
-            # Handle shortened URLs - they need to be resolved
+            # Handle shortened URLs - decode locally, only resolving over HTTP if that fails
             if description == 'shortened wiki format':
+                decoded_id = decode_tiny_link(page_id)
+                if decoded_id:
+                    logger.debug("Decoded page ID %s from tiny link %s", decoded_id, page_id)
+                    return decoded_id
                 if username and api_token:
                     resolved_id = resolve_shortened_confluence_url(link_text, username, api_token)
                     if resolved_id:
                         return resolved_id
                     else:
-                        print(f"{Fore.YELLOW}Warning: Could not resolve shortened URL, using encoded ID: {page_id}{Style.RESET_ALL}")
+                        logger.warning("Warning: Could not resolve shortened URL, using encoded ID: %s", page_id)
                         return page_id  # Return the encoded ID as fallback
                 else:
-                    print(f"{Fore.YELLOW}Warning: Cannot resolve shortened URL without credentials, using encoded ID: {page_id}{Style.RESET_ALL}")
+                    logger.warning("Warning: Cannot resolve shortened URL without credentials, using encoded ID: %s", page_id)
                     return page_id  # Return the encoded ID as fallback
             else:
-                print(f"{Fore.GREEN}Debug - Extracted page ID {page_id} using {description} pattern{Style.RESET_ALL}")
+                logger.debug("Extracted page ID %s using %s pattern", page_id, description)
                 return page_id
     
-    print(f"{Fore.YELLOW}Warning: Could not extract page ID from link: {link_text}{Style.RESET_ALL}")
-    print(f"{Fore.YELLOW}Debug - Link length: {len(link_text)}, starts with: {link_text[:50]}...{Style.RESET_ALL}")
+    logger.warning("Warning: Could not extract page ID from link: %s", link_text)
+    logger.debug("Link length: %d, starts with: %s...", len(link_text), link_text[:50])
     return None
 
+@timed_stage('links.resolve')
+def resolve_page_links(links, username=None, api_token=None):
+    """
+    Extract page IDs for many links at once.
+    Links that can be handled locally are done inline; the rest are resolved concurrently.
+    Returns: dict mapping each link to its page ID (or None)
+    """
+    links = [link for link in dict.fromkeys(links) if link]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=LINK_RESOLVE_WORKERS) as executor:
+        futures = [submit_in_context(executor, extract_page_id_from_link, link, username, api_token) for link in links]
+        return {link: future.result() for link, future in zip(links, futures)}
+
 def load_epic_json():
     """Load existing epic.json file or create empty structure"""
     try:
@@ -145,56 +229,15 @@ def save_epic_json(data):
         json.dump(data, f, indent=2)
     print(f"{Fore.GREEN}Updated epic.json with {len(data)} entries{Style.RESET_ALL}")
 
-def find_epic_entry(epic_data, project_name):
-    """Find existing entry for a project"""
-    for entry in epic_data:
-        if entry.get('project_name') == project_name:
-            return entry
-    return None
-
-def add_epic_entry(epic_data, project_name, confluence_page_id, jira_epic_id=None):
-    """Add a new entry to epic data"""
-    new_entry = {
-        "project_name": project_name,
-        "confluence_page_id": confluence_page_id,
-        "jira_epic_id": jira_epic_id
-    }
-    epic_data.append(new_entry)
-    return new_entry
-
-def update_epic_entry(entry, confluence_page_id=None, jira_epic_id=None):
-    """Update an existing epic entry"""
-    updated = False
-    if confluence_page_id and entry.get('confluence_page_id') != confluence_page_id:
-        entry['confluence_page_id'] = confluence_page_id
-        updated = True
-    if jira_epic_id and entry.get('jira_epic_id') != jira_epic_id:
-        entry['jira_epic_id'] = jira_epic_id
-        updated = True
-    return updated
-
 def get_jira_client(jira_url, username, api_token):
-    """Get a configured Jira client"""
-    return Jira(
-        url=jira_url,
-        username=username,
-        password=api_token
-    )
-
-def create_jira_epic(task_data, reporter_account_id, jira_url, username, api_token, jira_project):
-    """Create a new Jira epic"""
-    jira = get_jira_client(jira_url, username, api_token)
+    """Get the shared Jira client (reuses the pooled session across calls)"""
+    return get_jira(jira_url, username, api_token)
 
-    if not reporter_account_id:
-        print(f"{Fore.RED}Error: Reporter account ID is required but was not provided.{Style.RESET_ALL}")
-        return None
-
-    # Create issue data
-    issue_data = {
-        "fields": {
-            "project": {"key": jira_project},
-            "summary": task_data['Project'],  # Epic title
-            "description": f'''
+def build_epic_fields(task_data):
+    """Epic fields taken from the planning table, shared by creates and updates"""
+    return {
+        "summary": task_data['Project'],  # Epic title
+        "description": f'''
 {task_data['Description']}
 
 *Success Measures:*
@@ -203,60 +246,154 @@ def create_jira_epic(task_data, reporter_account_id, jira_url, username, api_tok
 *Link to PRD:*
 {task_data['Link']}
             ''',
-            "issuetype": {"name": "Epic"},
-            "priority": {"name": task_data['Priority'].replace('Red', '').replace('Yellow', '')},  # Clean the priority text
-            "assignee": {"id": task_data['Owner Account ID']},  # Use the owner's account ID for assignee
+        "priority": {"name": task_data['Priority'].replace('Red', '').replace('Yellow', '')},  # Clean the priority text
+        "assignee": {"id": task_data['Owner Account ID']},  # Use the owner's account ID for assignee
+    }
+
+def build_epic_issue_data(task_data, reporter_account_id, jira_project):
+    """Build the Jira issue payload for a new epic"""
+    issue_data = {
+        "fields": {
+            "project": {"key": jira_project},
+            **build_epic_fields(task_data),
+            "issuetype": {"name": EPIC_ISSUE_TYPE},
             "reporter": {"id": reporter_account_id},  # Use the account ID for reporter
-            "labels": ["ids-automation"],  # Add label for automation tracking
+            "labels": [AUTOMATION_LABEL],  # Add label for automation tracking
             "components": [{"name": "IDS Internal"}]  # Add component
         }
     }
+    add_idempotency_label(issue_data["fields"])  # Lets a retried create detect that it already went through
+    return issue_data
+
+EPIC_DIFF_FIELDS = ['summary', 'description', 'priority', 'assignee']
+EPIC_FETCH_CHUNK_SIZE = 100  # Keys per JQL search
+
+@timed_stage('jira.fetch_epics')
+def fetch_epic_fields(keys, jira_url, username, api_token):
+    """
+    Fetch the current fields of many epics with `key in (...)` JQL searches.
+    Returns: dict mapping epic key -> fields dict; epics that could not be fetched are left out
+    """
+    jira = get_jira_client(jira_url, username, api_token)
+    keys = sorted(set(key for key in keys if key))
+    current = {}
+    for start in range(0, len(keys), EPIC_FETCH_CHUNK_SIZE):
+        chunk = keys[start:start + EPIC_FETCH_CHUNK_SIZE]
+        try:
+            issues = search_all(jira, f"key in ({', '.join(chunk)})", EPIC_DIFF_FIELDS)
+        except Exception as e:
+            print(f"{Fore.YELLOW}Warning: could not fetch current epics, they will be updated in full: {str(e)}{Style.RESET_ALL}")
+            continue
+        for issue in issues:
+            current[issue['key']] = issue.get('fields', {})
+    return current
+
+_WIKI_BOLD_PATTERN = re.compile(r'\*([^*\n]+)\*')
+
+def adf_to_text(node):
+    """
+    Plain text of an Atlassian Document Format node, as returned for rich text fields
+    by the Cloud v3 API. Block nodes end with a newline; link cards become their URL.
+    """
+    if isinstance(node, list):
+        return ''.join(adf_to_text(child) for child in node)
+    if not isinstance(node, dict):
+        return ''
+    node_type = node.get('type')
+    if node_type == 'text':
+        return node.get('text', '')
+    if node_type == 'hardBreak':
+        return '\n'
+    if node_type in ('inlineCard', 'blockCard'):
+        return node.get('attrs', {}).get('url', '')
+    if node_type == 'mention':
+        return node.get('attrs', {}).get('text', '')
+    text = adf_to_text(node.get('content', []))
+    return text if node_type in ('doc', None) else text + '\n'
+
+def description_text(description):
+    """
+    Comparable form of a description, whether it is the wiki markup string sent on create
+    or the ADF document a Cloud search returns: bold markers dropped, whitespace collapsed.
+    """
+    if isinstance(description, (dict, list)):
+        text = adf_to_text(description)
+    else:
+        text = _WIKI_BOLD_PATTERN.sub(r'\1', description or '')
+    return ' '.join(text.split())
+
+def diff_epic_fields(current_fields, desired_fields):
+    """
+    Compare an epic's current Jira fields with the fields built from the planning table.
+    Args:
+        current_fields: fields from fetch_epic_fields, or None if unknown
+        desired_fields: fields as built by build_epic_fields
+    Returns: dict of only the desired fields that differ (all of them if current_fields is None)
+    """
+    if current_fields is None:
+        return dict(desired_fields)
+    current = {
+        'summary': current_fields.get('summary') or '',
+        'description': description_text(current_fields.get('description')),
+        'priority': ((current_fields.get('priority') or {}).get('name') or '').strip(),
+        'assignee': (current_fields.get('assignee') or {}).get('accountId')
+    }
+    desired = {
+        'summary': desired_fields['summary'] or '',
+        'description': description_text(desired_fields['description']),
+        'priority': (desired_fields['priority']['name'] or '').strip(),
+        'assignee': desired_fields['assignee']['id']
+    }
+    return {field: desired_fields[field] for field in EPIC_DIFF_FIELDS if current[field] != desired[field]}
+
+@timed_stage('jira.create_epic')
+def create_jira_epic(task_data, reporter_account_id, jira_url, username, api_token, jira_project):
+    """Create a new Jira epic"""
+    jira = get_jira_client(jira_url, username, api_token)
+
+    if not reporter_account_id:
+        logger.error("Error: Reporter account ID is required but was not provided.")
+        return None
+
+    # Create issue data
+    issue_data = build_epic_issue_data(task_data, reporter_account_id, jira_project)
 
     try:
-        # Create the issue
-        ticket = jira.issue_create(fields=issue_data["fields"])
-        print(f"{Fore.GREEN}Successfully created Jira Epic: {ticket['key']}{Style.RESET_ALL}")
-        print(f"Title: {task_data['Project']}")
-        print(f"Priority: {task_data['Priority']}")
-        print(f"Assignee: {task_data['Owner']}")
-        print(f"Reporter Account ID: {reporter_account_id}")
-        print(f"Labels: {', '.join(issue_data['fields']['labels'])}")
-        print(f"Components: {', '.join(c['name'] for c in issue_data['fields']['components'])}")
+        # Create the issue (retried without duplicates on transient failures)
+        ticket = create_issue_idempotent(jira, issue_data["fields"])
+        logger.info("Successfully created Jira Epic: %s", ticket['key'], extra=color(Fore.GREEN))
+        logger.debug(
+            "Title: %s\nPriority: %s\nAssignee: %s\nReporter Account ID: %s\nLabels: %s\nComponents: %s",
+            task_data['Project'], task_data['Priority'], task_data['Owner'], reporter_account_id,
+            ', '.join(issue_data['fields']['labels']), ', '.join(c['name'] for c in issue_data['fields']['components'])
+        )
+        log_event(logger, 'epic_created', "Created epic %(key)s", key=ticket['key'], summary=task_data['Project'])
         return ticket
     except Exception as e:
-        print(f"{Fore.RED}Failed to create Jira Epic: {str(e)}{Style.RESET_ALL}")
+        logger.error("Failed to create Jira Epic: %s", e)
+        log_event(logger, 'epic_failed', "Failed to create epic %(summary)s", summary=task_data['Project'], error=str(e))
         return None
 
-def update_jira_epic(epic_key, task_data, jira_url, username, api_token):
-    """Update an existing Jira epic with new data"""
+@timed_stage('jira.update_epic')
+def update_jira_epic(epic_key, task_data, jira_url, username, api_token, fields=None):
+    """
+    Update an existing Jira epic with new data.
+    Args:
+        fields: Only these fields (as returned by diff_epic_fields); defaults to every epic field
+    """
     jira = get_jira_client(jira_url, username, api_token)
 
     # Prepare update data
-    update_data = {
-        "fields": {
-            "summary": task_data['Project'],  # Epic title
-            "description": f'''
-{task_data['Description']}
-
-*Success Measures:*
-{task_data['Success Measures']}
-
-*Link to PRD:*
-{task_data['Link']}
-            ''',
-            "priority": {"name": task_data['Priority'].replace('Red', '').replace('Yellow', '')},  # Clean the priority text
-            "assignee": {"id": task_data['Owner Account ID']},  # Use the owner's account ID for assignee
-        }
-    }
+    update_data = {"fields": fields if fields is not None else build_epic_fields(task_data)}
 
     try:
         # Update the issue
-        jira.issue_update(issue_key=epic_key, fields=update_data["fields"])
-        print(f"{Fore.GREEN}Successfully updated Jira Epic: {epic_key}{Style.RESET_ALL}")
-        print(f"Title: {task_data['Project']}")
-        print(f"Priority: {task_data['Priority']}")
-        print(f"Assignee: {task_data['Owner']}")
+        call_with_retry('jira.issue_update', lambda: jira.issue_update(issue_key=epic_key, fields=update_data["fields"]))
+        logger.info("Successfully updated Jira Epic: %s", epic_key, extra=color(Fore.GREEN))
+        logger.debug("Title: %s\nPriority: %s\nAssignee: %s", task_data['Project'], task_data['Priority'], task_data['Owner'])
+        log_event(logger, 'epic_updated', "Updated epic %(key)s", key=epic_key, fields=list(update_data["fields"]))
         return True
     except Exception as e:
-        print(f"{Fore.RED}Failed to update Jira Epic {epic_key}: {str(e)}{Style.RESET_ALL}")
+        logger.error("Failed to update Jira Epic %s: %s", epic_key, e)
+        log_event(logger, 'epic_update_failed', "Failed to update epic %(key)s", key=epic_key, error=str(e))
         return False
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Persistent cache of Confluence account ID to user details lookups.
+
+An in-memory LRU sits in front of a JSON file under CACHE_DIR, so the same
+owners are only looked up over REST once per USER_CACHE_TTL across runs.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from colorama import Fore, Style
+from config import CACHE_DIR, USER_CACHE_ENABLED, USER_CACHE_TTL, USER_CACHE_MEMORY_SIZE, pop_flag
+
+USER_CACHE_FILE = os.path.join(CACHE_DIR, 'users.json')
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_disk = None
+_dirty = False
+_enabled = USER_CACHE_ENABLED
+
+def _is_fresh(entry):
+    return entry and time.time() - entry.get('cached_at', 0) < USER_CACHE_TTL
+
+def _load_disk():
+    """Load the on-disk cache once, dropping expired entries"""
+    global _disk
+    if _disk is not None:
+        return _disk
+    try:
+        with open(USER_CACHE_FILE, 'r') as f:
+            data = json.load(f)
+        _disk = {account_id: entry for account_id, entry in data.items() if _is_fresh(entry)}
+    except FileNotFoundError:
+        _disk = {}
+    except (json.JSONDecodeError, AttributeError):
+        print(f"{Fore.YELLOW}Warning: user cache is corrupted, starting fresh{Style.RESET_ALL}")
+        _disk = {}
+    return _disk
+
+def _remember(account_id, entry):
+    """Put an entry at the front of the in-memory LRU"""
+    _memory[account_id] = entry
+    _memory.move_to_end(account_id)
+    while len(_memory) > USER_CACHE_MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+def configure_user_cache(enabled=True, invalidate=False):
+    """
+    Enable/bypass the user cache and optionally drop everything cached so far.
+    """
+    global _enabled, _disk, _dirty
+    with _lock:
+        _enabled = enabled
+        if invalidate:
+            _memory.clear()
+            _disk = {}
+            _dirty = True
+            print(f"{Fore.YELLOW}User cache invalidated{Style.RESET_ALL}")
+
+def apply_user_cache_flags():
+    """Handle the --no-user-cache and --refresh-user-cache command line flags"""
+    bypass = pop_flag('--no-user-cache')
+    refresh = pop_flag('--refresh-user-cache')
+    configure_user_cache(enabled=USER_CACHE_ENABLED and not bypass, invalidate=refresh)
+
+def get_cached_user(account_id):
+    """Return cached user details for an account ID, or None on a miss"""
+    if not _enabled:
+        return None
+    with _lock:
+        entry = _memory.get(account_id)
+        if not _is_fresh(entry):
+            entry = _load_disk().get(account_id)
+            if not _is_fresh(entry):
+                return None
+        _remember(account_id, entry)
+        return entry['details']
+
+def cache_user(account_id, details):
+    """Store user details for an account ID in memory and on disk"""
+    global _dirty
+    if not _enabled or not details:
+        return
+    entry = {
+        'details': {
+            'accountId': details.get('accountId', account_id),
+            'displayName': details.get('displayName')
+        },
+        'cached_at': time.time()
+    }
+    with _lock:
+        _remember(account_id, entry)
+        _load_disk()[account_id] = entry
+        _dirty = True
+
+def save_user_cache():
+    """Write the cache back to disk if anything changed"""
+    global _dirty
+    with _lock:
+        if not _dirty or _disk is None:
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = USER_CACHE_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(_disk, f)
+        os.replace(tmp_path, USER_CACHE_FILE)
+        _dirty = False
+
+atexit.register(save_user_cache)